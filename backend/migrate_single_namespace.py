@@ -0,0 +1,44 @@
+"""
+Copy the per-namespace Pinecone layout (BMI, BMI_WEB, ..., FBM_WEB) into one
+namespace with every record tagged with studyProgramAbbrev + sourceKind. The
+vectors are fetched and re-upserted, nothing is re-embedded, and the old
+namespaces stay in place until you delete them. Serve from the new layout
+with PINECONE_LAYOUT=single.
+
+    python backend/migrate_single_namespace.py [--target all] [--namespaces BMI BMI_WEB]
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+# before the services imports: single_index reads PINECONE_* when imported
+load_dotenv()
+
+from services.loader import load_text_store, AVAILABLE_NAMESPACES
+from services.pinecone_search import get_index
+from services.single_index import PINECONE_SINGLE_NAMESPACE, migrate_to_single_namespace
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--target", default=PINECONE_SINGLE_NAMESPACE)
+    parser.add_argument("--namespaces", nargs="*", help="default: every namespace the API serves")
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    if not os.getenv("PINECONE_INDEX"):
+        raise RuntimeError("PINECONE_INDEX is not set in the .env file.")
+
+    load_text_store()
+    namespaces = args.namespaces or AVAILABLE_NAMESPACES
+    copied = migrate_to_single_namespace(get_index(), namespaces, args.target, args.batch_size)
+    print(f"Copied {sum(copied.values())} vectors from {len(copied)} namespaces into '{args.target}'.")
+    print("Set PINECONE_LAYOUT=single (and PINECONE_SINGLE_NAMESPACE) to serve from it.")
+
+
+if __name__ == "__main__":
+    main()
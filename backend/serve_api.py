@@ -1,58 +1,55 @@
-from fastapi import FastAPI, Body
+import asyncio
+import json
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from fastapi import FastAPI, Body, HTTPException, Header, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from dotenv import load_dotenv
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Any, Dict, Optional, List, Tuple
+
+# before any services import: the services read their settings when imported
+load_dotenv()
 
 from services.loader import load_text_store, AVAILABLE_NAMESPACES
-from services.embeddings import embed, detect_lang
-from services.pinecone_search import build_filter, search_all_namespaces
-from services.context_builder import build_context, SourceItem
-from services.prompt_utils import ask_openai
+from services.embeddings import aembed, aembed_batch, EMBED_BATCHER, EMBED_MODEL
+from services.embed_cache import EMBED_CACHE, normalize_query
+from services.pinecone_search import build_filter, asearch_all_namespaces, ascore_ids, get_local_index, SEARCH_BACKEND, FAN_OUT
+from services.context_builder import build_context, SourceItem, SCORE_THRESHOLD
+from services.bm25 import get_bm25_index, rrf_fuse, HYBRID_SEARCH, HYBRID_TOP_K
+from services.module_lookup import get_module_index
+from services.citations import get_citation_index
+from services.facets import get_facet_index
+from services.catalog import get_catalog, format_answer, ModuleItem, CATALOGUES, CATALOG_PAGE_SIZE, CATALOG_ANSWER_MAX
+from services.adaptive_k import ADAPTIVE_K, ADAPTIVE_TOP_K, ADAPTIVE_START_K
+from services.namespace_router import get_namespace_router, NAMESPACE_ROUTER, ROUTER_AUDIT_RATE
+from services.query_analyzer import analyze_query, QueryAnalysis
+from services.local_index import LocalMatch
+from services.prompt_utils import aask_openai, aask_openai_stream, error_message, RESPONSE_CACHE
+from services.answer_cache import ANSWER_CACHE
+from services.singleflight import SingleFlight
+from services.rate_limit import RateLimiter
 from services.logger import save_log
-
-# Simple program inference 
-def infer_programs_simple(text: str) -> List[str]:
-    t = (text or "").lower()
-    hits: List[str] = []
-
-    # Abbreviations first 
-    if "btb" in t: hits.append("BTB")
-    if "bmt" in t: hits.append("BMT")
-    if "bmi" in t: hits.append("BMI")
-    if "mmi" in t: hits.append("MMI")
-    if "bcsim" in t or "csim" in t: hits.append("BCSIM")
-    if "bdaisy" in t or "daisy" in t: hits.append("BDAISY")
-    if "mar" in t: hits.append("MAR")
-
-    # German/English names for abbrev 
-    if "ton und bild" in t:
-        hits.append("BTB")
-    if "medientechnik" in t:
-        hits.append("BMT")
-
-    # Medieninformatik unterschied zws BMI vs MMI 
-    if "medieninformatik" in t:
-        if ("master" in t) or ("msc" in t) or ("m.sc" in t):
-            hits.append("MMI")
-        else:
-            hits.append("BMI")
-
-    if "creative, synthetic and interactive media" in t:
-        hits.append("BCSIM")
-
-    if ("data science, ai und intelligente systeme" in t) or ("daisy" in t):
-        hits.append("BDAISY")
-
-    if "applied research in digital media technologies" in t:
-        hits.append("MAR")
-
-    # dedup while preserving order
-    seen = set()
-    return [p for p in hits if not (p in seen or seen.add(p))]
-
+from services.streaming import buffered, sse_event
 
 # Load vector metadata (ID_TO_TEXT, ID_TO_META)
 load_text_store()
+get_facet_index()
+get_citation_index()
+if SEARCH_BACKEND == "local":
+    get_local_index()
+if HYBRID_SEARCH:
+    get_bm25_index()
+if NAMESPACE_ROUTER and FAN_OUT:
+    get_namespace_router()
+get_module_index()
+get_catalog()
+
+# Coalesces identical /ask requests that arrive while one is running
+INFLIGHT = SingleFlight()
 
 # FastAPI setup
 app = FastAPI()
@@ -71,6 +68,20 @@ def root():
         "namespaces": AVAILABLE_NAMESPACES
     }
 
+
+@app.get("/stats")
+def stats():
+    """Cache and retrieval counters, to see how much latency the caches save."""
+    return {
+        "embedding_cache": EMBED_CACHE.stats(),
+        "embedding_batches": EMBED_BATCHER.stats(),
+        "answer_cache": ANSWER_CACHE.stats(),
+        "response_cache": RESPONSE_CACHE.stats(),
+        "inflight": INFLIGHT.stats(),
+        "namespace_router": get_namespace_router().stats() if NAMESPACE_ROUTER and FAN_OUT else None,
+        "adaptive_top_k": ADAPTIVE_K.stats(),
+    }
+
 class QuestionRequest(BaseModel):
     question: str
     history: Optional[List[dict]] = None
@@ -79,6 +90,8 @@ class QuestionRequest(BaseModel):
     examType: Optional[str] = None
     minCredits: Optional[float] = None
     maxCredits: Optional[float] = None
+    language: Optional[str] = None
+    semester: Optional[int] = None
     top_k: Optional[int] = None
 
 
@@ -87,16 +100,8 @@ class AnswerResponse(BaseModel):
     sources: List[SourceItem]
 
 
-@app.post("/ask", response_model=AnswerResponse)
-def ask(req: QuestionRequest):
-    # decide target programs for each request only
-    if req.program:
-        prog = (req.program or "").upper()
-        target_programs = [prog]
-    else:
-        target_programs = infer_programs_simple(req.question)  
-
-    # Select namespaces to search
+def select_namespaces(target_programs: List[str]) -> List[str]:
+    """Pick the namespaces to search for the given target programs."""
     namespaces = ["FBM_WEB"]
     if target_programs:
         # include only namespaces that actually exist
@@ -112,48 +117,11 @@ def ask(req: QuestionRequest):
     else:
         # when no program is provided or inferred, then search everything
         namespaces.extend(AVAILABLE_NAMESPACES)
+    return namespaces
 
-    flt = build_filter(
-        season=req.season,
-        exam_type=req.examType,
-        min_credits=req.minCredits,
-        max_credits=req.maxCredits
-    )
-
-    # Embed with augment with inferred codes if any
-    query_for_embed = (
-        req.question if not target_programs
-        else f"{req.question} ({', '.join(target_programs)})"
-    )
-    qvec = embed(query_for_embed)
-
-    # use first program as primary for small score bias
-    primary = (req.program.upper() if req.program else (target_programs[0] if target_programs else None))
 
-    # perform vector search across namespaces
-    matches = search_all_namespaces(
-        vector=qvec,
-        top_k=req.top_k or 32,
-        filter=flt,
-        program=primary,
-        namespaces=namespaces
-    )
-
-    context, sources = build_context(matches)
-
-    if not context:
-        lang = detect_lang(req.question)
-        msg = (
-            "Ich konnte dazu nichts in den Daten dieses Chatbots finden."
-            if lang == "de"
-            else "I couldn't find anything relevant in the chatbot's data."
-        )
-        save_log(req.question, msg, [])
-        return AnswerResponse(answer=msg, sources=[], program=(req.program or "").upper())
-
-    answer = ask_openai(context, req.question, req.history or [])
-
-    # Build footer
+def build_footer(sources: List[SourceItem]) -> str:
+    """Markdown list of PDF, study program and web links for the top sources."""
     footer_lines = ["**Quellen und weiterführende Seiten:**"]
     seen_links = set()
 
@@ -197,13 +165,559 @@ def ask(req: QuestionRequest):
             footer_lines.append(f"- [{label}]({src.source})")
             seen_links.add(src.source)
 
-    footer = "\n".join(footer_lines) if len(footer_lines) > 1 else ""
+    return "\n".join(footer_lines) if len(footer_lines) > 1 else ""
+
+
+@dataclass
+class RetrievalPlan:
+    programs: List[str]
+    namespaces: List[str]
+    filter: Optional[dict]
+    query: str
+    primary: Optional[str]
+    question: str = ""
+    # language, programs, module ids and filter hints, shared by every stage
+    analysis: Optional[QueryAnalysis] = None
+    # records the question names directly (module "BMI 10", "§ 16 Abs. 3");
+    # skips embedding + search
+    direct_ids: List[str] = field(default_factory=list)
+    # modules a catalog question ("Welche Module gibt es im BMT?") asks for;
+    # answered without embedding, search or LLM
+    catalog: Optional[List[ModuleItem]] = None
+
+
+def plan_retrieval(req: QuestionRequest) -> RetrievalPlan:
+    """Program inference, namespace selection and filters for one question."""
+    analysis = analyze_query(req.question)
+
+    # decide target programs for each request only
+    if req.program:
+        prog = (req.program or "").upper()
+        target_programs = [prog]
+    else:
+        target_programs = list(analysis.programs)
+
+    # Select namespaces to search
+    namespaces = select_namespaces(target_programs)
+
+    flt = build_filter(
+        season=req.season,
+        exam_type=req.examType,
+        min_credits=req.minCredits,
+        max_credits=req.maxCredits,
+        language=req.language,
+        semester=req.semester
+    )
+
+    # Embed with augment with inferred codes if any
+    query_for_embed = (
+        req.question if not target_programs
+        else f"{req.question} ({', '.join(target_programs)})"
+    )
+
+    # use first program as primary for small score bias
+    primary = (req.program.upper() if req.program else (target_programs[0] if target_programs else None))
+
+    direct_ids = get_module_index().find(req.question) + get_citation_index().lookup(req.question, target_programs)
+
+    catalog = None
+    if analysis.catalog and target_programs and not direct_ids:
+        # the question's own filter words apply here; request filters win
+        catalog = get_catalog().query(
+            programs=target_programs,
+            semester=req.semester or analysis.semester,
+            season=req.season or analysis.season,
+            exam_type=req.examType or analysis.exam_type,
+            min_credits=req.minCredits or analysis.min_credits,
+            max_credits=req.maxCredits or analysis.max_credits,
+            language=req.language or analysis.language,
+            catalogue=analysis.catalogue,
+        ) or None  # nothing matched: let retrieval + LLM explain
+
+    return RetrievalPlan(target_programs, namespaces, flt, query_for_embed, primary, req.question, analysis, direct_ids, catalog)
+
+
+async def search_context(plan: RetrievalPlan, qvec: List[float], top_k: Optional[int] = None) -> Tuple[str, List[SourceItem]]:
+    """Vector (+ BM25) search across the planned namespaces, then context building."""
+    adaptive = ADAPTIVE_TOP_K and not top_k
+    # merged result size; each namespace is asked for at most its merge quota
+    top_k = top_k or (HYBRID_TOP_K if HYBRID_SEARCH else 32)
+    # adaptive: a few results first, the full top_k only for flat score distributions
+    k = min(ADAPTIVE_START_K, top_k) if adaptive else top_k
+    namespaces = plan.namespaces
+    decision = None
+    if NAMESPACE_ROUTER and FAN_OUT and not plan.programs and len(get_namespace_router()):
+        # no program known: query only the namespaces nearest to the question
+        decision = get_namespace_router().route(qvec, plan.namespaces)
+        namespaces = decision.namespaces
+        top = ", ".join(f"{ns}={s:.2f}" for ns, s in list(decision.scores.items())[:3])
+        print(f"[router] {len(namespaces)}/{len(decision.candidates)} namespaces ({decision.reason or 'routed'}) {top}")
+
+    # perform vector search across namespaces (all namespaces concurrently)
+    matches = await asearch_all_namespaces(
+        vector=qvec,
+        top_k=k,
+        filter=plan.filter,
+        program=plan.primary,
+        namespaces=namespaces
+    )
+    widened = adaptive and k < top_k and ADAPTIVE_K.is_flat(matches, k)
+    requery_ms = 0.0
+    if widened:
+        started = time.perf_counter()
+        k = top_k
+        matches = await asearch_all_namespaces(
+            vector=qvec, top_k=k, filter=plan.filter, program=plan.primary, namespaces=namespaces
+        )
+        requery_ms = (time.perf_counter() - started) * 1000.0
+    if decision and decision.routed and random.random() < ROUTER_AUDIT_RATE:
+        task = asyncio.create_task(audit_route(plan, qvec, k, [m.id for m in matches]))
+        ROUTER_AUDITS.add(task)
+        task.add_done_callback(ROUTER_AUDITS.discard)
+    if adaptive:
+        matches, reason = ADAPTIVE_K.cut(matches)
+        ADAPTIVE_K.record(widened, len(matches), reason, requery_ms)
+
+    if HYBRID_SEARCH:
+        # exact terms ("BMI 10", "§ 12", lecturer names) come from the lexical side
+        lexical = get_bm25_index().search(plan.question or plan.query, top_k, plan.namespaces, plan.filter)
+        if adaptive:
+            # BM25 reorders the cut ranking but must not fill it back up
+            kept = {m.id for m in matches}
+            fused = rrf_fuse(matches, lexical, len(matches) + len(lexical), min_vector_score=SCORE_THRESHOLD)
+            matches = [m for m in fused if m.id in kept]
+        else:
+            # records only BM25 found get their own cosine, so relevant ones
+            # pass SCORE_THRESHOLD and off-topic ones do not take a slot
+            found = {m.id for m in matches}
+            scores = await ascore_ids(qvec, [m.id for m in lexical if m.id not in found], plan.primary)
+            matches = rrf_fuse(matches, lexical, top_k, min_vector_score=SCORE_THRESHOLD, lexical_scores=scores)
+
+    return build_context(matches)
+
+
+# background full fan-out searches comparing routed results (see audit_route)
+ROUTER_AUDITS: set = set()
+
+
+async def audit_route(plan: RetrievalPlan, qvec: List[float], top_k: int, routed_ids: List[str]):
+    """Search the full fan-out as well and record how much of it the routed search found."""
+    try:
+        full = await asearch_all_namespaces(
+            vector=qvec, top_k=top_k, filter=plan.filter, program=plan.primary, namespaces=plan.namespaces
+        )
+        get_namespace_router().record_audit(routed_ids, [m.id for m in full])
+    except Exception as e:
+        print(f"[router] audit failed: {e}")
+
+
+def direct_context(plan: RetrievalPlan) -> Tuple[str, List[SourceItem]]:
+    """Context straight from the records the question names (modules, § citations)."""
+    return build_context([LocalMatch(id=rid, score=1.0) for rid in plan.direct_ids])
+
+
+def catalog_text(req: QuestionRequest, plan: RetrievalPlan) -> Tuple[str, List[SourceItem]]:
+    """Module list (without footer) and sources for a catalog question, from the in-memory catalog."""
+    a = plan.analysis
+    hints = {
+        "semester": req.semester or a.semester,
+        "season": req.season or a.season,
+        "examType": req.examType or a.exam_type,
+        "minCredits": req.minCredits or a.min_credits,
+        "maxCredits": req.maxCredits or a.max_credits,
+        "language": req.language or a.language,
+        "catalogue": a.catalogue,
+    }
+    answer = format_answer(plan.catalog, a.lang, plan.programs, hints)
+    return answer, [m.source() for m in plan.catalog[:CATALOG_ANSWER_MAX]]
+
+
+def catalog_answer(req: QuestionRequest, plan: RetrievalPlan) -> AnswerResponse:
+    """Module list for a catalog question, straight from the in-memory catalog."""
+    answer, sources = catalog_text(req, plan)
+    footer = build_footer(sources)
+    return AnswerResponse(answer=f"{answer}\n\n{footer}" if footer else answer, sources=sources)
+
+
+async def retrieve(req: QuestionRequest, plan: Optional[RetrievalPlan] = None) -> Tuple[str, List[SourceItem]]:
+    """Program inference, embedding and namespace search for one question."""
+    plan = plan or plan_retrieval(req)
+    if plan.direct_ids:
+        return direct_context(plan)
+    qvec = await aembed(plan.query)
+    return await search_context(plan, qvec, req.top_k)
+
+
+def answer_scope(req: QuestionRequest, plan: RetrievalPlan):
+    """Semantic cache scope, or None when the answer depends on chat history."""
+    if req.history:
+        return None
+    a = plan.analysis
+    return (
+        tuple(sorted(plan.programs)),
+        req.season, req.examType, req.minCredits, req.maxCredits, req.language, req.semester, req.top_k,
+        # near-identical questions differing in "3." vs "4. Semester" or a module id
+        tuple(sorted(a.hints().items())), tuple(sorted(a.module_keys)), a.lang,
+    )
+
+
+def no_context_message(question: str) -> str:
+    lang = analyze_query(question).lang
+    return (
+        "Ich konnte dazu nichts in den Daten dieses Chatbots finden."
+        if lang == "de"
+        else "I couldn't find anything relevant in the chatbot's data."
+    )
+
+
+def request_key(req: QuestionRequest) -> str:
+    """Identity of a request for in-flight coalescing."""
+    payload = {
+        "question": normalize_query(req.question),
+        "program": (req.program or "").upper(),
+        "filters": [req.season, req.examType, req.minCredits, req.maxCredits, req.language, req.semester, req.top_k],
+        "history": req.history or [],
+    }
+    return json.dumps(payload, ensure_ascii=False, sort_keys=True)
+
+
+async def answer_question(req: QuestionRequest) -> AnswerResponse:
+    """Full embed → search → LLM pipeline for one question (without logging)."""
+    plan = plan_retrieval(req)
+    if plan.catalog:
+        return catalog_answer(req, plan)
+    if plan.direct_ids:
+        # named module / § citation: no embedding, no vector search, no semantic cache
+        qvec, scope = None, None
+        context, sources = direct_context(plan)
+    else:
+        qvec = await aembed(plan.query)
+
+        # Near-duplicate of a recent question in the same program/filter scope
+        scope = answer_scope(req, plan)
+        cached = ANSWER_CACHE.lookup(scope, qvec) if scope is not None else None
+        if cached:
+            answer, sources, _ = cached
+            return AnswerResponse(answer=answer, sources=sources)
+
+        context, sources = await search_context(plan, qvec, req.top_k)
+
+    if not context:
+        msg = no_context_message(req.question)
+        return AnswerResponse(answer=msg, sources=[], program=(req.program or "").upper())
+
+    answer = await aask_openai(context, req.question, req.history or [], lang=plan.analysis.lang)
+
+    # Build footer
+    footer = build_footer(sources)
     final_answer = f"{answer.strip()}\n\n{footer}" if footer else answer.strip()
 
-    save_log(req.question, final_answer, sources, program=(req.program or "").upper())
+    if scope is not None and answer != error_message(plan.analysis.lang):
+        ANSWER_CACHE.store(scope, qvec, final_answer, sources)
+
     return AnswerResponse(answer=final_answer, sources=sources)
 
 
+@app.post("/ask", response_model=AnswerResponse)
+async def ask(req: QuestionRequest):
+    # identical requests already running share that result instead of a new chain
+    try:
+        res = await INFLIGHT.do(request_key(req), lambda: answer_question(req))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Answer generation timed out.")
+
+    # save_log does blocking file + Supabase I/O, keep it off the event loop
+    await asyncio.to_thread(save_log, req.question, res.answer, res.sources, program=(req.program or "").upper())
+    return res
+
+
+@app.post("/ask-stream")
+async def ask_stream(req: QuestionRequest):
+    """
+    Server-Sent-Events variant of /ask. Emits a `sources` event (sources + footer)
+    as soon as the context is built, then `token` events while the answer is
+    generated, and a closing `done` event once the log entry is saved.
+    """
+    plan = plan_retrieval(req)
+    program = (req.program or "").upper()
+    if plan.catalog:
+        catalog, sources = catalog_text(req, plan)
+        context = ""
+    else:
+        context, sources = await retrieve(req, plan)
+
+    async def events():
+        if plan.catalog:
+            # same footer as the /ask catalog answer, sent like the LLM path's
+            footer = build_footer(sources)
+            yield sse_event("sources", {"sources": [s.model_dump() for s in sources], "footer": footer})
+            yield sse_event("token", {"text": catalog})
+            final_answer = f"{catalog}\n\n{footer}" if footer else catalog
+            await asyncio.to_thread(save_log, req.question, final_answer, sources, program=program)
+            yield sse_event("done", {"answer": final_answer})
+            return
+
+        if not context:
+            msg = no_context_message(req.question)
+            yield sse_event("sources", {"sources": [], "footer": ""})
+            yield sse_event("token", {"text": msg})
+            await asyncio.to_thread(save_log, req.question, msg, [])
+            yield sse_event("done", {"answer": msg})
+            return
+
+        footer = build_footer(sources)
+        yield sse_event("sources", {"sources": [s.model_dump() for s in sources], "footer": footer})
+
+        parts: List[str] = []
+        async for chunk in buffered(aask_openai_stream(context, req.question, req.history or [], lang=plan.analysis.lang)):
+            text = "".join(chunk)
+            parts.append(text)
+            yield sse_event("token", {"text": text})
+
+        answer = "".join(parts).strip()
+        final_answer = f"{answer}\n\n{footer}" if footer else answer
+        await asyncio.to_thread(save_log, req.question, final_answer, sources, program=program)
+        yield sse_event("done", {"answer": final_answer})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+class SearchRequest(QuestionRequest):
+    include_context: bool = False
+
+
+class SearchResponse(BaseModel):
+    sources: List[SourceItem]
+    programs: List[str]
+    namespaces: List[str]
+    context: Optional[str] = None
+    # season / examType / credit hints found in the question (not applied)
+    hints: Dict[str, Any] = {}
+    # milliseconds per stage
+    timings: Dict[str, float]
+
+
+@app.post("/search", response_model=SearchResponse)
+async def search(req: SearchRequest):
+    """Retrieval only (program inference, filters, search, context), no LLM call."""
+    t_start = time.perf_counter()
+    plan = plan_retrieval(req)
+
+    t0 = time.perf_counter()
+    if plan.direct_ids:
+        embed_ms = 0.0
+        context, sources = direct_context(plan)
+    else:
+        qvec = await aembed(plan.query)
+        embed_ms = (time.perf_counter() - t0) * 1000
+
+        t0 = time.perf_counter()
+        context, sources = await search_context(plan, qvec, req.top_k)
+    search_ms = (time.perf_counter() - t0) * 1000
+
+    return SearchResponse(
+        sources=sources,
+        programs=plan.programs,
+        namespaces=plan.namespaces,
+        context=context if req.include_context else None,
+        hints=plan.analysis.hints(),
+        timings={
+            "embed": round(embed_ms, 1),
+            "search": round(search_ms, 1),
+            "total": round((time.perf_counter() - t_start) * 1000, 1),
+        },
+    )
+
+
+class ModuleCatalogResponse(BaseModel):
+    items: List[ModuleItem]
+    total: int
+    page: int
+    pageSize: int
+    pages: int
+    programs: List[str]
+
+
+@app.get("/modules", response_model=ModuleCatalogResponse)
+def modules(
+    response: Response,
+    program: Optional[str] = None,
+    semester: Optional[int] = None,
+    season: Optional[str] = None,
+    examType: Optional[str] = None,
+    minCredits: Optional[float] = None,
+    maxCredits: Optional[float] = None,
+    language: Optional[str] = None,
+    catalogue: Optional[str] = None,
+    page: int = Query(1, ge=1),
+    pageSize: int = Query(CATALOG_PAGE_SIZE, ge=1, le=200),
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    Module catalog from the in-memory metadata, filtered and paginated.
+    `program` takes one or more codes ("BMT" or "BMI,MMI"). Responses carry an
+    ETag; a matching If-None-Match gets 304 Not Modified.
+    """
+    if catalogue and catalogue not in CATALOGUES:
+        raise HTTPException(status_code=422, detail=f"catalogue must be one of {', '.join(CATALOGUES)}.")
+    catalog = get_catalog()
+    programs = sorted({p.strip().upper() for p in (program or "").split(",") if p.strip()})
+    params = {
+        "programs": programs, "semester": semester, "season": season, "examType": examType,
+        "minCredits": minCredits, "maxCredits": maxCredits, "language": language,
+        "catalogue": catalogue, "page": page, "pageSize": pageSize,
+    }
+    etag = catalog.etag(params)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if if_none_match and etag in [t.strip() for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    items = catalog.query(programs, semester, season, examType, minCredits, maxCredits, language, catalogue)
+    start = (page - 1) * pageSize
+    response.headers.update(headers)
+    return ModuleCatalogResponse(
+        items=items[start:start + pageSize],
+        total=len(items),
+        page=page,
+        pageSize=pageSize,
+        pages=max(1, -(-len(items) // pageSize)),
+        programs=catalog.programs,
+    )
+
+
+# /ask-batch limits: questions per call, concurrent searches, LLM request budget
+BATCH_MAX_QUESTIONS = int(os.getenv("BATCH_MAX_QUESTIONS", "500"))
+BATCH_SEARCH_CONCURRENCY = int(os.getenv("BATCH_SEARCH_CONCURRENCY", "8"))
+BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", "8"))
+BATCH_LLM_RPM = float(os.getenv("BATCH_LLM_RPM", "300"))
+EMBED_REQUEST_MAX = 256
+
+
+class BatchQuestionRequest(BaseModel):
+    questions: List[str]
+    program: Optional[str] = None
+    season: Optional[str] = None
+    examType: Optional[str] = None
+    minCredits: Optional[float] = None
+    maxCredits: Optional[float] = None
+    language: Optional[str] = None
+    semester: Optional[int] = None
+    top_k: Optional[int] = None
+
+
+class BatchAnswerItem(BaseModel):
+    question: str
+    answer: str
+    sources: List[SourceItem]
+    # milliseconds; embed is the share of the batched embedding call
+    timings: Dict[str, float]
+    error: Optional[str] = None
+
+
+class BatchAnswerResponse(BaseModel):
+    results: List[BatchAnswerItem]
+    unique: int
+    total_ms: float
+
+
+async def embed_queries(queries: List[str]) -> List[List[float]]:
+    """Embed many queries with as few embed_batch calls as possible (cache first)."""
+    vectors: List[Optional[List[float]]] = [EMBED_CACHE.get(EMBED_MODEL, q) for q in queries]
+    missing = [i for i, v in enumerate(vectors) if v is None]
+    for start in range(0, len(missing), EMBED_REQUEST_MAX):
+        chunk = missing[start:start + EMBED_REQUEST_MAX]
+        t0 = time.perf_counter()
+        embedded = await aembed_batch([queries[i] for i in chunk])
+        elapsed = (time.perf_counter() - t0) / len(chunk)
+        for i, vec in zip(chunk, embedded):
+            vectors[i] = vec
+            EMBED_CACHE.set(EMBED_MODEL, queries[i], vec, elapsed)
+    return vectors
+
+
+@app.post("/ask-batch", response_model=BatchAnswerResponse)
+async def ask_batch(req: BatchQuestionRequest):
+    """
+    Answer many questions at once (FAQ pre-generation, staff review). Questions
+    are deduplicated, embedded in batches, searched with bounded parallelism and
+    generated concurrently within BATCH_LLM_RPM. Results keep the input order.
+    Batch answers are not written to the chat log.
+    """
+    if len(req.questions) > BATCH_MAX_QUESTIONS:
+        raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_QUESTIONS} questions per batch.")
+
+    t_start = time.perf_counter()
+    filters = req.dict(exclude={"questions"})
+
+    # dedupe on the normalized question, keeping the first spelling
+    unique: Dict[str, QuestionRequest] = {}
+    for q in req.questions:
+        unique.setdefault(normalize_query(q), QuestionRequest(question=q, **filters))
+    keys = list(unique)
+    plans = [plan_retrieval(unique[k]) for k in keys]
+
+    # questions naming a module or § citation and catalog questions skip embedding and search
+    to_embed = [i for i, p in enumerate(plans) if not p.direct_ids and not p.catalog]
+    t0 = time.perf_counter()
+    embedded = await embed_queries([plans[i].query for i in to_embed])
+    embed_ms = (time.perf_counter() - t0) * 1000 / max(1, len(to_embed))
+    vectors: List[Optional[List[float]]] = [None] * len(plans)
+    for i, vec in zip(to_embed, embedded):
+        vectors[i] = vec
+
+    search_slots = asyncio.Semaphore(BATCH_SEARCH_CONCURRENCY)
+    llm_budget = RateLimiter(BATCH_LLM_RPM, BATCH_LLM_CONCURRENCY)
+
+    async def answer_one(key: str, plan: RetrievalPlan, qvec: Optional[List[float]]) -> BatchAnswerItem:
+        item_req = unique[key]
+        timings = {"embed": round(embed_ms, 1) if qvec is not None else 0.0}
+        t_item = time.perf_counter()
+        try:
+            if plan.catalog:
+                res = catalog_answer(item_req, plan)
+                timings["total"] = round((time.perf_counter() - t_item) * 1000, 1)
+                return BatchAnswerItem(question=item_req.question, answer=res.answer, sources=res.sources, timings=timings)
+            t0 = time.perf_counter()
+            if plan.direct_ids:
+                context, sources = direct_context(plan)
+            else:
+                async with search_slots:
+                    context, sources = await search_context(plan, qvec, item_req.top_k)
+            timings["search"] = round((time.perf_counter() - t0) * 1000, 1)
+
+            if not context:
+                answer, sources = no_context_message(item_req.question), []
+            else:
+                t0 = time.perf_counter()
+                async with llm_budget:
+                    answer = await aask_openai(context, item_req.question, [], lang=plan.analysis.lang)
+                timings["llm"] = round((time.perf_counter() - t0) * 1000, 1)
+                footer = build_footer(sources)
+                answer = f"{answer.strip()}\n\n{footer}" if footer else answer.strip()
+            timings["total"] = round((time.perf_counter() - t_item) * 1000 + timings["embed"], 1)
+            return BatchAnswerItem(question=item_req.question, answer=answer, sources=sources, timings=timings)
+        except Exception as e:
+            timings["total"] = round((time.perf_counter() - t_item) * 1000 + timings["embed"], 1)
+            return BatchAnswerItem(question=item_req.question, answer="", sources=[], timings=timings, error=str(e))
+
+    answered = await asyncio.gather(*(answer_one(k, p, v) for k, p, v in zip(keys, plans, vectors)))
+    by_key = dict(zip(keys, answered))
+
+    results = [
+        by_key[normalize_query(q)].model_copy(update={"question": q})
+        for q in req.questions
+    ]
+    return BatchAnswerResponse(
+        results=results,
+        unique=len(keys),
+        total_ms=round((time.perf_counter() - t_start) * 1000, 1),
+    )
+
+
 @app.post("/ask-simple", response_model=AnswerResponse)
-def ask_simple(question: str = Body(..., media_type="text/plain")):
-    return ask(QuestionRequest(question=question))
+async def ask_simple(question: str = Body(..., media_type="text/plain")):
+    return await ask(QuestionRequest(question=question))
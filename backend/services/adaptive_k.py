@@ -0,0 +1,94 @@
+import os
+from collections import Counter
+from typing import Any, Dict, List, Sequence, Tuple
+
+from services.local_index import LocalMatch
+
+# "1"/"0": start searches with ADAPTIVE_START_K results and widen to the full
+# top_k only when the scores are flat; results are cut at the largest score gap
+ADAPTIVE_TOP_K = os.getenv("ADAPTIVE_TOP_K", "1") == "1"
+ADAPTIVE_START_K = int(os.getenv("ADAPTIVE_START_K", "6"))
+# flat: the k-th match still scores at least this share of the best one
+ADAPTIVE_FLAT_RATIO = float(os.getenv("ADAPTIVE_FLAT_RATIO", "0.9"))
+# matches below this share of the best score are cut
+ADAPTIVE_RELATIVE_CUTOFF = float(os.getenv("ADAPTIVE_RELATIVE_CUTOFF", "0.7"))
+# a drop between neighbours of at least this much ends the result (after
+# ADAPTIVE_MIN_KEEP matches); the largest such drop wins
+ADAPTIVE_MIN_GAP = float(os.getenv("ADAPTIVE_MIN_GAP", "0.05"))
+ADAPTIVE_MIN_KEEP = int(os.getenv("ADAPTIVE_MIN_KEEP", "3"))
+
+
+class AdaptiveTopK:
+    """
+    Decides per search whether the first, small result is enough and where to
+    cut the ranking. Scores are expected best first (merged, boosted cosine
+    scores). Counts widenings and cuts for /stats. Pinecone has no offset, so
+    a widening repeats the whole search at the full top_k; `avg_requery_ms` is
+    the time of that second search.
+    """
+
+    def __init__(
+        self,
+        flat_ratio: float = ADAPTIVE_FLAT_RATIO,
+        relative_cutoff: float = ADAPTIVE_RELATIVE_CUTOFF,
+        min_gap: float = ADAPTIVE_MIN_GAP,
+        min_keep: int = ADAPTIVE_MIN_KEEP,
+    ):
+        self.flat_ratio = flat_ratio
+        self.relative_cutoff = relative_cutoff
+        self.min_gap = min_gap
+        self.min_keep = min_keep
+        self.searches = 0
+        self.widened = 0
+        self.requery_ms = 0.0
+        self.kept = 0
+        self.cuts: Counter = Counter()
+
+    def is_flat(self, matches: Sequence[LocalMatch], k: int) -> bool:
+        """k matches came back and the last one is nearly as good as the first: more may follow."""
+        if k <= 0 or len(matches) < k:
+            return False
+        best = matches[0].score or 0
+        return best > 0 and (matches[k - 1].score or 0) >= best * self.flat_ratio
+
+    def cut(self, matches: List[LocalMatch]) -> Tuple[List[LocalMatch], str]:
+        """The ranking up to the relative cutoff or the largest score gap, whichever comes first."""
+        if len(matches) <= self.min_keep:
+            return matches, "none"
+        scores = [m.score or 0 for m in matches]
+        end, reason = len(scores), "none"
+
+        floor = scores[0] * self.relative_cutoff
+        below = next((i for i in range(self.min_keep, len(scores)) if scores[i] < floor), None)
+        if below is not None:
+            end, reason = below, "relative"
+
+        gaps = [(scores[i - 1] - scores[i], i) for i in range(self.min_keep, min(end + 1, len(scores)))]
+        if gaps:
+            gap, at = max(gaps, key=lambda g: (g[0], -g[1]))
+            if gap >= self.min_gap:
+                end, reason = at, "gap"
+        return matches[:end], reason
+
+    def record(self, widened: bool, kept: int, reason: str, requery_ms: float = 0.0):
+        self.searches += 1
+        self.kept += kept
+        self.cuts[reason] += 1
+        if widened:
+            self.widened += 1
+            self.requery_ms += requery_ms
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": ADAPTIVE_TOP_K,
+            "start_k": ADAPTIVE_START_K,
+            "searches": self.searches,
+            "widened": self.widened,
+            "widen_rate": round(self.widened / self.searches, 4) if self.searches else 0.0,
+            "avg_requery_ms": round(self.requery_ms / self.widened, 2) if self.widened else 0.0,
+            "avg_kept": round(self.kept / self.searches, 2) if self.searches else 0.0,
+            "cuts": dict(self.cuts),
+        }
+
+
+ADAPTIVE_K = AdaptiveTopK()
@@ -0,0 +1,127 @@
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "1000"))
+SEMANTIC_CACHE_TTL = float(os.getenv("SEMANTIC_CACHE_TTL", str(24 * 3600)))
+
+
+class _Entry:
+    __slots__ = ("scope", "created", "vec", "answer", "sources")
+
+    def __init__(self, scope, vec, answer, sources):
+        self.scope = scope
+        self.created = time.monotonic()
+        self.vec = vec
+        self.answer = answer
+        self.sources = sources
+
+
+class SemanticAnswerCache:
+    """
+    Cache of past (question embedding, scope) -> (answer, sources).
+
+    A lookup returns the stored answer of the most similar past question in the
+    same scope if its cosine similarity clears `threshold`. The scope holds the
+    target programs and filters, so answers never cross programs or filter
+    sets. Entries are evicted by total size (least recently used first) and
+    by age.
+    """
+
+    def __init__(
+        self,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        maxsize: int = SEMANTIC_CACHE_SIZE,
+        ttl: float = SEMANTIC_CACHE_TTL,
+    ):
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._ids = itertools.count()
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._by_scope: Dict[Hashable, List[int]] = {}
+        # per scope: (entry ids, stacked normalized vectors), rebuilt on change
+        self._matrices: Dict[Hashable, Tuple[List[int], np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(vec: List[float]) -> Optional[np.ndarray]:
+        v = np.asarray(vec, dtype=np.float32)
+        norm = float(np.linalg.norm(v))
+        return v / norm if norm else None
+
+    def _remove(self, eid: int):
+        entry = self._entries.pop(eid)
+        ids = self._by_scope.get(entry.scope, [])
+        ids.remove(eid)
+        if not ids:
+            self._by_scope.pop(entry.scope, None)
+        self._matrices.pop(entry.scope, None)
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.ttl
+        expired = [eid for eid, e in self._entries.items() if e.created < cutoff]
+        for eid in expired:
+            self._remove(eid)
+
+    def lookup(self, scope: Hashable, vec: List[float]) -> Optional[Tuple[str, List[Any], float]]:
+        """Return (answer, sources, similarity) of the closest cached question, or None."""
+        q = self._normalize(vec) if vec else None
+        with self._lock:
+            self._expire()
+            if q is None or scope not in self._by_scope:
+                self.misses += 1
+                return None
+
+            cached = self._matrices.get(scope)
+            if cached is None:
+                ids = list(self._by_scope[scope])
+                cached = (ids, np.stack([self._entries[i].vec for i in ids]))
+                self._matrices[scope] = cached
+            ids, matrix = cached
+
+            sims = matrix @ q
+            best = int(np.argmax(sims))
+            if float(sims[best]) < self.threshold:
+                self.misses += 1
+                return None
+
+            eid = ids[best]
+            self._entries.move_to_end(eid)
+            self.hits += 1
+            entry = self._entries[eid]
+            return entry.answer, entry.sources, float(sims[best])
+
+    def store(self, scope: Hashable, vec: List[float], answer: str, sources: List[Any]):
+        q = self._normalize(vec) if vec else None
+        if q is None:
+            return
+        with self._lock:
+            eid = next(self._ids)
+            self._entries[eid] = _Entry(scope, q, answer, sources)
+            self._by_scope.setdefault(scope, []).append(eid)
+            self._matrices.pop(scope, None)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "scopes": len(self._by_scope),
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+ANSWER_CACHE = SemanticAnswerCache()
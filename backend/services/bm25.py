@@ -0,0 +1,205 @@
+import os
+import re
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.loader import ID_TO_TEXT, ID_TO_NAMESPACE
+from services.facets import filter_view, get_facet_index
+from services.local_index import LocalMatch
+from services.metadata_filter import matches_filter
+
+# "1"/"0": fuse BM25 with the vector results (reciprocal rank fusion)
+HYBRID_SEARCH = os.getenv("HYBRID_SEARCH", "1") == "1"
+# merged top_k when hybrid is on; lexical recall allows a smaller fetch than 32
+HYBRID_TOP_K = int(os.getenv("HYBRID_TOP_K", "12"))
+RRF_K = int(os.getenv("RRF_K", "60"))
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_UMLAUTS = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+_TOKEN_RE = re.compile(r"§|[a-z0-9]+")
+# "BMI 10", "MMI 05.03", "BTB W18", "§ 12" → one extra term each ("bmi10", "§12")
+_CODE_RE = re.compile(r"(§|\b[a-z]{2,6})\s*(w?\d{1,3}(?:\.\d{1,2})?)\b")
+# linking elements between compound parts (Praxis|semester, Prüfung|s|ordnung)
+_FUGEN = ("", "s", "es", "n", "en")
+MIN_PART = 4
+STOPWORDS = {
+    "der", "die", "das", "den", "dem", "des", "ein", "eine", "einen", "einer", "eines", "und", "oder",
+    "ist", "sind", "im", "in", "zu", "zum", "zur", "mit", "von", "fuer", "auf", "an", "am", "bei",
+    "wie", "was", "wann", "wo", "welche", "welcher", "welches", "ich", "es", "nicht", "auch", "als",
+    "the", "a", "an", "of", "and", "or", "is", "are", "to", "for", "in", "on", "with", "what",
+    "which", "when", "how", "do", "does", "i", "my",
+}
+
+
+def fold(text: str) -> str:
+    """Casefold and fold umlauts/ß so "Prüfung", "Pruefung" and "PRÜFUNG" match."""
+    text = unicodedata.normalize("NFKC", text or "").casefold().translate(_UMLAUTS)
+    # remaining accents (é, à, ...) → base letter
+    return "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> List[str]:
+    text = fold(text)
+    tokens = [t for t in _TOKEN_RE.findall(text) if t not in STOPWORDS]
+    return tokens + [a + b for a, b in _CODE_RE.findall(text)]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over loader.ID_TO_TEXT with namespace postings: every term
+    maps to (row, term frequency) arrays and every row to its namespace, so a
+    query only scores documents from the namespaces it searches.
+
+    German compounds are split against the corpus vocabulary
+    ("praxissemester" → "praxis" + "semester") on both index and query side;
+    the compound itself stays a term too.
+    """
+
+    def __init__(self, records: Dict[str, str], namespaces: Dict[str, str]):
+        self.ids = list(records)
+        docs = [tokenize(records[rid]) for rid in self.ids]
+        self.vocab = Counter(t for doc in docs for t in set(doc))
+        self._splits: Dict[str, Tuple[str, ...]] = {}
+
+        ns_names = sorted({namespaces.get(rid, "") for rid in self.ids})
+        self.ns_codes = {ns: i for i, ns in enumerate(ns_names)}
+        self.row_ns = np.array([self.ns_codes[namespaces.get(rid, "")] for rid in self.ids], dtype=np.int32)
+
+        rows: Dict[str, List[int]] = {}
+        tfs: Dict[str, List[int]] = {}
+        lengths = np.zeros(len(self.ids), dtype=np.float32)
+        for row, doc in enumerate(docs):
+            terms = Counter(self.expand(doc))
+            lengths[row] = sum(terms.values())
+            for term, tf in terms.items():
+                rows.setdefault(term, []).append(row)
+                tfs.setdefault(term, []).append(tf)
+
+        n = max(len(self.ids), 1)
+        avgdl = float(lengths.mean()) if len(self.ids) else 1.0
+        self._norm = (BM25_K1 * (1 - BM25_B + BM25_B * lengths / (avgdl or 1.0))).astype(np.float32)
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {
+            term: (np.asarray(rows[term], dtype=np.int32), np.asarray(tfs[term], dtype=np.float32))
+            for term in rows
+        }
+        self.idf = {
+            term: float(np.log(1 + (n - len(r) + 0.5) / (len(r) + 0.5)))
+            for term, (r, _) in self.postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def split_compound(self, token: str) -> Tuple[str, ...]:
+        """Best two-part split whose parts both occur in the corpus, else ()."""
+        if token in self._splits:
+            return self._splits[token]
+        best: Tuple[str, ...] = ()
+        best_freq = 0
+        if len(token) >= 2 * MIN_PART and not token.isdigit():
+            for i in range(MIN_PART, len(token) - MIN_PART + 1):
+                tail = token[i:]
+                for fuge in _FUGEN:
+                    head = token[:i - len(fuge)] if fuge else token[:i]
+                    if fuge and not token[:i].endswith(fuge):
+                        continue
+                    if len(head) < MIN_PART:
+                        continue
+                    freq = min(self.vocab.get(head, 0), self.vocab.get(tail, 0))
+                    if freq > best_freq:
+                        best, best_freq = (head, tail), freq
+        if len(self._splits) < 100_000:
+            self._splits[token] = best
+        return best
+
+    def expand(self, tokens: Sequence[str]) -> List[str]:
+        out = list(tokens)
+        for t in tokens:
+            out.extend(self.split_compound(t))
+        return out
+
+    def search(
+        self,
+        query: str,
+        top_k: int,
+        namespaces: Optional[Sequence[str]] = None,
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> List[LocalMatch]:
+        terms = set(self.expand(tokenize(query)))
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        for term in terms:
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            rows, tf = posting
+            scores[rows] += self.idf[term] * tf * (BM25_K1 + 1) / (tf + self._norm[rows])
+
+        if namespaces is not None:
+            allowed = [self.ns_codes[ns] for ns in namespaces if ns in self.ns_codes]
+            scores[~np.isin(self.row_ns, allowed)] = 0
+        candidates = np.flatnonzero(scores > 0)
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        names = list(self.ns_codes)
+        facets = get_facet_index() if filter else None
+        allowed = facets.mask(filter) if facets else None
+        out: List[LocalMatch] = []
+        for row in candidates:
+            rid = self.ids[row]
+            if allowed is not None:
+                row_in_facets = facets.row_of.get(rid)
+                if row_in_facets is None or not allowed[row_in_facets]:
+                    continue
+            elif filter and not matches_filter(filter_view(rid), filter):
+                continue
+            out.append(LocalMatch(id=rid, score=float(scores[row]), namespace=names[self.row_ns[row]]))
+            if len(out) >= top_k:
+                break
+        return out
+
+
+_bm25_index: Optional[BM25Index] = None
+
+
+def get_bm25_index() -> BM25Index:
+    """Built from the loader stores on first use (call after load_text_store)."""
+    global _bm25_index
+    if _bm25_index is None:
+        _bm25_index = BM25Index(ID_TO_TEXT, ID_TO_NAMESPACE)
+        print(f"[bm25] Indexed {len(_bm25_index)} records, {len(_bm25_index.postings)} terms")
+    return _bm25_index
+
+
+def rrf_fuse(
+    vector_matches,
+    lexical_matches,
+    top_k: int,
+    k: int = RRF_K,
+    min_vector_score: float = 0.0,
+    lexical_scores: Optional[Dict[str, float]] = None,
+) -> List[LocalMatch]:
+    """
+    Reciprocal rank fusion of the two rankings. The fused rank only orders the
+    result: every match keeps its vector (cosine) score, and hits found by
+    BM25 alone take theirs from `lexical_scores` (see pinecone_search.score_ids,
+    0 if missing). Matches below `min_vector_score` neither vote nor take one
+    of the top_k slots, which build_context's SCORE_THRESHOLD would empty.
+    """
+    fused: Dict[str, float] = {}
+    cosine: Dict[str, float] = dict(lexical_scores or {})
+    namespaces: Dict[str, str] = {}
+    voting = [m for m in vector_matches if (m.score or 0) >= min_vector_score]
+    for m in voting:
+        cosine[m.id] = m.score or 0.0
+    lexical = [m for m in lexical_matches if cosine.get(m.id, 0.0) >= min_vector_score]
+    for ranking in (voting, lexical):
+        for rank, m in enumerate(ranking, start=1):
+            fused[m.id] = fused.get(m.id, 0.0) + 1.0 / (k + rank)
+            namespaces.setdefault(m.id, getattr(m, "namespace", "") or ID_TO_NAMESPACE.get(m.id, ""))
+
+    ordered = sorted(fused.items(), key=lambda x: -x[1])[:top_k]
+    return [LocalMatch(id=rid, score=cosine.get(rid, 0.0), namespace=namespaces[rid]) for rid, _ in ordered]
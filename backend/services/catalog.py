@@ -0,0 +1,254 @@
+import hashlib
+import json
+import os
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from pydantic import BaseModel
+
+from services.context_builder import SourceItem
+from services.facets import MISSING, get_facet_index, parse_credits
+from services.loader import ID_TO_META
+
+# modules per /modules page (max 200) and listed inline in an /ask answer
+CATALOG_PAGE_SIZE = int(os.getenv("CATALOG_PAGE_SIZE", "50"))
+CATALOG_ANSWER_MAX = int(os.getenv("CATALOG_ANSWER_MAX", "40"))
+
+# Catalogue of a module, from its number: BMT/BTB "W.." and the RSH
+# "Wahlmodul" ids are electives, BMI/BCSIM 1xx/2xx the elective catalogues,
+# MMI/BCSIM/MAR "05.03" the options of a selection slot, BMT "F..", the RSH
+# "Schwerpunkt" ids and the BDAISY "PF" / "D 4.1.1" modules the specialization
+# tracks. Everything else is compulsory.
+_CATALOGUE_RULES = [
+    (re.compile(p, re.IGNORECASE), catalogue) for p, catalogue in (
+        (r"^RSH_?Wahlmodul", "elective"),
+        (r"^RSH_?Schwerpunkt", "specialization"),
+        (r"^(BTB|BMT)\s*W", "elective"),
+        (r"^BMT\s*F", "specialization"),
+        (r"^(BMI|BCSIM)\s*\d{3}\b", "elective"),
+        (r"^(MMI|BCSIM|MAR)\s*\d+\.", "elective"),
+        (r"^(BDAISY_)?PF", "specialization"),
+        (r"^(BDAISY_)?D[\s_]*\d+\.\d+\.\d+", "specialization"),
+    )
+]
+CATALOGUES = ("compulsory", "elective", "specialization")
+
+_EXAM_LABELS = {
+    "de": {
+        "written_exam": "Klausur", "oral_exam": "mündliche Prüfung", "portfolio": "Portfolio",
+        "project": "Projektarbeit", "research_paper": "Hausarbeit", "presentation": "Präsentation",
+        "academic_paper": "wissenschaftliche Arbeit", "see_elective": "siehe Wahlmodul",
+    },
+    "en": {
+        "written_exam": "written exam", "oral_exam": "oral exam", "portfolio": "portfolio",
+        "project": "project work", "research_paper": "research paper", "presentation": "presentation",
+        "academic_paper": "academic paper", "see_elective": "see elective",
+    },
+}
+_SEASON_LABELS = {
+    "de": {"winter_semester": "Wintersemester", "summer_semester": "Sommersemester", "every_semester": "jedes Semester"},
+    "en": {"winter_semester": "winter semester", "summer_semester": "summer semester", "every_semester": "every semester"},
+}
+_LANGUAGE_LABELS = {
+    "de": {"de": "deutschsprachig", "en": "englischsprachig"},
+    "en": {"de": "taught in German", "en": "taught in English"},
+}
+_CATALOGUE_LABELS = {
+    "de": {"compulsory": "Pflichtmodule", "elective": "Wahlpflichtmodule", "specialization": "Schwerpunktmodule"},
+    "en": {"compulsory": "compulsory modules", "elective": "elective modules", "specialization": "specialization modules"},
+}
+
+
+class ModuleItem(BaseModel):
+    id: str
+    moduleNumber: str
+    moduleNameDe: str = ""
+    moduleNameEn: str = ""
+    studyProgramAbbrev: str = ""
+    semester: Optional[int] = None
+    season: str = ""
+    credits: Optional[float] = None
+    examType: str = ""
+    language: str = ""
+    catalogue: str = "compulsory"
+    pdfUrl: str = ""
+    pdfPageStart: int = 0
+    pdfPageEnd: int = 0
+    studyProgramUrl: str = ""
+
+    def source(self) -> SourceItem:
+        return SourceItem(
+            id=self.id,
+            moduleNumber=self.moduleNumber,
+            moduleNameDe=self.moduleNameDe,
+            moduleNameEn=self.moduleNameEn,
+            studyProgramAbbrev=self.studyProgramAbbrev,
+            season=self.season,
+            credits=f"{self.credits}" if self.credits is not None else "",
+            examType=self.examType,
+            score=1.0,
+            pdfPageStart=self.pdfPageStart,
+            pdfPageEnd=self.pdfPageEnd,
+            studyProgramUrl=self.studyProgramUrl,
+            pdfUrl=self.pdfUrl,
+        )
+
+
+def catalogue_of(module_number: str) -> str:
+    for pattern, catalogue in _CATALOGUE_RULES:
+        if pattern.match(module_number or ""):
+            return catalogue
+    return "compulsory"
+
+
+def _clean(value: Any) -> str:
+    return "" if value is None or str(value) in MISSING else str(value)
+
+
+def _semester(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _natural(value: str) -> Tuple:
+    """"BMI 9" before "BMI 10"."""
+    return tuple(int(p) if p.isdigit() else p for p in re.split(r"(\d+)", value))
+
+
+class ModuleCatalog:
+    """
+    One entry per module from the loader metadata (web records and § citation
+    records are left out), sorted by program, suggested semester and module
+    number. `query()` applies the same facet filters as retrieval (via the
+    facet bitmaps) plus program and catalogue; results are memoized, and
+    `version` changes whenever the catalog content does (used for ETags).
+    """
+
+    def __init__(self, id_to_meta: Dict[str, Dict[str, Any]]):
+        items: Dict[Tuple[str, str], ModuleItem] = {}
+        for rid, meta in id_to_meta.items():
+            meta = meta or {}
+            number = meta.get("moduleNumber")
+            if not number or "credits" not in meta:
+                continue  # web records, § citation records
+            program = meta.get("studyProgramAbbrev", "")
+            items.setdefault((program, number), ModuleItem(
+                id=rid,
+                moduleNumber=number,
+                moduleNameDe=_clean(meta.get("moduleNameDe")),
+                moduleNameEn=_clean(meta.get("moduleNameEn")),
+                studyProgramAbbrev=program,
+                semester=_semester(meta.get("semester")),
+                season=_clean(meta.get("season")),
+                credits=parse_credits(meta.get("credits")),
+                examType=_clean(meta.get("examType")).strip(),
+                language=_clean(meta.get("language")),
+                catalogue=catalogue_of(number),
+                pdfUrl=meta.get("pdf_url", "") or "",
+                pdfPageStart=int(meta.get("pdf_page_start", 0) or 0),
+                pdfPageEnd=int(meta.get("pdf_page_end", 0) or 0),
+                studyProgramUrl=meta.get("studyProgram_Url", "") or "",
+            ))
+        self.items = sorted(
+            items.values(),
+            key=lambda m: (m.studyProgramAbbrev, m.semester or 99, _natural(m.moduleNumber)),
+        )
+        self.ids = [m.id for m in self.items]
+        self.programs = sorted({m.studyProgramAbbrev for m in self.items})
+        payload = json.dumps([m.__dict__ for m in self.items], sort_keys=True)
+        self.version = hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+        self._cache: Dict[str, List[ModuleItem]] = {}
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def query(
+        self,
+        programs: Optional[Sequence[str]] = None,
+        semester: Optional[int] = None,
+        season: Optional[str] = None,
+        exam_type: Optional[str] = None,
+        min_credits: Optional[float] = None,
+        max_credits: Optional[float] = None,
+        language: Optional[str] = None,
+        catalogue: Optional[str] = None,
+    ) -> List[ModuleItem]:
+        key = json.dumps([sorted(programs or []), semester, season, exam_type, min_credits, max_credits, language, catalogue])
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        facets = get_facet_index()
+        flt = facets.filter(season, exam_type, min_credits, max_credits, language, semester)
+        allowed = facets.allows(flt, self.ids) if flt else None
+        wanted = {p.upper() for p in programs or []}
+        result = [
+            m for i, m in enumerate(self.items)
+            if (allowed is None or allowed[i])
+            and (not wanted or m.studyProgramAbbrev in wanted)
+            and (not catalogue or m.catalogue == catalogue)
+        ]
+
+        if len(self._cache) < 256:
+            self._cache[key] = result
+        return result
+
+    def etag(self, params: Dict[str, Any]) -> str:
+        """Strong ETag for one catalog view: catalog version + normalized query parameters."""
+        payload = json.dumps([self.version, params], sort_keys=True, default=str)
+        return '"' + hashlib.sha1(payload.encode("utf-8")).hexdigest()[:20] + '"'
+
+
+def format_answer(items: List[ModuleItem], lang: str, programs: Sequence[str], hints: Dict[str, Any]) -> str:
+    """Markdown module list for a catalog question (first CATALOG_ANSWER_MAX modules)."""
+    de = lang == "de"
+    labels = "de" if de else "en"
+    noun = _CATALOGUE_LABELS[labels].get(hints.get("catalogue"), "Module" if de else "modules")
+    scope = [", ".join(programs)] if programs else []
+    if hints.get("semester"):
+        scope.append(f"{hints['semester']}. Semester" if de else f"semester {hints['semester']}")
+    if hints.get("season"):
+        scope.append(_SEASON_LABELS[labels].get(hints["season"], hints["season"]))
+    if hints.get("examType"):
+        scope.append(_EXAM_LABELS[labels].get(hints["examType"], hints["examType"]))
+    low, high = hints.get("minCredits"), hints.get("maxCredits")
+    if low and low == high:
+        scope.append(f"{low:g} CP")
+    elif low or high:
+        scope.append(f"{low or 0:g}–{high:g} CP" if high else f"≥ {low:g} CP")
+    if hints.get("language"):
+        scope.append(_LANGUAGE_LABELS[labels].get(hints["language"], hints["language"]))
+
+    title = noun[:1].upper() + noun[1:]
+    header = f"**{title}** ({'; '.join(scope)}): {len(items)}" if scope else f"**{title}**: {len(items)}"
+    lines = [header, ""]
+    for m in items[:CATALOG_ANSWER_MAX]:
+        name = (m.moduleNameDe or m.moduleNameEn) if de else (m.moduleNameEn or m.moduleNameDe)
+        details = []
+        if m.credits is not None:
+            details.append(f"{m.credits:g} CP")
+        if m.semester:
+            details.append(f"{m.semester}. Semester" if de else f"semester {m.semester}")
+        if m.season:
+            details.append(_SEASON_LABELS[labels].get(m.season, m.season.replace("_", " ")))
+        if m.examType:
+            details.append(_EXAM_LABELS[labels].get(m.examType, m.examType.replace("_", " ")))
+        suffix = f" ({', '.join(details)})" if details else ""
+        lines.append(f"- {m.moduleNumber} – {name}{suffix}")
+    if len(items) > CATALOG_ANSWER_MAX:
+        more = len(items) - CATALOG_ANSWER_MAX
+        lines.append(f"- … und {more} weitere" if de else f"- … and {more} more")
+    return "\n".join(lines)
+
+
+_catalog: Optional[ModuleCatalog] = None
+
+
+def get_catalog() -> ModuleCatalog:
+    """Built from the loader metadata on first use (call after load_text_store)."""
+    global _catalog
+    if _catalog is None:
+        _catalog = ModuleCatalog(ID_TO_META)
+    return _catalog
@@ -0,0 +1,146 @@
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from services.loader import ID_TO_TEXT, ID_TO_META, ID_TO_NAMESPACE
+
+PROCESSED_PDF_PATH = Path(__file__).resolve().parent.parent / "data" / "processed_pdf"
+
+# subsections before/after the cited one that are added as context
+CITATION_NEIGHBOURS = int(os.getenv("CITATION_NEIGHBOURS", "1"))
+# cap for a whole-paragraph citation ("§ 16" without Absatz)
+CITATION_MAX_RECORDS = 6
+
+# Regulations split into "<prefix><§>_<Abs>" chunks by prep/pdf/chunk_*_paragraph.py
+REGULATIONS = {
+    "DAISY_PO21": {
+        "path": PROCESSED_PDF_PATH / "PO21_796_paragraph_chunks.jsonl",
+        "id_prefix": "DAISY_PO21_paragraph_",
+        "namespace": "DAISY_PO21_pdf",
+        "program": "BDAISY",
+        "source_file": "PO21_796.pdf",
+        "aliases": ("po21", "po 21", "po 2021", "po2021", "daisy", "bdaisy"),
+    },
+}
+
+# "§ 16 Abs. 3", "§16 (3)", "§ 18a Absatz 2", "Paragraph 16 Absatz 3", "paragraph 16 (3)"
+CITATION_PATTERN = re.compile(
+    r"(?:§|\bparagraph\b|\bparagraf\b)\s*(\d{1,3}[a-z]?)\b"
+    r"(?:\s*(?:,\s*)?(?:abs\.?|absatz|subsection|para\.?)\s*(\d{1,2})|\s*\((\d{1,2})\))?",
+    re.IGNORECASE,
+)
+
+Key = Tuple[str, str, str]  # (regulation, paragraph, subsection)
+
+
+def parse_citations(text: str) -> List[Tuple[str, Optional[str]]]:
+    """[(paragraph, subsection or None)] in order of mention; paragraph upper-cased ("18A")."""
+    out = []
+    for para, abs_word, abs_paren in CITATION_PATTERN.findall(text or ""):
+        cite = (para.upper(), abs_word or abs_paren or None)
+        if cite not in out:
+            out.append(cite)
+    return out
+
+
+class CitationIndex:
+    """
+    (regulation, paragraph, subsection) → record id for the paragraph-chunked
+    examination regulations. Records are registered in the loader stores so
+    build_context can render them like any retrieved match.
+    """
+
+    def __init__(self):
+        self.by_key: Dict[Key, str] = {}
+        # subsections per (regulation, paragraph), in document order
+        self.paragraphs: Dict[Tuple[str, str], List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.by_key)
+
+    def load(self, regulations: Dict[str, Dict] = REGULATIONS):
+        for name, conf in regulations.items():
+            path = Path(conf["path"])
+            if not path.exists():
+                print(f"[citations] Missing {path}")
+                continue
+            with path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        self.add(name, conf, json.loads(line))
+        print(f"[citations] Indexed {len(self.by_key)} subsections in {len(self.paragraphs)} paragraphs")
+
+    def add(self, regulation: str, conf: Dict, rec: Dict):
+        rid = rec.get("id", "")
+        text = (rec.get("text") or "").strip()
+        if not rid.startswith(conf["id_prefix"]) or not text:
+            return  # preamble, footer, tables
+        para, _, sub = rid[len(conf["id_prefix"]):].rpartition("_")
+        para = para.upper()
+
+        self.by_key[(regulation, para, sub)] = rid
+        self.paragraphs.setdefault((regulation, para), []).append(sub)
+
+        label = f"§ {para} Abs. {sub}" if sub != "0" else f"§ {para}"
+        ID_TO_TEXT[rid] = text
+        ID_TO_NAMESPACE[rid] = conf["namespace"]
+        ID_TO_META[rid] = {
+            "studyProgramAbbrev": conf["program"],
+            "moduleNumber": label,
+            "moduleNameDe": rec.get("paragraph", ""),
+            "moduleNameEn": rec.get("paragraph", ""),
+            "source_file": conf["source_file"],
+            "pdf_page_start": rec.get("pdf_page_start", 0),
+            "pdf_page_end": rec.get("pdf_page_end", 0),
+        }
+
+    def regulation_for(self, question: str, programs: List[str]) -> Optional[str]:
+        """
+        Regulation named in the question, or the one of a program the question
+        or request names. Otherwise None: the citation is left to retrieval
+        instead of assuming a regulation.
+        """
+        q = (question or "").lower()
+        for name, conf in REGULATIONS.items():
+            if any(alias in q for alias in conf["aliases"]) or conf["program"] in programs:
+                return name
+        return None
+
+    def lookup(self, question: str, programs: Optional[List[str]] = None) -> List[str]:
+        """Record ids for every § reference in the question, each with its neighbouring subsections."""
+        cites = parse_citations(question)
+        regulation = self.regulation_for(question, programs or []) if cites else None
+        if not regulation:
+            return []
+
+        found: List[str] = []
+        for para, sub in cites:
+            subs = self.paragraphs.get((regulation, para), [])
+            if not subs:
+                continue
+            if sub is None or sub not in subs:
+                picked = subs[:CITATION_MAX_RECORDS]
+            else:
+                i = subs.index(sub)
+                lo, hi = max(0, i - CITATION_NEIGHBOURS), i + CITATION_NEIGHBOURS + 1
+                # cited subsection first, then its neighbours in document order
+                picked = [sub] + [s for s in subs[lo:hi] if s != sub]
+            for s in picked:
+                rid = self.by_key[(regulation, para, s)]
+                if rid not in found:
+                    found.append(rid)
+        return found
+
+
+_citation_index: Optional[CitationIndex] = None
+
+
+def get_citation_index() -> CitationIndex:
+    """Loaded on first use (call after load_text_store, before the BM25 index is built)."""
+    global _citation_index
+    if _citation_index is None:
+        _citation_index = CitationIndex()
+        _citation_index.load()
+    return _citation_index
@@ -0,0 +1,114 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from typing import Any, Dict, List, Optional
+
+from services.cache import TTLCache
+
+EMBED_CACHE_SIZE = int(os.getenv("EMBED_CACHE_SIZE", "2048"))
+EMBED_CACHE_TTL = float(os.getenv("EMBED_CACHE_TTL", str(7 * 24 * 3600)))
+# SQLite file for the on-disk layer; empty disables it
+EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", "")
+
+_WS = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    """Unicode (NFKC), case and whitespace normalization for cache keys."""
+    t = unicodedata.normalize("NFKC", text or "")
+    return _WS.sub(" ", t).strip().casefold()
+
+
+def cache_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\x1f{normalize_query(text)}".encode("utf-8")).hexdigest()
+
+
+class _DiskStore:
+    """SQLite layer that keeps embeddings across restarts (float32 blobs)."""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, created REAL NOT NULL, vec BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str, ttl: float) -> Optional[List[float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT created, vec FROM embeddings WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or time.time() - row[0] > ttl:
+            return None
+        vec = array("f")
+        vec.frombytes(row[1])
+        return vec.tolist()
+
+    def set(self, key: str, vec: List[float]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO embeddings (key, created, vec) VALUES (?, ?, ?)",
+                (key, time.time(), array("f", vec).tobytes()),
+            )
+            self._conn.commit()
+
+
+class EmbeddingCache:
+    """
+    Query-embedding cache keyed on (model, normalized text): in-memory LRU with
+    TTL in front of an optional SQLite layer that survives restarts.
+    """
+
+    def __init__(self, maxsize: int = EMBED_CACHE_SIZE, ttl: float = EMBED_CACHE_TTL, path: str = EMBED_CACHE_PATH):
+        self.memory = TTLCache(maxsize, ttl)
+        self.disk = _DiskStore(path) if path else None
+        self.disk_hits = 0
+        self.misses = 0
+        self._miss_seconds = 0.0
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        key = cache_key(model, text)
+        vec = self.memory.get(key)
+        if vec is not None:
+            return vec
+        if self.disk is not None:
+            vec = self.disk.get(key, self.memory.ttl)
+            if vec is not None:
+                self.disk_hits += 1
+                self.memory.set(key, vec)
+                return vec
+        self.misses += 1
+        return None
+
+    def set(self, model: str, text: str, vec: List[float], elapsed: float = 0.0):
+        """Store a fresh embedding; `elapsed` is the API time the miss cost."""
+        self._miss_seconds += elapsed
+        if not vec:
+            return  # never cache failed embeddings
+        key = cache_key(model, text)
+        self.memory.set(key, vec)
+        if self.disk is not None:
+            self.disk.set(key, vec)
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.memory.hits + self.disk_hits
+        avg_miss = self._miss_seconds / self.misses if self.misses else 0.0
+        return {
+            "size": len(self.memory),
+            "memory_hits": self.memory.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / (hits + self.misses), 4) if hits + self.misses else 0.0,
+            "avg_miss_ms": round(avg_miss * 1000, 1),
+            "saved_seconds": round(hits * avg_miss, 3),
+        }
+
+
+EMBED_CACHE = EmbeddingCache()
@@ -1,14 +1,41 @@
 import openai
-from typing import List
+import os
+import time
+from typing import List, Optional
 import logging
 
+from services.batcher import MicroBatcher
+from services.embed_cache import EMBED_CACHE
+
 EMBED_MODEL = "text-embedding-3-large"
 
+# Concurrent aembed() calls are collected for up to EMBED_BATCH_WINDOW_MS
+# (or EMBED_BATCH_MAX texts) and sent as one embeddings request
+EMBED_BATCH_WINDOW_MS = float(os.getenv("EMBED_BATCH_WINDOW_MS", "5"))
+EMBED_BATCH_MAX = int(os.getenv("EMBED_BATCH_MAX", "64"))
+
+# Shared async client, created on first use so importing this module
+# does not require OPENAI_API_KEY to be set
+_async_client: Optional[openai.AsyncOpenAI] = None
+
+
+def get_async_client() -> openai.AsyncOpenAI:
+    global _async_client
+    if _async_client is None:
+        _async_client = openai.AsyncOpenAI()
+    return _async_client
+
 def embed(text: str) -> List[float]:
-    """Embed a single text using OpenAI Embedding API."""
+    """Embed a single text using OpenAI Embedding API (cached per normalized text)."""
+    cached = EMBED_CACHE.get(EMBED_MODEL, text)
+    if cached is not None:
+        return cached
     try:
+        start = time.perf_counter()
         res = openai.embeddings.create(model=EMBED_MODEL, input=[text])
-        return res.data[0].embedding
+        vec = res.data[0].embedding
+        EMBED_CACHE.set(EMBED_MODEL, text, vec, time.perf_counter() - start)
+        return vec
     except Exception as e:
         logging.error(f"[embedding] Error while embedding single text: {e}")
         return []
@@ -22,50 +49,32 @@ def embed_batch(texts: List[str]) -> List[List[float]]:
         logging.error(f"[embedding] Error while embedding batch: {e}")
         return [[] for _ in texts]
 
-def detect_lang(text: str) -> str:
-    """detect whether text is German or English."""
-    t = (text or "").lower()
-
-    # hint: German umlauts/ß as prio
-    if any(ch in t for ch in ("ä", "ö", "ü", "ß")):
-        return "de"
-
-    german_markers = [
-        # Question helpers 
-        "wie", "was", "wer", "wo", "warum", "wieso", "weshalb", "wann", "wem", "wen", "wohin", "woher", "wozu",
-        "werde", "werden", "bin", "bist", "sind", "seid", "sind",
-        "welche", "welcher", "welches", "gibt es", "kann ich", "ist",
-        "helfen", "hilfe", "informationen", "kontakt",
-        "finden", "suche", "suchen", "erklären", "erkläre", "erklärt",
-        "bedeuten", "bedeutet", "bedeutung",
-        "unterscheiden", "unterschied", "unterschiede",
-
-        # Uni / admin (German words)
-        "hochschule", "fachbereich", "studium", "studierende", "studierenden",
-        "studiengang", "studiengänge", "studienbüro", "erstsemester",
-        "bewerbung", "zulassung", "einschreibung", "immatrikulation",
-        "rückmeldung", "exmatrikulation",
-
-        # Semester / timing
-        "wintersemester", "sommersemester", "vorlesungszeit", "vorlesungsfreie zeit", "semesterferien",
-
-        # Modules / exams 
-        "modul", "modulhandbuch", "modulbeschreibung",
-        "prüf", "prüfungsordnung", "klausur", "mündliche prüfung", "schriftliche prüfung",
-        "hausarbeit", "leistungspunkte", "sws",
+async def _acreate_embeddings(texts: List[str]) -> List[List[float]]:
+    res = await get_async_client().embeddings.create(model=EMBED_MODEL, input=texts)
+    return [d.embedding for d in res.data]
 
-        # Teaching formats 
-        "vorlesung", "übung", "veranstaltungsverzeichnis",
 
-        # Study plan / requirements
-        "studienordnung", "studienverlaufsplan", "wahlbereich", "wahlpflicht", "pflichtmodul", "schwerpunkt",
+EMBED_BATCHER = MicroBatcher(_acreate_embeddings, EMBED_BATCH_WINDOW_MS, EMBED_BATCH_MAX)
 
-        # Theses / docs 
-        "bachelorarbeit", "masterarbeit", "zeugnis",
 
-        # Roles / misc
-        "dozent", "dozentin", "praxissemester", "formular", "richtlinie",
-    ]
-
-    return "de" if any(m in t for m in german_markers) else "en"
+async def aembed(text: str) -> List[float]:
+    """Async variant of embed() for the serving path (micro-batched with concurrent calls)."""
+    cached = EMBED_CACHE.get(EMBED_MODEL, text)
+    if cached is not None:
+        return cached
+    try:
+        start = time.perf_counter()
+        vec = await EMBED_BATCHER.submit(text)
+        EMBED_CACHE.set(EMBED_MODEL, text, vec, time.perf_counter() - start)
+        return vec
+    except Exception as e:
+        logging.error(f"[embedding] Error while embedding single text: {e}")
+        return []
 
+async def aembed_batch(texts: List[str]) -> List[List[float]]:
+    """Async variant of embed_batch()."""
+    try:
+        return await _acreate_embeddings(texts)
+    except Exception as e:
+        logging.error(f"[embedding] Error while embedding batch: {e}")
+        return [[] for _ in texts]
@@ -0,0 +1,158 @@
+import json
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from services.loader import ID_TO_META
+
+# Pinecone metadata field (as uploaded from the merged records) → loader field
+FACET_FIELDS = {
+    "offeredInSeason": "season",
+    "examType": "examType",
+    "creditPoints": "credits",
+    "heldInLanguage": "language",
+    "suggestedSemester": "semester",
+}
+# placeholders the uploaders write for missing values (sanitize_metadata: None → "no data")
+MISSING = {"", " ", "no data", "none", "to_be_announced"}
+# a module offered every semester is also offered in winter and in summer
+SEASON_VALUES = {
+    "winter_semester": ["winter_semester", "every_semester"],
+    "summer_semester": ["summer_semester", "every_semester"],
+    "every_semester": ["every_semester"],
+}
+# filter value no record has: a credit range without stored values must match
+# nothing, and Pinecone rejects an empty $in
+NO_MATCH = "__no_match__"
+
+
+def parse_credits(value: Any) -> Optional[float]:
+    try:
+        return float(str(value).replace(",", ".").split()[0])
+    except (ValueError, IndexError):
+        return None
+
+
+def filter_view(rid: str) -> Dict[str, Any]:
+    """Loader metadata under the Pinecone field names build_filter refers to."""
+    meta = dict(ID_TO_META.get(rid, {}) or {})
+    for remote, local in FACET_FIELDS.items():
+        meta[remote] = meta.get(local)
+    return meta
+
+
+def language_values(value: str) -> List[str]:
+    """"en" also matches "en_on_demand"."""
+    return [value, f"{value}_on_demand"]
+
+
+class FacetIndex:
+    """
+    Boolean masks over the loader records for every value of the facet fields
+    (season, exam type, language, suggested semester, CP). build_filter turns
+    normalized filter arguments into a Pinecone filter on the raw uploaded
+    fields, and `mask()` evaluates such a filter locally by OR-ing the value
+    masks of each field and AND-ing the fields.
+    """
+
+    def __init__(self, id_to_meta: Dict[str, Dict[str, Any]]):
+        self.ids = list(id_to_meta)
+        self.row_of = {rid: i for i, rid in enumerate(self.ids)}
+        self.masks: Dict[str, Dict[Any, np.ndarray]] = {}
+        for remote, local in FACET_FIELDS.items():
+            by_value: Dict[Any, np.ndarray] = {}
+            for row, rid in enumerate(self.ids):
+                value = (id_to_meta[rid] or {}).get(local)
+                if value is None or value in MISSING:
+                    continue
+                mask = by_value.get(value)
+                if mask is None:
+                    mask = by_value[value] = np.zeros(len(self.ids), dtype=bool)
+                mask[row] = True
+            self.masks[remote] = by_value
+        self._cache: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            field: {str(v): int(m.sum()) for v, m in by_value.items()}
+            for field, by_value in self.masks.items()
+        }
+
+    def filter(
+        self,
+        season: Optional[str] = None,
+        exam_type: Optional[str] = None,
+        min_credits: Optional[float] = None,
+        max_credits: Optional[float] = None,
+        language: Optional[str] = None,
+        semester: Optional[int] = None,
+    ) -> Optional[Dict[str, Any]]:
+        f: Dict[str, Any] = {}
+        if season:
+            f["offeredInSeason"] = {"$in": SEASON_VALUES.get(season, [season])}
+        if exam_type:
+            f["examType"] = {"$eq": exam_type}
+        if language:
+            f["heldInLanguage"] = {"$in": language_values(language)}
+        if semester:
+            f["suggestedSemester"] = {"$eq": int(semester)}
+        if min_credits or max_credits:
+            # creditPoints is uploaded as a string ("5.0"): list the stored values in range
+            values = [
+                v for v in self.masks["creditPoints"]
+                if (c := parse_credits(v)) is not None
+                and (not min_credits or c >= min_credits)
+                and (not max_credits or c <= max_credits)
+            ]
+            f["creditPoints"] = {"$in": sorted(values, key=parse_credits) or [NO_MATCH]}
+        return f or None
+
+    def mask(self, flt: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """
+        Rows matching a filter over the facet fields ($eq / $in only), or None
+        when the filter uses anything else (evaluate it with matches_filter).
+        """
+        if not flt:
+            return None
+        key = json.dumps(flt, sort_keys=True)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        result = np.ones(len(self.ids), dtype=bool)
+        for field, cond in flt.items():
+            by_value = self.masks.get(field)
+            if by_value is None or not isinstance(cond, dict) or set(cond) - {"$eq", "$in"}:
+                return None
+            values = [cond["$eq"]] if "$eq" in cond else cond.get("$in", [])
+            field_mask = np.zeros(len(self.ids), dtype=bool)
+            for v in values:
+                if v in by_value:
+                    field_mask |= by_value[v]
+            result &= field_mask
+
+        if len(self._cache) < 256:
+            self._cache[key] = result
+        return result
+
+    def allows(self, flt: Optional[Dict[str, Any]], ids: List[str]) -> Optional[np.ndarray]:
+        """mask() for an arbitrary id list (ids unknown to the index never match)."""
+        mask = self.mask(flt)
+        if mask is None:
+            return None
+        rows = np.fromiter((self.row_of.get(rid, -1) for rid in ids), dtype=np.int64, count=len(ids))
+        return np.where(rows >= 0, mask[rows], False)
+
+
+_facet_index: Optional[FacetIndex] = None
+
+
+def get_facet_index() -> FacetIndex:
+    """Built from the loader metadata on first use (call after load_text_store)."""
+    global _facet_index
+    if _facet_index is None:
+        _facet_index = FacetIndex(ID_TO_META)
+    return _facet_index
@@ -0,0 +1,139 @@
+import os
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.local_index import LocalIndex
+from services import vector_snapshot
+from services.vector_snapshot import VectorSnapshot
+
+# 0 = about 4 * sqrt(n) coarse lists
+IVF_NLIST = int(os.getenv("IVF_NLIST", "0"))
+IVF_NPROBE = int(os.getenv("IVF_NPROBE", "8"))
+IVF_TRAIN_ITERS = int(os.getenv("IVF_TRAIN_ITERS", "20"))
+IVF_TRAIN_SAMPLE = 50_000
+IVF_FILE = "ivf.npz"
+
+
+def default_nlist(n: int) -> int:
+    return IVF_NLIST or max(1, int(4 * np.sqrt(n)))
+
+
+def spherical_kmeans(x: np.ndarray, k: int, iters: int = IVF_TRAIN_ITERS, seed: int = 0) -> np.ndarray:
+    """Unit-norm centroids for L2-normalized rows (cosine k-means)."""
+    rng = np.random.default_rng(seed)
+    if len(x) > IVF_TRAIN_SAMPLE:
+        x = x[np.sort(rng.choice(len(x), IVF_TRAIN_SAMPLE, replace=False))]
+    x = np.asarray(x, dtype=np.float32)
+    k = max(1, min(k, len(x)))
+    centroids = x[rng.choice(len(x), k, replace=False)].copy()
+    for _ in range(iters):
+        assign = np.argmax(x @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, x)
+        empty = np.bincount(assign, minlength=k) == 0
+        # reseed empty lists with random rows instead of dropping them
+        sums[empty] = x[rng.choice(len(x), int(empty.sum()))]
+        centroids = LocalIndex.normalize(sums)
+    return centroids
+
+
+class IVFIndex(LocalIndex):
+    """
+    Inverted-file ANN index: rows are bucketed under their nearest k-means
+    centroid and a query only scores the rows of its `nprobe` closest lists
+    (exactly, against the full matrix). Namespace and filter restrictions are
+    applied to the probed lists; when they leave fewer than top_k candidates,
+    more lists are probed until enough are found.
+    """
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        offsets: Dict[str, Tuple[int, int]],
+        matrix: np.ndarray,
+        centroids: Optional[np.ndarray] = None,
+        nprobe: int = IVF_NPROBE,
+    ):
+        super().__init__(ids, offsets, matrix)
+        self.nprobe = nprobe
+        if centroids is None:
+            centroids = spherical_kmeans(np.asarray(self.matrix, dtype=np.float32), default_nlist(len(self.ids)))
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.assignments = self._assign(self.matrix)
+        self._build_lists()
+
+    def _assign(self, vectors: np.ndarray, chunk: int = 8192) -> np.ndarray:
+        out = np.empty(len(vectors), dtype=np.int32)
+        for i in range(0, len(vectors), chunk):
+            block = np.asarray(vectors[i:i + chunk], dtype=np.float32)
+            out[i:i + chunk] = np.argmax(block @ self.centroids.T, axis=1)
+        return out
+
+    def _build_lists(self):
+        # rows grouped by list: list c is self._list_rows[self._list_start[c]:self._list_start[c + 1]]
+        self._list_rows = np.argsort(self.assignments, kind="stable")
+        counts = np.bincount(self.assignments, minlength=len(self.centroids))
+        self._list_start = np.concatenate([[0], np.cumsum(counts)])
+
+    def _select(self, q: np.ndarray, rows: np.ndarray, boost: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        row_boost = np.zeros(len(self.ids), dtype=np.float32)
+        row_boost[rows] = boost  # 0 = not allowed (other namespace / filtered out)
+
+        order = np.argsort(-(self.centroids @ q))
+        probed = min(self.nprobe, len(order))
+        cand = self._candidates(order[:probed], row_boost)
+        while len(cand) < k and probed < len(order):
+            cand = np.concatenate([cand, self._candidates(order[probed:probed + self.nprobe], row_boost)])
+            probed += self.nprobe
+        if not len(cand):
+            return cand, np.zeros(0, dtype=np.float32)
+
+        scores = np.asarray(self.matrix[cand] @ q.astype(self.matrix.dtype)) * row_boost[cand]
+        top = np.argsort(-scores, kind="stable")[:k]
+        return cand[top], scores[top]
+
+    def _candidates(self, lists: np.ndarray, row_boost: np.ndarray) -> np.ndarray:
+        if not len(lists):
+            return np.zeros(0, dtype=np.int64)
+        cand = np.concatenate([self._list_rows[self._list_start[c]:self._list_start[c + 1]] for c in lists])
+        return np.sort(cand[row_boost[cand] > 0])
+
+    def save(self, path: Path):
+        np.savez(path, centroids=self.centroids, assignments=self.assignments)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: VectorSnapshot, nprobe: int = IVF_NPROBE) -> "IVFIndex":
+        """
+        Load the lists stored next to the snapshot. A new snapshot reuses the
+        centroids of the previous one (rows are only reassigned); k-means runs
+        when no earlier IVF file fits (other dimension, or the corpus outgrew
+        its number of lists). There is no in-place insert: newly uploaded
+        records reach the lists through the next snapshot the uploaders build.
+        """
+        own = snapshot.path / IVF_FILE
+        if own.exists():
+            data = np.load(own)
+            if len(data["assignments"]) == len(snapshot.ids):
+                index = cls.__new__(cls)
+                LocalIndex.__init__(index, snapshot.ids, snapshot.offsets, snapshot.matrix)
+                index.nprobe = nprobe
+                index.centroids = data["centroids"]
+                index.assignments = data["assignments"]
+                index._build_lists()
+                return index
+
+        centroids = None
+        for previous in sorted(vector_snapshot.SNAPSHOTS_DIR.glob(f"*/{IVF_FILE}"), reverse=True):
+            stored = np.load(previous)["centroids"]
+            if stored.shape[1] == snapshot.matrix.shape[1] and 2 * len(stored) >= default_nlist(len(snapshot.ids)):
+                centroids = stored
+                break
+
+        index = cls(snapshot.ids, snapshot.offsets, snapshot.matrix, centroids=centroids, nprobe=nprobe)
+        try:
+            index.save(own)
+        except OSError as e:
+            print(f"[ivf_index] Could not save {own}: {e}")
+        return index
@@ -5,6 +5,7 @@ from typing import Dict, Any
 # Global inmemory stores
 ID_TO_TEXT: Dict[str, str] = {}
 ID_TO_META: Dict[str, Dict[str, Any]] = {}
+ID_TO_NAMESPACE: Dict[str, str] = {}
 AVAILABLE_NAMESPACES = []
 
 #  Paths 
@@ -32,6 +33,7 @@ def load_text_store():
                 if not text:
                     continue
                 ID_TO_TEXT[rid] = text
+                ID_TO_NAMESPACE[rid] = namespace
 
                 meta = rec.get("metadata") or {}
                 ID_TO_META[rid] = {
@@ -42,6 +44,8 @@ def load_text_store():
                     "season": meta.get("offeredInSeason", ""),
                     "credits": meta.get("creditPoints", ""),
                     "examType": meta.get("examType", ""),
+                    "language": meta.get("heldInLanguage", ""),
+                    "semester": meta.get("suggestedSemester", ""),
                     "source_file": meta.get("source_file", ""),
                     "pdf_page_start": meta.get("pdf_page_start", 0),
                     "pdf_page_end": meta.get("pdf_page_end", 0),
@@ -72,6 +76,7 @@ def load_text_store():
                         if not txt:
                             continue
                         ID_TO_TEXT[rid] = txt
+                        ID_TO_NAMESPACE[rid] = namespace
                         meta = rec.get("metadata") or {}
                         ID_TO_META[rid] = {
                             "studyProgramAbbrev": prog or "FBM",
@@ -89,6 +94,7 @@ def load_text_store():
                     rid = data.get("id")
                     if rid and data.get("text"):
                         ID_TO_TEXT[rid] = data["text"]
+                        ID_TO_NAMESPACE[rid] = namespace
                         ID_TO_META[rid] = {
                             "studyProgramAbbrev": prog or "FBM",
                             "category": meta.get("category", ""),
@@ -0,0 +1,221 @@
+import json
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.loader import ID_TO_TEXT, AVAILABLE_NAMESPACES
+from services.metadata_filter import matches_filter
+from services.facets import filter_view, get_facet_index
+from services.vector_snapshot import VectorSnapshot, save_part, build_snapshot
+
+PROGRAM_BOOST = 1.05
+
+
+@dataclass
+class LocalMatch:
+    """Same fields build_context reads from a Pinecone match."""
+    id: str
+    score: float
+    namespace: str = ""
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+class LocalIndex:
+    """
+    Exact in-process vector index with the same interface as
+    search_all_namespaces().
+
+    All vectors live in one contiguous L2-normalized matrix (float32, or the
+    memory-mapped snapshot matrix) where each namespace is a row range (`offsets`). A query is one matrix-vector product
+    plus argpartition; metadata filters from build_filter are evaluated
+    locally and matches from the user's program get the same 1.05 boost.
+    """
+
+    def __init__(self, ids: Sequence[str], offsets: Dict[str, Tuple[int, int]], matrix: np.ndarray):
+        self.ids = list(ids)
+        self.offsets = dict(offsets)
+        self.matrix = matrix
+        self.row_ns = np.empty(len(self.ids), dtype=object)
+        for ns, (start, end) in self.offsets.items():
+            self.row_ns[start:end] = ns
+        self._filter_masks: Dict[str, np.ndarray] = {}
+        self._row_of: Optional[Dict[str, int]] = None
+
+    @staticmethod
+    def normalize(matrix: np.ndarray) -> np.ndarray:
+        matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    @classmethod
+    def from_namespaces(cls, vectors_by_ns: Dict[str, Tuple[List[str], np.ndarray]]) -> "LocalIndex":
+        """Build from {namespace: (ids, vectors)}; namespaces become contiguous row ranges."""
+        ids: List[str] = []
+        offsets: Dict[str, Tuple[int, int]] = {}
+        blocks = []
+        for ns in sorted(vectors_by_ns):
+            ns_ids, vecs = vectors_by_ns[ns]
+            if not ns_ids:
+                continue
+            offsets[ns] = (len(ids), len(ids) + len(ns_ids))
+            ids.extend(ns_ids)
+            blocks.append(np.asarray(vecs, dtype=np.float32))
+        matrix = np.vstack(blocks) if blocks else np.zeros((0, 0), dtype=np.float32)
+        return cls(ids, offsets, cls.normalize(matrix))
+
+    @classmethod
+    def from_snapshot(cls, snapshot: VectorSnapshot) -> "LocalIndex":
+        """Serve straight from the memory-mapped snapshot matrix (already normalized)."""
+        return cls(snapshot.ids, snapshot.offsets, snapshot.matrix)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _rows(self, namespaces: Sequence[str]) -> Tuple[np.ndarray, List[str]]:
+        """Row ids for the namespaces, plus the namespace of each row range."""
+        ranges = [(ns, self.offsets[ns]) for ns in dict.fromkeys(namespaces) if ns in self.offsets]
+        if not ranges:
+            return np.zeros(0, dtype=np.int64), []
+        rows = np.concatenate([np.arange(s, e) for _, (s, e) in ranges])
+        return rows, [ns for ns, _ in ranges]
+
+    def _filter_mask(self, flt: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        if not flt:
+            return None
+        key = json.dumps(flt, sort_keys=True)
+        mask = self._filter_masks.get(key)
+        if mask is None:
+            # facet bitmaps for build_filter filters, per-record evaluation otherwise
+            mask = get_facet_index().allows(flt, self.ids)
+            if mask is None:
+                mask = np.fromiter((matches_filter(filter_view(rid), flt) for rid in self.ids), dtype=bool, count=len(self.ids))
+            if len(self._filter_masks) < 256:
+                self._filter_masks[key] = mask
+        return mask
+
+    def _select(self, q: np.ndarray, rows: np.ndarray, boost: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k (rows, boosted scores) among candidate rows, exact."""
+        scores = np.asarray(self.matrix @ q.astype(self.matrix.dtype))[rows] * boost
+        if k < len(rows):
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(rows))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return rows[top], scores[top]
+
+    def search(
+        self,
+        vector: List[float],
+        top_k: int,
+        filter: Optional[Dict[str, Any]] = None,
+        program: Optional[str] = None,
+        namespaces: Optional[List[str]] = None
+    ) -> List[LocalMatch]:
+        if not vector or not len(self.ids) or top_k <= 0:
+            return []
+        q = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(q))
+        if not norm:
+            return []
+        q /= norm
+
+        rows, _ = self._rows(namespaces or AVAILABLE_NAMESPACES or list(self.offsets))
+        mask = self._filter_mask(filter)
+        if mask is not None:
+            rows = rows[mask[rows]]
+        if not len(rows):
+            return []
+
+        # Small bias boost for matches from the user's study program
+        if program:
+            boost = np.where([ns.startswith(program) for ns in self.row_ns[rows]], PROGRAM_BOOST, 1.0)
+        else:
+            boost = np.ones(len(rows))
+
+        top_rows, top_scores = self._select(q, rows, boost.astype(np.float32), top_k)
+        return [
+            LocalMatch(id=self.ids[r], score=float(s), namespace=self.row_ns[r])
+            for r, s in zip(top_rows, top_scores)
+        ]
+
+    def score_ids(self, vector: List[float], ids: Sequence[str], program: Optional[str] = None) -> Dict[str, float]:
+        """Boosted cosine of the query with each of `ids` the index holds, at full precision."""
+        if self._row_of is None:
+            self._row_of = {rid: row for row, rid in enumerate(self.ids)}
+        rows = np.array([self._row_of[rid] for rid in ids if rid in self._row_of], dtype=np.int64)
+        q = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(q))
+        if not len(rows) or not norm:
+            return {}
+        scores = np.asarray(self.matrix[rows], dtype=np.float32) @ (q / norm)
+        return {
+            self.ids[r]: float(s) * (PROGRAM_BOOST if program and self.row_ns[r].startswith(program) else 1.0)
+            for r, s in zip(rows, scores)
+        }
+
+
+class RescoringIndex(LocalIndex, ABC):
+    """
+    Two-stage search: cheap approximate scores (compact codes, truncated
+    dimensions, ...) pick a shortlist, which is rescored exactly against the
+    full-precision (memory-mapped) rows. Subclasses provide
+    `_approx_scores()`, `shortlist_size()` and `code_bytes()`.
+    """
+
+    @abstractmethod
+    def _approx_scores(self, q: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """First-stage scores of `rows` for the normalized query."""
+
+    @abstractmethod
+    def shortlist_size(self, k: int) -> int:
+        """Rows rescored exactly for a top-k search."""
+
+    def _select(self, q: np.ndarray, rows: np.ndarray, boost: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        n_short = min(len(rows), max(k, self.shortlist_size(k)))
+        approx = self._approx_scores(q, rows) * boost
+        if n_short < len(rows):
+            short = np.argpartition(-approx, n_short - 1)[:n_short]
+        else:
+            short = np.arange(len(rows))
+
+        cand = rows[short]
+        exact = np.asarray(self.matrix[cand] @ q.astype(self.matrix.dtype)) * boost[short]
+        top = np.argsort(-exact, kind="stable")[:k]
+        return cand[top], exact[top]
+
+    @abstractmethod
+    def code_bytes(self) -> int:
+        """RAM held by the first-stage data (the full matrix stays memory-mapped)."""
+
+
+def export_from_pinecone(index, namespaces: Sequence[str], model: str, batch_size: int = 100):
+    """Pull every stored vector from Pinecone into snapshot parts (no re-embedding)."""
+    for ns in namespaces:
+        ids: List[str] = []
+        for page in index.list(namespace=ns):
+            # older clients yield plain id lists, newer ones ListResponse objects
+            ids.extend(page if isinstance(page, list) else [v.id for v in page.vectors])
+
+        found_ids: List[str] = []
+        vecs: List[List[float]] = []
+        for i in range(0, len(ids), batch_size):
+            res = index.fetch(ids=ids[i:i + batch_size], namespace=ns)
+            for rid, vec in res.vectors.items():
+                found_ids.append(rid)
+                vecs.append(vec.values)
+        # the uploaded text is not stored in Pinecone; hash the loader text instead
+        save_part(ns, found_ids, [ID_TO_TEXT.get(rid, "") for rid in found_ids], vecs, model)
+    return build_snapshot()
+
+
+if __name__ == "__main__":
+    # python -m services.local_index  → snapshot of the vectors currently in Pinecone
+    from services.loader import load_text_store
+    from services.embeddings import EMBED_MODEL
+    from services.pinecone_search import get_index
+
+    load_text_store()
+    export_from_pinecone(get_index(), AVAILABLE_NAMESPACES, EMBED_MODEL)
@@ -0,0 +1,34 @@
+import os
+
+import numpy as np
+
+from services.local_index import LocalIndex, RescoringIndex
+
+# text-embedding-3 vectors stay meaningful when cut to their leading dims
+MATRYOSHKA_DIM = int(os.getenv("MATRYOSHKA_DIM", "256"))
+MATRYOSHKA_SHORTLIST = int(os.getenv("MATRYOSHKA_SHORTLIST", "64"))
+
+
+class MatryoshkaIndex(RescoringIndex):
+    """
+    Scores a renormalized prefix of each vector (the same thing the API
+    returns for `dimensions=MATRYOSHKA_DIM`) and rescores the best
+    MATRYOSHKA_SHORTLIST rows at full dimension.
+    """
+
+    def __init__(self, *args, dim: int = MATRYOSHKA_DIM, shortlist: int = MATRYOSHKA_SHORTLIST, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.dim = min(dim, self.matrix.shape[1])
+        self.shortlist = shortlist
+        self.prefix = LocalIndex.normalize(self.matrix[:, :self.dim])
+
+    def _approx_scores(self, q: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        head = q[:self.dim]
+        norm = float(np.linalg.norm(head))
+        return self.prefix[rows] @ (head / norm if norm else head)
+
+    def shortlist_size(self, k: int) -> int:
+        return self.shortlist
+
+    def code_bytes(self) -> int:
+        return self.prefix.nbytes
@@ -0,0 +1,50 @@
+import re
+from typing import Dict, List, Optional
+
+from services.loader import ID_TO_META
+from services.query_analyzer import analyze_query
+
+
+def module_key(value: str) -> str:
+    """"BMI 10", "bmi10", "BCSIM_10" → "BMI10"."""
+    return re.sub(r"[\s_]+", "", value or "").upper()
+
+
+class ModuleIdIndex:
+    """moduleNumber / record id → record ids, for questions that name a module."""
+
+    def __init__(self, id_to_meta: Dict[str, Dict]):
+        self.by_key: Dict[str, List[str]] = {}
+        for rid, meta in id_to_meta.items():
+            number = (meta or {}).get("moduleNumber")
+            if not number:
+                continue  # web records
+            for key in {module_key(number), module_key(rid)}:
+                self.by_key.setdefault(key, []).append(rid)
+
+    def __len__(self) -> int:
+        return len(self.by_key)
+
+    def find(self, question: str) -> List[str]:
+        """
+        Record ids of every module named in the question, in order of mention.
+        Candidates come from the QueryAnalyzer (the chunkers' id grammar) and
+        only count when they are in the index.
+        """
+        found: List[str] = []
+        for key in analyze_query(question or "").module_keys:
+            for rid in self.by_key.get(key, []):
+                if rid not in found:
+                    found.append(rid)
+        return found
+
+
+_module_index: Optional[ModuleIdIndex] = None
+
+
+def get_module_index() -> ModuleIdIndex:
+    """Built from the loader metadata on first use (call after load_text_store)."""
+    global _module_index
+    if _module_index is None:
+        _module_index = ModuleIdIndex(ID_TO_META)
+    return _module_index
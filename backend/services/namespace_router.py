@@ -0,0 +1,151 @@
+import os
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from services.ivf_index import spherical_kmeans
+from services.local_index import LocalIndex
+from services.vector_snapshot import VectorSnapshot, load_snapshot
+
+# "1"/"0": route full fan-out searches to the namespaces nearest to the query
+NAMESPACE_ROUTER = os.getenv("NAMESPACE_ROUTER", "1") == "1"
+# k-means prototypes per namespace (1 = the namespace centroid)
+ROUTER_PROTOTYPES = int(os.getenv("ROUTER_PROTOTYPES", "4"))
+# at most this many namespaces are searched when routing succeeds
+ROUTER_TOP_N = int(os.getenv("ROUTER_TOP_N", "4"))
+# namespaces within this cosine margin of the best one are kept; more than
+# ROUTER_TOP_N of them (or a best score below ROUTER_MIN_SCORE) means low
+# confidence, and the full fan-out is searched
+ROUTER_MARGIN = float(os.getenv("ROUTER_MARGIN", "0.05"))
+ROUTER_MIN_SCORE = float(os.getenv("ROUTER_MIN_SCORE", "0.3"))
+# share of routed queries that are also searched with the full fan-out to
+# measure the recall routing costs
+ROUTER_AUDIT_RATE = float(os.getenv("ROUTER_AUDIT_RATE", "0.05"))
+
+
+@dataclass
+class RouteDecision:
+    namespaces: List[str]
+    candidates: List[str]
+    # best prototype similarity per scored namespace, highest first
+    scores: Dict[str, float] = field(default_factory=dict)
+    routed: bool = False
+    reason: str = ""
+
+    @property
+    def saved(self) -> int:
+        return len(self.candidates) - len(self.namespaces)
+
+
+class NamespaceRouter:
+    """
+    Per-namespace k-means prototypes of the corpus vectors. A query is scored
+    against every prototype (one small matmul); its namespace score is the
+    best prototype similarity. Namespaces without prototypes (not in the
+    snapshot) are always searched.
+    """
+
+    def __init__(
+        self,
+        prototypes: Dict[str, np.ndarray],
+        top_n: int = ROUTER_TOP_N,
+        margin: float = ROUTER_MARGIN,
+        min_score: float = ROUTER_MIN_SCORE,
+    ):
+        self.top_n = top_n
+        self.margin = margin
+        self.min_score = min_score
+        self.namespaces = sorted(prototypes)
+        blocks = [np.asarray(prototypes[ns], dtype=np.float32) for ns in self.namespaces]
+        self.matrix = np.vstack(blocks) if blocks else np.zeros((0, 0), dtype=np.float32)
+        # prototype row → namespace position
+        self.owner = np.concatenate([np.full(len(b), i) for i, b in enumerate(blocks)]) if blocks else np.zeros(0, int)
+        self.routed = 0
+        self.fallbacks: Dict[str, int] = {}
+        self.queries_saved = 0
+        self.queries_total = 0
+        self.audits: Deque[float] = deque(maxlen=1000)
+
+    def __len__(self) -> int:
+        return len(self.namespaces)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: VectorSnapshot, prototypes: int = ROUTER_PROTOTYPES, **kwargs) -> "NamespaceRouter":
+        protos = {
+            ns: spherical_kmeans(np.asarray(snapshot.matrix[start:end], dtype=np.float32), prototypes)
+            for ns, (start, end) in snapshot.offsets.items()
+            if end > start
+        }
+        return cls(protos, **kwargs)
+
+    def scores(self, vector: Sequence[float]) -> Dict[str, float]:
+        q = LocalIndex.normalize(np.asarray(vector, dtype=np.float32)[None, :])[0]
+        best = np.full(len(self.namespaces), -1.0, dtype=np.float32)
+        np.maximum.at(best, self.owner, self.matrix @ q)
+        return {ns: float(s) for ns, s in zip(self.namespaces, best)}
+
+    def route(self, vector: Sequence[float], candidates: Sequence[str]) -> RouteDecision:
+        """The candidates worth searching for this query vector, or all of them on low confidence."""
+        candidates = list(dict.fromkeys(candidates))
+        known = [ns for ns in candidates if ns in self.namespaces]
+        unknown = [ns for ns in candidates if ns not in self.namespaces]
+        if len(known) <= self.top_n:
+            decision = RouteDecision(candidates, candidates, reason="few_candidates")
+            return self._record(decision)
+
+        all_scores = self.scores(vector)
+        ranked = sorted(known, key=lambda ns: -all_scores[ns])
+        scores = {ns: round(all_scores[ns], 4) for ns in ranked}
+        best = all_scores[ranked[0]]
+        close = [ns for ns in ranked if all_scores[ns] >= best - self.margin]
+        if best < self.min_score:
+            decision = RouteDecision(candidates, candidates, scores, reason="low_score")
+        elif len(close) > self.top_n:
+            decision = RouteDecision(candidates, candidates, scores, reason="no_margin")
+        else:
+            kept = set(close + unknown)
+            decision = RouteDecision([ns for ns in candidates if ns in kept], candidates, scores, routed=True)
+        return self._record(decision)
+
+    def _record(self, decision: RouteDecision) -> RouteDecision:
+        self.queries_total += len(decision.candidates)
+        if decision.routed:
+            self.routed += 1
+            self.queries_saved += decision.saved
+        else:
+            self.fallbacks[decision.reason] = self.fallbacks.get(decision.reason, 0) + 1
+        return decision
+
+    def record_audit(self, routed_ids: Sequence[str], full_ids: Sequence[str]):
+        """Recall of a routed search against the full fan-out for the same query."""
+        if full_ids:
+            self.audits.append(len(set(routed_ids) & set(full_ids)) / len(full_ids))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "namespaces": len(self.namespaces),
+            "routed": self.routed,
+            "fallbacks": dict(self.fallbacks),
+            "queries_saved": self.queries_saved,
+            "queries_total": self.queries_total,
+            "audits": len(self.audits),
+            "audit_recall": round(float(np.mean(self.audits)), 4) if self.audits else None,
+        }
+
+
+_router: Optional[NamespaceRouter] = None
+
+
+def get_namespace_router() -> NamespaceRouter:
+    """
+    Prototypes from the CURRENT vector snapshot, built on first use. Without a
+    snapshot the router knows no namespace and never narrows a search.
+    """
+    global _router
+    if _router is None:
+        snapshot = load_snapshot()
+        _router = NamespaceRouter.from_snapshot(snapshot) if snapshot else NamespaceRouter({})
+        print(f"[router] {len(_router)} namespaces, {len(_router.matrix)} prototypes")
+    return _router
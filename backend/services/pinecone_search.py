@@ -1,34 +1,137 @@
 import os
-from typing import Dict, Any, Optional, List
+import asyncio
+from typing import Dict, Any, Optional, List, Sequence
+
+import numpy as np
 from dotenv import load_dotenv
 from pinecone import Pinecone
 
-from services.loader import AVAILABLE_NAMESPACES
+from services.loader import AVAILABLE_NAMESPACES, ID_TO_NAMESPACE, ID_TO_TEXT
+from services.local_index import PROGRAM_BOOST, LocalIndex, LocalMatch, export_from_pinecone
+from services.quantized_index import Int8Index, BinaryIndex
+from services.matryoshka_index import MatryoshkaIndex
+from services.ivf_index import IVFIndex
+from services.vector_snapshot import load_snapshot
+from services.facets import get_facet_index
+from services.result_merge import fetch_k, merge_matches, merge_single
+from services.single_index import PINECONE_LAYOUT, PINECONE_SINGLE_NAMESPACE, combine_filters, namespace_filter, target_namespace
 
 load_dotenv()
-pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
-index = pc.Index(os.getenv("PINECONE_INDEX"))
+
+# "pinecone" (remote, default) or "local" (in-process NumPy index)
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "pinecone").lower()
+# local backend only: "exact", "int8"/"binary" (quantized) or "matryoshka"
+# (truncated dims), which rescore a shortlist at full precision, or "ivf"
+# (k-means inverted lists, persisted next to the snapshot)
+LOCAL_SEARCH_MODE = os.getenv("LOCAL_SEARCH_MODE", "exact").lower()
+
+LOCAL_INDEX_TYPES = {
+    "exact": LocalIndex,
+    "int8": Int8Index,
+    "binary": BinaryIndex,
+    "matryoshka": MatryoshkaIndex,
+    "ivf": IVFIndex,
+}
+
+# "0" (default): queries return ids + scores only and matches are rehydrated
+# from the loader stores, which build_context reads anyway; "1": Pinecone
+# returns the stored metadata with every match
+PINECONE_INCLUDE_METADATA = os.getenv("PINECONE_INCLUDE_METADATA", "0") == "1"
+
+# searches issue one query per namespace (what the namespace router narrows down)
+FAN_OUT = SEARCH_BACKEND != "local" and PINECONE_LAYOUT != "single"
+
+# Pinecone client + index handle, created on first query so the API (and tests)
+# can be imported without network access
+_index = None
+
+
+def get_index():
+    global _index
+    if _index is None:
+        pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
+        _index = pc.Index(os.getenv("PINECONE_INDEX"))
+    return _index
+
+_local_index: Optional[LocalIndex] = None
+
+
+def get_local_index() -> LocalIndex:
+    """
+    Memory-map the CURRENT vector snapshot written at ingestion time. If none
+    exists yet, one is exported from Pinecone first (no re-embedding).
+    """
+    global _local_index
+    if _local_index is None:
+        snapshot = load_snapshot()
+        if snapshot is None:
+            from services.embeddings import EMBED_MODEL
+            export_from_pinecone(get_index(), AVAILABLE_NAMESPACES, EMBED_MODEL)
+            snapshot = load_snapshot()
+        _local_index = LOCAL_INDEX_TYPES[LOCAL_SEARCH_MODE].from_snapshot(snapshot)
+        print(
+            f"[local_index] snapshot {snapshot.version} ({LOCAL_SEARCH_MODE}): "
+            f"{len(_local_index)} vectors across {len(_local_index.offsets)} namespaces"
+        )
+    return _local_index
+
+
+# Max number of namespace queries in flight at once (shared by all requests)
+SEARCH_CONCURRENCY = int(os.getenv("SEARCH_CONCURRENCY", "8"))
+_query_slots = asyncio.Semaphore(SEARCH_CONCURRENCY)
 
 def build_filter(
     season: Optional[str] = None,
     exam_type: Optional[str] = None,
     min_credits: Optional[float] = None,
-    max_credits: Optional[float] = None
+    max_credits: Optional[float] = None,
+    language: Optional[str] = None,
+    semester: Optional[int] = None
 ) -> Optional[Dict[str, Any]]:
-    """Builds a Pinecone metadata filter dictionary."""
-    f = {}
-    if season:
-        f["season"] = {"$eq": season}
-    if exam_type:
-        f["examType"] = {"$eq": exam_type}
-    if min_credits or max_credits:
-        r = {}
-        if min_credits:
-            r["$gte"] = min_credits
-        if max_credits:
-            r["$lte"] = max_credits
-        f["creditPointsNum"] = r
-    return f or None
+    """
+    Builds a Pinecone metadata filter dictionary on the fields the merged
+    records were uploaded with (offeredInSeason, string creditPoints, ...).
+    The local backends evaluate the same filter on the facet bitmaps.
+    """
+    return get_facet_index().filter(season, exam_type, min_credits, max_credits, language, semester)
+
+
+def _query(namespace: str, **kwargs) -> List[LocalMatch]:
+    """
+    One Pinecone query as LocalMatch objects. Without metadata in the response,
+    records the loader does not know are fetched (one call) so build_context
+    can still fall back to their stored snippet.
+    """
+    index = get_index()
+    res = index.query(include_metadata=PINECONE_INCLUDE_METADATA, namespace=namespace, **kwargs)
+    matches = [
+        LocalMatch(
+            id=m.id,
+            score=m.score or 0.0,
+            namespace=ID_TO_NAMESPACE.get(m.id, namespace),
+            metadata=dict(m.metadata or {}) if PINECONE_INCLUDE_METADATA else {},
+        )
+        for m in res.matches
+    ]
+    missing = [m for m in matches if m.id not in ID_TO_TEXT and not m.metadata]
+    if missing:
+        stored = index.fetch(ids=[m.id for m in missing], namespace=namespace).vectors
+        for m in missing:
+            if m.id in stored:
+                m.metadata = dict(stored[m.id].metadata or {})
+    return matches
+
+
+def _single_query(top_k: int, filter: Optional[Dict[str, Any]], namespaces: Optional[List[str]]) -> Dict[str, Any]:
+    """Arguments of the one query that replaces the fan-out in the single-namespace layout."""
+    target = namespace_filter(namespaces or AVAILABLE_NAMESPACES, AVAILABLE_NAMESPACES)
+    return dict(
+        # over-fetch so matches the program boost lifts into the top_k, or
+        # that replace ones over a namespace quota, are not cut off
+        top_k=top_k * 2,
+        namespace=PINECONE_SINGLE_NAMESPACE,
+        filter=combine_filters(filter, target),
+    )
 
 
 def search_all_namespaces(
@@ -39,23 +142,92 @@ def search_all_namespaces(
     namespaces: Optional[List[str]] = None
 ):
     """Query across namespaces, slightly boosting local program matches."""
-    all_matches = []
+    if SEARCH_BACKEND == "local":
+        return get_local_index().search(vector, top_k, filter, program, namespaces)
+
+    if PINECONE_LAYOUT == "single":
+        matches = _query(vector=vector, **_single_query(top_k, filter, namespaces))
+        return merge_single(matches, program, top_k)
 
-    target_namespaces = namespaces or AVAILABLE_NAMESPACES
+    # select_namespaces lists FBM_WEB twice when it searches everything
+    target_namespaces = list(dict.fromkeys(namespaces or AVAILABLE_NAMESPACES))
 
+    results = []
     for ns in target_namespaces:
-        res = index.query(
-            vector=vector,
-            top_k=top_k,
-            include_metadata=True,
-            namespace=ns,
-            filter=filter
-        )
-        for match in res.matches:
-            # Small bias boost for matches from the user's study program
-            if program and ns.startswith(program):
-                match.score *= 1.05
-            all_matches.append(match)
-
-    # Sort by score and return top_k
-    return sorted(all_matches, key=lambda m: m.score or 0, reverse=True)[:top_k]
+        results.append((ns, _query(ns, vector=vector, top_k=fetch_k(ns, top_k), filter=filter)))
+
+    return merge_matches(results, program, top_k)
+
+
+async def asearch_all_namespaces(
+    vector: List[float],
+    top_k: int,
+    filter: Optional[Dict[str, Any]] = None,
+    program: Optional[str] = None,
+    namespaces: Optional[List[str]] = None
+):
+    """
+    Async variant of search_all_namespaces(): all namespace queries are issued
+    at once (bounded by SEARCH_CONCURRENCY), so latency is the slowest namespace
+    instead of the sum of all of them.
+    """
+    if SEARCH_BACKEND == "local":
+        # one in-process matmul, no network round trips
+        return get_local_index().search(vector, top_k, filter, program, namespaces)
+
+    if PINECONE_LAYOUT == "single":
+        # one filtered query instead of one per namespace
+        async with _query_slots:
+            matches = await asyncio.to_thread(_query, vector=vector, **_single_query(top_k, filter, namespaces))
+        return merge_single(matches, program, top_k)
+
+    # select_namespaces lists FBM_WEB twice when it searches everything
+    target_namespaces = list(dict.fromkeys(namespaces or AVAILABLE_NAMESPACES))
+
+    async def query_ns(ns: str):
+        async with _query_slots:
+            matches = await asyncio.to_thread(_query, ns, vector=vector, top_k=fetch_k(ns, top_k), filter=filter)
+        return ns, matches
+
+    results = await asyncio.gather(*(query_ns(ns) for ns in target_namespaces))
+    return merge_matches(results, program, top_k)
+
+
+def score_ids(vector: List[float], ids: Sequence[str], program: Optional[str] = None) -> Dict[str, float]:
+    """
+    Cosine of the query with records found without a vector search (BM25-only
+    hybrid hits), boosted like search results, so build_context's
+    SCORE_THRESHOLD applies to them as well. Pinecone: one fetch per namespace.
+    """
+    if not ids:
+        return {}
+    if SEARCH_BACKEND == "local":
+        return get_local_index().score_ids(vector, ids, program)
+    q = np.asarray(vector, dtype=np.float32)
+    norm = float(np.linalg.norm(q))
+    if not norm:
+        return {}
+    q /= norm
+
+    by_namespace: Dict[str, List[str]] = {}
+    for rid in ids:
+        if rid in ID_TO_NAMESPACE:
+            by_namespace.setdefault(target_namespace(ID_TO_NAMESPACE[rid]), []).append(rid)
+    scores: Dict[str, float] = {}
+    for namespace, ns_ids in by_namespace.items():
+        stored = get_index().fetch(ids=ns_ids, namespace=namespace).vectors
+        for rid in ns_ids:
+            if rid not in stored:
+                continue
+            v = np.asarray(stored[rid].values, dtype=np.float32)
+            boost = PROGRAM_BOOST if program and ID_TO_NAMESPACE[rid].startswith(program) else 1.0
+            scores[rid] = float(q @ v) / (float(np.linalg.norm(v)) or 1.0) * boost
+    return scores
+
+
+async def ascore_ids(vector: List[float], ids: Sequence[str], program: Optional[str] = None) -> Dict[str, float]:
+    """Async variant of score_ids(); the fetches share the search's SEARCH_CONCURRENCY slots."""
+    if SEARCH_BACKEND == "local" or not ids:
+        return score_ids(vector, ids, program)
+    async with _query_slots:
+        return await asyncio.to_thread(score_ids, vector, ids, program)
@@ -0,0 +1,102 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from services.local_index import LocalIndex, LocalMatch
+from services.metadata_filter import matches_filter
+
+
+@dataclass
+class _Vector:
+    id: str
+    values: List[float]
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class _QueryResponse:
+    matches: List[LocalMatch]
+
+
+@dataclass
+class _FetchResponse:
+    vectors: Dict[str, _Vector]
+
+
+class InMemoryPineconeIndex:
+    """
+    Stand-in for a Pinecone index handle (query / upsert / list / fetch) for
+    tests and benchmarks: exact cosine search per namespace with filters
+    evaluated by matches_filter. `latency` seconds are slept per call to stand
+    in for the network round trip; `calls` counts them.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._ns: Dict[str, Dict[str, _Vector]] = {}
+        self._matrices: Dict[str, tuple] = {}
+
+    def _call(self):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def upsert(self, vectors: Sequence[Dict[str, Any]], namespace: str = ""):
+        self._call()
+        records = self._ns.setdefault(namespace, {})
+        for v in vectors:
+            records[v["id"]] = _Vector(v["id"], list(v["values"]), dict(v.get("metadata") or {}))
+        self._matrices.pop(namespace, None)
+
+    def list(self, namespace: str = "", limit: int = 100) -> Iterator[List[str]]:
+        ids = list(self._ns.get(namespace, {}))
+        for i in range(0, len(ids), limit):
+            self._call()
+            yield ids[i:i + limit]
+
+    def fetch(self, ids: Sequence[str], namespace: str = "") -> _FetchResponse:
+        self._call()
+        records = self._ns.get(namespace, {})
+        return _FetchResponse({rid: records[rid] for rid in ids if rid in records})
+
+    def query(
+        self,
+        vector: Sequence[float],
+        top_k: int,
+        include_metadata: bool = False,
+        namespace: str = "",
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> _QueryResponse:
+        self._call()
+        records = self._ns.get(namespace)
+        if not records:
+            return _QueryResponse([])
+        if namespace not in self._matrices:
+            ids = list(records)
+            self._matrices[namespace] = (ids, LocalIndex.normalize(np.array([records[r].values for r in ids])))
+        ids, matrix = self._matrices[namespace]
+
+        q = LocalIndex.normalize(np.asarray(vector, dtype=np.float32)[None, :])[0]
+        scores = matrix @ q
+        matches: List[LocalMatch] = []
+        for row in np.argsort(-scores, kind="stable"):
+            rec = records[ids[row]]
+            if filter and not matches_filter(rec.metadata, filter):
+                continue
+            matches.append(LocalMatch(
+                id=rec.id,
+                score=float(scores[row]),
+                metadata=dict(rec.metadata) if include_metadata else {},
+            ))
+            if len(matches) >= top_k:
+                break
+        return _QueryResponse(matches)
+
+    def describe_index_stats(self) -> Dict[str, Any]:
+        return {"namespaces": {ns: {"vector_count": len(r)} for ns, r in self._ns.items()}}
@@ -1,12 +1,25 @@
 import openai
-from typing import List, Dict
-from services.embeddings import detect_lang
+import asyncio
+import hashlib
+import json
+import os
+from typing import AsyncIterator, List, Dict, Optional
+from services.cache import TTLCache
+from services.embeddings import get_async_client
+from services.query_analyzer import analyze_query
 
 CHAT_MODEL = "gpt-4.1-mini"
 
-def ask_openai(context: str, question: str, history: List[Dict[str, str]]) -> str:
-    lang = detect_lang(question)
+# Exact-prompt response cache. Entries live RESPONSE_CACHE_TTL seconds; after
+# RESPONSE_CACHE_REFRESH_AFTER they are still served but refreshed in the background
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1000"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", str(24 * 3600)))
+RESPONSE_CACHE_REFRESH_AFTER = float(os.getenv("RESPONSE_CACHE_REFRESH_AFTER", str(12 * 3600)))
+RESPONSE_CACHE = TTLCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL)
+_refresh_tasks: Dict[str, asyncio.Task] = {}
 
+def build_messages(context: str, question: str, history: List[Dict[str, str]], lang: str) -> List[Dict[str, str]]:
+    """Build the chat messages (system prompt, trimmed history, context + question)."""
     # Build system prompt with richer role description
     system_msg = {
         "de": (
@@ -37,6 +50,20 @@ def ask_openai(context: str, question: str, history: List[Dict[str, str]]) -> st
         else f"Context:\n{context}\n\nQuestion: {question}"
     )
     messages.append({"role": "user", "content": user_prompt})
+    return messages
+
+
+def error_message(lang: str) -> str:
+    return (
+        "Fehler beim Generieren der Antwort. Bitte versuche es später erneut."
+        if lang == "de"
+        else "An error occurred while generating the response. Please try again later."
+    )
+
+
+def ask_openai(context: str, question: str, history: List[Dict[str, str]], lang: Optional[str] = None) -> str:
+    lang = lang or analyze_query(question).lang
+    messages = build_messages(context, question, history, lang)
 
     # Call OpenAI
     try:
@@ -48,8 +75,99 @@ def ask_openai(context: str, question: str, history: List[Dict[str, str]]) -> st
         return response.choices[0].message.content
     except Exception as e:
         print(f"OpenAI error: {e}")
-        return (
-            "Fehler beim Generieren der Antwort. Bitte versuche es später erneut."
-            if lang == "de"
-            else "An error occurred while generating the response. Please try again later."
+        return error_message(lang)
+
+
+def response_key(messages: List[Dict[str, str]]) -> str:
+    """Hash of model + full prompt (system prompt, history, context, question)."""
+    payload = json.dumps({"model": CHAT_MODEL, "messages": messages}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+async def _acomplete(messages: List[Dict[str, str]]) -> str:
+    response = await get_async_client().chat.completions.create(
+        model=CHAT_MODEL,
+        messages=messages,
+        temperature=1.0
+    )
+    return response.choices[0].message.content
+
+
+async def _refresh(key: str, messages: List[Dict[str, str]]):
+    """Regenerate a stale cache entry in the background."""
+    try:
+        RESPONSE_CACHE.set(key, await _acomplete(messages))
+    except Exception as e:
+        print(f"OpenAI error (background refresh): {e}")
+    finally:
+        _refresh_tasks.pop(key, None)
+
+
+async def aask_openai(context: str, question: str, history: List[Dict[str, str]], lang: Optional[str] = None) -> str:
+    """
+    Async variant of ask_openai() for the serving path, with an exact-prompt
+    response cache. Entries older than RESPONSE_CACHE_REFRESH_AFTER are served
+    as-is while a background task regenerates them (stale-while-revalidate).
+    """
+    lang = lang or analyze_query(question).lang
+    messages = build_messages(context, question, history, lang)
+
+    key = response_key(messages)
+    entry = RESPONSE_CACHE.get_entry(key)
+    if entry is not None:
+        answer, age = entry
+        if age >= RESPONSE_CACHE_REFRESH_AFTER and key not in _refresh_tasks:
+            _refresh_tasks[key] = asyncio.create_task(_refresh(key, messages))
+        return answer
+
+    try:
+        answer = await _acomplete(messages)
+    except Exception as e:
+        print(f"OpenAI error: {e}")
+        return error_message(lang)
+
+    RESPONSE_CACHE.set(key, answer)
+    return answer
+
+
+async def aask_openai_stream(
+    context: str, question: str, history: List[Dict[str, str]], lang: Optional[str] = None
+) -> AsyncIterator[str]:
+    """Stream answer tokens as they arrive from the chat completion."""
+    lang = lang or analyze_query(question).lang
+    messages = build_messages(context, question, history, lang)
+
+    # Same response cache as aask_openai(): a hit is sent as one chunk
+    key = response_key(messages)
+    entry = RESPONSE_CACHE.get_entry(key)
+    if entry is not None:
+        answer, age = entry
+        if age >= RESPONSE_CACHE_REFRESH_AFTER and key not in _refresh_tasks:
+            _refresh_tasks[key] = asyncio.create_task(_refresh(key, messages))
+        yield answer
+        return
+
+    stream = None
+    parts: List[str] = []
+    try:
+        stream = await get_async_client().chat.completions.create(
+            model=CHAT_MODEL,
+            messages=messages,
+            temperature=1.0,
+            stream=True
         )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+                yield chunk.choices[0].delta.content
+    except Exception as e:
+        print(f"OpenAI error: {e}")
+        yield error_message(lang)
+        return
+    finally:
+        # Release the upstream connection if the client went away mid-stream
+        if stream is not None:
+            await stream.close()
+
+    # only complete generations are cached
+    RESPONSE_CACHE.set(key, "".join(parts))
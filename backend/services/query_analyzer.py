@@ -0,0 +1,276 @@
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+# Module ids as the chunkers write them (MODULE_PATTERN / HSD_PATTERN headings
+# "BMI 10 – ...", "BTB W18 – ...", "MMI 05.03 – ...") plus the BDAISY "D 1.1" /
+# "PF 4.2" and RSH "Schwerpunkt 16" ids. Only known program prefixes, so
+# "hat 5 CP" is not read as a module.
+MODULE_ID_PATTERN = (
+    r"(?<!\w)(bdaisy[\s_]*(?:d|pf)|rsh[\s_]*(?:modul|schwerpunkt|wahlmodul)|bcsim|bmi|bmt|btb|mmi|mar)"
+    r"[\s_]*([wf]?\d{1,3}(?:[._]\d{1,2}){0,2})(?!\w)"
+)
+
+# "5 CP", "5-10 ECTS", "mindestens 5 Leistungspunkte", "at most 10 credits"
+CP_PATTERN = (
+    r"(?:(mindestens|min\.?|ab|mehr als|at least|more than|über|höchstens|max\.?|bis zu|maximal|weniger als|at most|less than|up to)\s+)?"
+    r"(\d{1,2}(?:[.,]5)?)(?:\s*(?:-|–|bis|to)\s*(\d{1,2}(?:[.,]5)?))?"
+    r"\s*(?:cp|ects|lp|credits?|credit points|leistungspunkte)(?!\w)"
+)
+_MIN_WORDS = {"mindestens", "min", "ab", "mehr als", "at least", "more than", "über"}
+
+# word or phrase → [(kind, value)]; one entry can feed several kinds
+# ("klausur": German + exam type). Phrases are matched word by word.
+_TERMS: Dict[str, List[Tuple[str, str]]] = {}
+_PHRASES: Dict[str, List[Tuple[Tuple[str, ...], List[Tuple[str, str]]]]] = {}
+_WORD_RE = re.compile(r"\w+")
+
+
+def _add(kind: str, value: str, *terms: str):
+    for term in terms:
+        words = tuple(_WORD_RE.findall(term))
+        if len(words) == 1:
+            _TERMS.setdefault(words[0], []).append((kind, value))
+            continue
+        phrases = _PHRASES.setdefault(words[0], [])
+        for parts, entries in phrases:
+            if parts == words:
+                entries.append((kind, value))
+                break
+        else:
+            phrases.append((words, [(kind, value)]))
+            # longest first so "mündliche prüfung" wins over "mündlich"
+            phrases.sort(key=lambda p: -len(p[0]))
+
+
+# Programs: codes as whole words ("mar" no longer matches "Markus"/"Marmann",
+# "mmi" no longer matches "Programmierung")
+_add("program", "BTB", "btb", "ton und bild")
+_add("program", "BMT", "bmt", "medientechnik")
+_add("program", "BMI", "bmi")
+_add("program", "MMI", "mmi")
+_add("program", "BCSIM", "bcsim", "csim", "creative, synthetic and interactive media")
+_add("program", "BDAISY", "bdaisy", "daisy", "data science, ai und intelligente systeme")
+_add("program", "MAR", "mar", "applied research in digital media technologies")
+# Medieninformatik is BMI, or MMI when the question is about the master
+_add("program", "MEDIENINFORMATIK", "medieninformatik")
+_add("degree", "master", "master", "msc", "m.sc", "m. sc")
+
+_add("season", "winter_semester", "wintersemester", "winter semester", "winter term", "wise")
+_add("season", "summer_semester", "sommersemester", "summer semester", "summer term", "sose")
+
+_add("exam", "written_exam", "klausur", "klausuren", "schriftliche prüfung", "written exam")
+_add("exam", "oral_exam", "mündliche prüfung", "mündlich", "oral exam")
+_add("exam", "portfolio", "portfolio", "portfolioprüfung")
+_add("exam", "project", "projektarbeit", "project work")
+_add("exam", "research_paper", "hausarbeit", "research paper", "seminararbeit")
+_add("exam", "presentation", "präsentation", "referat", "presentation")
+
+_add("teaching", "en", "englisch", "english", "englischsprachig", "englischsprachige", "englischsprachigen")
+_add("teaching", "de", "deutsch", "german", "deutschsprachig", "deutschsprachige", "deutschsprachigen")
+
+# Catalog questions ("Welche Module gibt es im BMT?"): module nouns, module
+# catalogues (derived from the module numbers, see services/catalog.py) and the
+# words such a question is made of besides programs and filters
+_add("modules", "", "module", "modules", "modul", "modulen", "fächer", "kurse", "courses", "lehrveranstaltungen")
+_add("catalogue", "elective", "wahlpflicht", "wahlmodul", "wahlmodule", "elective", "electives")
+_add("catalogue", "compulsory", "pflicht", "pflichtmodul", "compulsory", "mandatory")
+_add("catalogue", "specialization", "schwerpunkt", "schwerpunkte", "vertiefung", "vertiefungen", "specialization", "specialisation")
+for _word in ("wahlpflichtmodul", "wahlpflichtmodule", "pflichtmodule", "schwerpunktmodule", "vertiefungsmodule"):
+    _add("modules", "", _word)
+_add("catalogue", "elective", "wahlpflichtmodul", "wahlpflichtmodule")
+_add("catalogue", "compulsory", "pflichtmodule")
+_add("catalogue", "specialization", "schwerpunktmodule", "vertiefungsmodule")
+_CATALOG_WORDS = {
+    "gibt", "es", "welche", "which", "what", "list", "liste", "alle", "all", "übersicht", "overview",
+    "show", "zeige", "zeig", "mir", "me", "are", "there", "is", "the", "a", "an", "of", "for", "in", "im",
+    "der", "des", "die", "den", "dem", "studiengang", "studiengangs", "program", "programme", "course",
+    "degree", "bachelor", "master", "semester", "fachsemester", "werden", "wird", "sind", "angeboten",
+    "offered", "available", "haben", "hat", "have", "has", "mit", "with", "cp", "ects", "lp", "credits",
+    "credit", "points", "leistungspunkte", "mindestens", "höchstens", "maximal", "min", "max", "at",
+    "least", "most", "more", "less", "than", "up", "to", "bis", "ab", "über", "and", "und", "or", "oder",
+    "do", "does", "can", "could", "i", "ich", "kann", "muss", "must", "need", "should", "take", "belegen",
+    "wählen", "choose", "von", "from", "taught", "held", "gehalten", "sprache", "language", "bitte", "please",
+}
+_ORDINALS = {
+    "erste": 1, "ersten": 1, "first": 1, "zweite": 2, "zweiten": 2, "second": 2, "dritte": 3, "dritten": 3,
+    "third": 3, "vierte": 4, "vierten": 4, "fourth": 4, "fünfte": 5, "fünften": 5, "fifth": 5,
+    "sechste": 6, "sechsten": 6, "sixth": 6, "siebte": 7, "siebten": 7, "seventh": 7,
+    "1st": 1, "2nd": 2, "3rd": 3, "4th": 4, "5th": 5, "6th": 6, "7th": 7,
+}
+_SEMESTER_WORDS = ("semester", "fachsemester")
+
+# German markers (formerly embeddings.detect_lang)
+_add("lang", "de",
+     # Question helpers
+     "wie", "was", "wer", "wo", "warum", "wieso", "weshalb", "wann", "wem", "wen", "wohin", "woher", "wozu",
+     "wieviel", "wieviele", "wievielen",
+     "werde", "werden", "bin", "bist", "sind", "seid",
+     "welche", "welcher", "welches", "gibt es", "kann ich", "ist",
+     "helfen", "hilfe", "informationen", "kontakt",
+     "finden", "suche", "suchen", "erklären", "erkläre", "erklärt",
+     "bedeuten", "bedeutet", "bedeutung",
+     "unterscheiden", "unterschied", "unterschiede",
+     # Function words the old substring scan matched by accident inside other words
+     "ich", "und", "nicht", "bitte", "auch", "alle", "mit", "für", "bei", "kann", "noch", "oder",
+     "der", "die", "das", "den", "dem", "ein", "eine", "im", "zum", "zur", "hab", "habe", "mein", "meine",
+     # Uni / admin (German words)
+     "hochschule", "fachbereich", "bewerbung", "zulassung", "einschreibung", "immatrikulation",
+     "rückmeldung", "exmatrikulation",
+     # Semester / timing
+     "wintersemester", "sommersemester", "vorlesungszeit", "vorlesungsfreie zeit", "semesterferien",
+     # Modules / exams
+     "klausur", "mündliche prüfung", "schriftliche prüfung", "hausarbeit", "leistungspunkte", "sws",
+     # Teaching formats
+     "übung", "veranstaltungsverzeichnis",
+     # Study plan / requirements
+     "wahlbereich", "wahlpflicht", "pflichtmodul", "schwerpunkt",
+     # Theses / docs
+     "bachelorarbeit", "masterarbeit", "zeugnis",
+     # Roles / misc
+     "dozent", "dozentin", "praxissemester", "formular", "richtlinie",
+     )
+# German word stems: "modul" (Modul, Modulnummer), "prüf" (Prüfungsform), "studi" (Studium, Studiengang, ...),
+# except for the English words with the same beginning
+_GERMAN_STEMS = ("modul", "prüf", "studi", "vorlesung", "hochschul")
+_ENGLISH_STEM_WORDS = {"module", "modules", "modular", "modularity", "studio", "studios", "studies", "studied"}
+_ID_PATTERN = re.compile(rf"(?P<module>{MODULE_ID_PATTERN})|(?P<cp>{CP_PATTERN})")
+
+
+@dataclass(frozen=True)
+class QueryAnalysis:
+    lang: str
+    programs: Tuple[str, ...] = ()
+    # normalized module ids ("BMI10"); resolved to records by module_lookup
+    module_keys: Tuple[str, ...] = ()
+    season: Optional[str] = None
+    exam_type: Optional[str] = None
+    min_credits: Optional[float] = None
+    max_credits: Optional[float] = None
+    semester: Optional[int] = None
+    language: Optional[str] = None
+    catalogue: Optional[str] = None
+    # a request for a list of modules, answered from the catalog without the LLM
+    catalog: bool = False
+
+    def hints(self) -> Dict[str, object]:
+        """Filter hints found in the question (only catalog answers apply them)."""
+        return {
+            k: v for k, v in (
+                ("season", self.season), ("examType", self.exam_type),
+                ("minCredits", self.min_credits), ("maxCredits", self.max_credits),
+                ("semester", self.semester), ("language", self.language), ("catalogue", self.catalogue),
+            ) if v is not None
+        }
+
+
+def _num(value: str) -> float:
+    return float(value.replace(",", "."))
+
+
+@lru_cache(maxsize=4096)
+def analyze_query(text: str) -> QueryAnalysis:
+    """
+    One pass over the words of the lower-cased question (hash lookups for
+    words and phrases) plus one regex pass for module ids / CP values:
+    language, program codes, module ids, season, CP range, exam-type,
+    semester and catalogue hints, and whether the question only asks for a
+    list of modules (every word is a module noun, a program, a filter or
+    filler). Memoized, so every stage of a request can call it again for free.
+    """
+    t = (text or "").lower()
+    # hint: German umlauts/ß as prio
+    german = any(ch in t for ch in ("ä", "ö", "ü", "ß"))
+    programs: List[str] = []
+    module_keys: List[str] = []
+    master = False
+    season = exam_type = semester = teaching = catalogue = None
+    min_cp = max_cp = None
+    modules = False
+    unknown = 0
+
+    def apply(entries: List[Tuple[str, str]]):
+        nonlocal german, master, season, exam_type, teaching, catalogue, modules
+        for kind, value in entries:
+            if kind == "lang":
+                german = True
+            elif kind == "program":
+                programs.append(value)
+            elif kind == "degree":
+                master = True
+            elif kind == "season":
+                season = season or value
+            elif kind == "exam":
+                exam_type = exam_type or value
+            elif kind == "teaching":
+                teaching = teaching or value
+            elif kind == "catalogue":
+                catalogue = catalogue or value
+            elif kind == "modules":
+                modules = True
+
+    # words: dict lookups, phrases only where their first word occurs
+    words = _WORD_RE.findall(t)
+    i = 0
+    while i < len(words):
+        w = words[i]
+        step = 1
+        for parts, entries in _PHRASES.get(w, ()):
+            if tuple(words[i:i + len(parts)]) == parts:
+                apply(entries)
+                step = len(parts)
+                break
+        else:
+            entries = _TERMS.get(w)
+            if entries:
+                apply(entries)
+            if not german and w.startswith(_GERMAN_STEMS) and w not in _ENGLISH_STEM_WORDS:
+                german = True
+            nxt = words[i + 1] if i + 1 < len(words) else ""
+            if nxt in _SEMESTER_WORDS and (w in _ORDINALS or (w.isdigit() and len(w) == 1)):
+                semester = semester or _ORDINALS.get(w) or int(w)  # "3. Semester", "dritten Semester"
+            elif w in _SEMESTER_WORDS and nxt.isdigit() and len(nxt) == 1:
+                semester = semester or int(nxt)  # "Semester 3"
+            if not (entries or w in _CATALOG_WORDS or w in _ORDINALS or w.isdigit()):
+                unknown += 1
+        i += step
+
+    # module ids and CP values need a digit
+    if any(ch.isdigit() for ch in t):
+        for m in _ID_PATTERN.finditer(t):
+            if m.lastgroup == "module":
+                prefix, number = m.group(2), m.group(3)
+                module_keys.append(re.sub(r"[\s_]+", "", prefix + number).upper())
+                code = re.sub(r"[\s_]+", "", prefix).upper()
+                if code.startswith("BDAISY"):
+                    programs.append("BDAISY")
+                elif not code.startswith("RSH"):  # RSH ids are Ton und Bild modules at the RSH
+                    programs.append(code)
+            else:
+                qualifier, low, high = m.group(5), m.group(6), m.group(7)
+                if high:
+                    min_cp, max_cp = _num(low), _num(high)
+                elif qualifier and qualifier.rstrip(".") in _MIN_WORDS:
+                    min_cp = _num(low)
+                elif qualifier:
+                    max_cp = _num(low)
+                else:
+                    min_cp = max_cp = _num(low)
+
+    if "MEDIENINFORMATIK" in programs:
+        programs = [("MMI" if master else "BMI") if p == "MEDIENINFORMATIK" else p for p in programs]
+
+    return QueryAnalysis(
+        lang="de" if german else "en",
+        programs=tuple(dict.fromkeys(programs)),
+        module_keys=tuple(dict.fromkeys(module_keys)),
+        season=season,
+        exam_type=exam_type,
+        min_credits=min_cp,
+        max_credits=max_cp,
+        semester=semester,
+        language=teaching,
+        catalogue=catalogue,
+        catalog=modules and not unknown and not module_keys,
+    )
@@ -0,0 +1,35 @@
+import asyncio
+import time
+
+
+class RateLimiter:
+    """
+    Async limiter for `rate_per_minute` calls with at most `concurrency` in flight.
+
+    Call starts are spaced evenly (1 / rate seconds apart), so a large batch
+    stays inside the request budget instead of bursting into 429s.
+    """
+
+    def __init__(self, rate_per_minute: float, concurrency: int):
+        self.interval = 60.0 / rate_per_minute if rate_per_minute > 0 else 0.0
+        self._slots = asyncio.Semaphore(max(1, concurrency))
+        self._lock = asyncio.Lock()
+        self._next_start = 0.0
+
+    async def __aenter__(self):
+        await self._slots.acquire()
+        try:
+            async with self._lock:
+                now = time.monotonic()
+                wait = self._next_start - now
+                self._next_start = max(now, self._next_start) + self.interval
+            if wait > 0:
+                await asyncio.sleep(wait)
+        except BaseException:
+            self._slots.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc):
+        self._slots.release()
+        return False
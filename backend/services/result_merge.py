@@ -0,0 +1,87 @@
+import heapq
+import os
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from services.context_builder import SCORE_THRESHOLD
+from services.loader import ID_TO_NAMESPACE
+from services.local_index import PROGRAM_BOOST, LocalMatch
+from services.single_index import namespace_tags
+
+# most matches one namespace contributes to a merged result, per source kind;
+# also the top_k requested from each namespace. build_context keeps at most
+# MAX_CONTEXT_CHUNKS anyway, so deep web / regulation lists only cost payload
+MERGE_QUOTA_MODULE = int(os.getenv("MERGE_QUOTA_MODULE", "8"))
+MERGE_QUOTA_WEB = int(os.getenv("MERGE_QUOTA_WEB", "4"))
+MERGE_QUOTA_REGULATION = int(os.getenv("MERGE_QUOTA_REGULATION", "8"))
+# matches scoring below this after the program boost are dropped during the
+# merge (build_context would drop them anyway); 0 keeps everything
+MERGE_MIN_SCORE = float(os.getenv("MERGE_MIN_SCORE", str(SCORE_THRESHOLD)))
+
+QUOTAS = {"module": MERGE_QUOTA_MODULE, "web": MERGE_QUOTA_WEB, "regulation": MERGE_QUOTA_REGULATION}
+
+
+def namespace_quota(namespace: str, quotas: Optional[Dict[str, int]] = None) -> int:
+    return (quotas or QUOTAS)[namespace_tags(namespace)["sourceKind"]]
+
+
+def fetch_k(namespace: str, top_k: int, quotas: Optional[Dict[str, int]] = None) -> int:
+    """top_k to request from one namespace: more than its quota can never be merged."""
+    return min(top_k, namespace_quota(namespace, quotas))
+
+
+def _stream(
+    namespace: str,
+    matches: Iterable[LocalMatch],
+    program: Optional[str],
+    quota: int,
+    min_score: float,
+) -> List[LocalMatch]:
+    """One namespace's matches (best first) boosted, cut at its quota and at min_score."""
+    boost = PROGRAM_BOOST if program and namespace.startswith(program) else 1.0
+    out: List[LocalMatch] = []
+    for match in matches:
+        if len(out) >= quota:
+            break
+        score = (match.score or 0) * boost
+        if score < min_score:
+            break  # ranked lists: everything after scores lower
+        match.score = score
+        out.append(match)
+    return out
+
+
+def merge_matches(
+    results: Sequence[Tuple[str, List[LocalMatch]]],
+    program: Optional[str],
+    top_k: int,
+    quotas: Optional[Dict[str, int]] = None,
+    min_score: float = MERGE_MIN_SCORE,
+) -> List[LocalMatch]:
+    """
+    k-way merge of per-namespace rankings (each best first, as Pinecone returns
+    them). Each namespace is boosted, capped at its quota and cut below
+    min_score on its own; heapq.merge then keeps one head per namespace on the
+    heap and stops after top_k, so nothing past the cut is sorted. Ties keep
+    namespace order.
+    """
+    streams = [
+        _stream(ns, matches, program, namespace_quota(ns, quotas), min_score)
+        for ns, matches in results
+    ]
+    return list(islice(heapq.merge(*streams, key=lambda m: -m.score), top_k))
+
+
+def merge_single(
+    matches: List[LocalMatch],
+    program: Optional[str],
+    top_k: int,
+    quotas: Optional[Dict[str, int]] = None,
+    min_score: float = MERGE_MIN_SCORE,
+) -> List[LocalMatch]:
+    """merge_matches for one single-namespace ranking, split by each record's namespace."""
+    groups: Dict[str, List[LocalMatch]] = {}
+    for match in matches:
+        ns = ID_TO_NAMESPACE.get(match.id) or match.metadata.get("studyProgramAbbrev") or match.namespace
+        groups.setdefault(ns, []).append(match)
+    return merge_matches(list(groups.items()), program, top_k, quotas, min_score)
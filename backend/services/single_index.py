@@ -0,0 +1,116 @@
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+from services.citations import REGULATIONS
+from services.facets import FACET_FIELDS
+
+# "namespaces": one Pinecone namespace per program and source (BMI, BMI_WEB,
+# FBM_WEB, ...), queried one by one. "single": every record in
+# PINECONE_SINGLE_NAMESPACE, tagged with studyProgramAbbrev + sourceKind, and
+# one filtered query per search.
+PINECONE_LAYOUT = os.getenv("PINECONE_LAYOUT", "namespaces").lower()
+PINECONE_SINGLE_NAMESPACE = os.getenv("PINECONE_SINGLE_NAMESPACE", "all")
+# "1": uploaders store only the fields queries filter on; text and display
+# metadata are served from the loader files (ID_TO_TEXT / ID_TO_META)
+PINECONE_SLIM_METADATA = os.getenv("PINECONE_SLIM_METADATA", "0") == "1"
+FILTER_FIELDS = (*FACET_FIELDS, "studyProgramAbbrev", "sourceKind")
+
+# namespace prefixes that differ from the program code ("DAISY_pdf")
+_PROGRAM_ALIASES = {"DAISY": "BDAISY"}
+_REGULATION_PROGRAMS = {conf["namespace"]: conf["program"] for conf in REGULATIONS.values()}
+
+
+def namespace_tags(namespace: str) -> Dict[str, str]:
+    """studyProgramAbbrev + sourceKind (module / web / regulation) of a per-namespace layout name."""
+    if namespace in _REGULATION_PROGRAMS:
+        return {"studyProgramAbbrev": _REGULATION_PROGRAMS[namespace], "sourceKind": "regulation"}
+    if namespace.upper().endswith("_WEB"):
+        program, kind = namespace[:-len("_WEB")], "web"
+    elif namespace.lower().endswith("_pdf"):
+        program, kind = namespace[:-len("_pdf")], "module"
+    else:
+        program, kind = namespace, "module"
+    return {"studyProgramAbbrev": _PROGRAM_ALIASES.get(program, program), "sourceKind": kind}
+
+
+def target_namespace(namespace: str) -> str:
+    """Namespace an uploader writes a record of `namespace` to under PINECONE_LAYOUT."""
+    return PINECONE_SINGLE_NAMESPACE if PINECONE_LAYOUT == "single" else namespace
+
+
+def tag_metadata(metadata: Dict[str, Any], namespace: str) -> Dict[str, Any]:
+    """Upload metadata plus the program / source tags the single layout filters on."""
+    return {**metadata, **namespace_tags(namespace)}
+
+
+def upload_metadata(metadata: Dict[str, Any], namespace: str, slim: bool = PINECONE_SLIM_METADATA) -> Dict[str, Any]:
+    """tag_metadata, reduced to FILTER_FIELDS with PINECONE_SLIM_METADATA."""
+    meta = tag_metadata(metadata, namespace)
+    return {k: v for k, v in meta.items() if k in FILTER_FIELDS} if slim else meta
+
+
+def namespace_filter(namespaces: Sequence[str], available: Sequence[str]) -> Optional[Dict[str, Any]]:
+    """
+    Filter that restricts the single namespace to the records of `namespaces`
+    (out of the `available` ones): `$in` over their programs and source kinds
+    when that selects exactly those namespaces, else one `$in` per kind.
+    None when nothing needs to be excluded.
+    """
+    wanted = {tuple(namespace_tags(ns).values()) for ns in namespaces}
+    present = {tuple(namespace_tags(ns).values()) for ns in available}
+    programs = sorted({p for p, _ in wanted})
+    kinds = sorted({k for _, k in wanted})
+
+    if {(p, k) for p in programs for k in kinds} & present <= wanted:
+        flt: Dict[str, Any] = {}
+        if not {p for p, _ in present} <= set(programs):
+            flt["studyProgramAbbrev"] = {"$in": programs}
+        if not {k for _, k in present} <= set(kinds):
+            flt["sourceKind"] = {"$in": kinds}
+        return flt or None
+    return {"$or": [
+        {"sourceKind": {"$eq": kind}, "studyProgramAbbrev": {"$in": sorted(p for p, k in wanted if k == kind)}}
+        for kind in kinds
+    ]}
+
+
+def combine_filters(*filters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    present = [f for f in filters if f]
+    if len(present) <= 1:
+        return present[0] if present else None
+    if all(not set(a) & set(b) for i, a in enumerate(present) for b in present[i + 1:]):
+        return {k: v for f in present for k, v in f.items()}
+    return {"$and": present}
+
+
+def migrate_to_single_namespace(
+    index,
+    namespaces: Sequence[str],
+    target: str = PINECONE_SINGLE_NAMESPACE,
+    batch_size: int = 100,
+) -> Dict[str, int]:
+    """
+    Copy every vector of the per-namespace layout into `target` with its
+    metadata tagged (and slimmed with PINECONE_SLIM_METADATA), no re-embedding. Returns the number copied per namespace;
+    the source namespaces are left untouched.
+    """
+    copied: Dict[str, int] = {}
+    for ns in namespaces:
+        ids: List[str] = []
+        for page in index.list(namespace=ns):
+            # older clients yield plain id lists, newer ones ListResponse objects
+            ids.extend(page if isinstance(page, list) else [v.id for v in page.vectors])
+
+        copied[ns] = 0
+        for i in range(0, len(ids), batch_size):
+            res = index.fetch(ids=ids[i:i + batch_size], namespace=ns)
+            batch = [
+                {"id": rid, "values": list(vec.values), "metadata": upload_metadata(dict(vec.metadata or {}), ns)}
+                for rid, vec in res.vectors.items()
+            ]
+            if batch:
+                index.upsert(vectors=batch, namespace=target)
+                copied[ns] += len(batch)
+        print(f"[migrate] {ns}: {copied[ns]} vectors → '{target}'")
+    return copied
+
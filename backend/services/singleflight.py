@@ -0,0 +1,50 @@
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+# Upper bound for one shared computation; waiters are released with a TimeoutError
+SINGLEFLIGHT_TIMEOUT = float(os.getenv("SINGLEFLIGHT_TIMEOUT", "60"))
+
+
+class SingleFlight:
+    """
+    Coalesce identical in-flight async calls.
+
+    The first caller for a key starts the work as a task; callers arriving
+    while it runs await the same task instead of starting their own. The task
+    is bounded by `timeout`, its result or exception is delivered to every
+    waiter, and the key is released as soon as it finishes, so later calls
+    start fresh. A waiter that is cancelled (e.g. client disconnect) does not
+    cancel the shared work for the others.
+    """
+
+    def __init__(self, timeout: float = SINGLEFLIGHT_TIMEOUT):
+        self.timeout = timeout
+        self.leaders = 0
+        self.coalesced = 0
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    def _release(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # mark the exception as retrieved even if every waiter went away
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(asyncio.wait_for(fn(), self.timeout))
+            task.add_done_callback(lambda t: self._release(key, t))
+            self._inflight[key] = task
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "inflight": len(self._inflight),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,63 @@
+import asyncio
+import json
+import os
+from typing import Any, AsyncIterator, List
+
+# Max number of token chunks buffered between the LLM stream and the client
+STREAM_BUFFER_SIZE = int(os.getenv("STREAM_BUFFER_SIZE", "64"))
+
+_DONE = object()
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Format one Server-Sent-Event frame with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def buffered(source: AsyncIterator[str], maxsize: int = STREAM_BUFFER_SIZE) -> AsyncIterator[List[str]]:
+    """
+    Decouple a token stream from a (possibly slow) consumer with a bounded queue.
+
+    A producer task reads `source` into the queue and blocks once `maxsize`
+    chunks are waiting, so a slow client pushes back on the upstream stream
+    instead of growing memory. Each yield hands the consumer every chunk that
+    is ready, which coalesces tokens into fewer writes when the client lags.
+    If the consumer stops early (client disconnect), the producer is cancelled
+    and the source is closed.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    async def produce():
+        try:
+            async for item in source:
+                await queue.put(item)
+            await queue.put(_DONE)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # surfaced to the consumer, which stops reading after it
+            await queue.put(e)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            batch = [await queue.get()]
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+
+            items = [b for b in batch if b is not _DONE and not isinstance(b, Exception)]
+            if items:
+                yield items
+            if isinstance(batch[-1], Exception):
+                raise batch[-1]
+            if batch[-1] is _DONE:
+                break
+    finally:
+        producer.cancel()
+        try:
+            await producer
+        except (asyncio.CancelledError, Exception):
+            pass
+        aclose = getattr(source, "aclose", None)
+        if aclose is not None:
+            await aclose()
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# data/vectors/
+#   parts/<namespace>.npy + .json    written by the uploaders, one per namespace
+#   snapshots/<version>/             consolidated, read-only snapshot
+#       vectors.npy                  (n, dim) L2-normalized float32/float16
+#       ids.json                     ids, namespace per row, content hashes
+#       manifest.json                model, dim, dtype, namespace offsets, hashes
+#   CURRENT                          name of the snapshot version to serve
+# an empty VECTOR_SNAPSHOT_DIR (e.g. a .env copied from .env.example) means
+# the default, not the working directory
+VECTOR_DIR = Path(
+    os.getenv("VECTOR_SNAPSHOT_DIR")
+    or Path(__file__).resolve().parent.parent / "data" / "vectors"
+)
+PARTS_DIR = VECTOR_DIR / "parts"
+SNAPSHOTS_DIR = VECTOR_DIR / "snapshots"
+CURRENT_FILE = VECTOR_DIR / "CURRENT"
+
+SNAPSHOT_DTYPE = os.getenv("VECTOR_SNAPSHOT_DTYPE", "float32")
+# snapshot versions kept on disk (CURRENT included); older ones are deleted
+SNAPSHOT_KEEP = int(os.getenv("VECTOR_SNAPSHOT_KEEP", "3"))
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def save_part(namespace: str, ids: Sequence[str], texts: Sequence[str], vectors: Sequence[Sequence[float]], model: str):
+    """Keep the embeddings of one namespace that were just uploaded (replaces the old part)."""
+    PARTS_DIR.mkdir(parents=True, exist_ok=True)
+    matrix = np.asarray(vectors, dtype=np.float32)
+    np.save(PARTS_DIR / f"{namespace}.npy", matrix)
+    (PARTS_DIR / f"{namespace}.json").write_text(json.dumps({
+        "namespace": namespace,
+        "model": model,
+        "dim": int(matrix.shape[1]) if matrix.ndim == 2 else 0,
+        "ids": list(ids),
+        "content_hashes": [content_hash(t) for t in texts],
+    }), encoding="utf-8")
+    print(f"[snapshot] Saved {len(ids)} vectors for namespace '{namespace}'")
+
+
+def build_snapshot(dtype: str = SNAPSHOT_DTYPE) -> Path:
+    """Consolidate all namespace parts into a new versioned snapshot and mark it CURRENT."""
+    parts = sorted(PARTS_DIR.glob("*.json"))
+    if not parts:
+        raise RuntimeError(f"No vector parts found in {PARTS_DIR}")
+
+    ids: List[str] = []
+    row_namespaces: List[str] = []
+    hashes: List[str] = []
+    namespaces: Dict[str, Dict[str, Any]] = {}
+    blocks = []
+    models = set()
+    for part in parts:
+        info = json.loads(part.read_text(encoding="utf-8"))
+        ns = info["namespace"]
+        if not info["ids"]:
+            continue
+        matrix = np.load(part.with_suffix(".npy")).astype(np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        blocks.append(matrix / norms)
+
+        start = len(ids)
+        ids.extend(info["ids"])
+        row_namespaces.extend([ns] * len(info["ids"]))
+        hashes.extend(info["content_hashes"])
+        namespaces[ns] = {
+            "start": start,
+            "end": len(ids),
+            "content_hash": hashlib.sha256("".join(info["content_hashes"]).encode()).hexdigest(),
+        }
+        models.add(info["model"])
+
+    if len(models) > 1:
+        raise RuntimeError(f"Parts were embedded with different models: {sorted(models)}")
+    dims = {b.shape[1] for b in blocks}
+    if len(dims) > 1:
+        raise RuntimeError(f"Parts have different dimensions: {sorted(dims)}")
+
+    matrix = np.vstack(blocks).astype(dtype)
+    snapshot_hash = hashlib.sha256("".join(ns["content_hash"] for ns in namespaces.values()).encode()).hexdigest()
+    version = f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')}-{snapshot_hash[:8]}"
+
+    out = SNAPSHOTS_DIR / version
+    out.mkdir(parents=True, exist_ok=True)
+    np.save(out / "vectors.npy", matrix)
+    (out / "ids.json").write_text(json.dumps({
+        "ids": ids,
+        "namespaces": row_namespaces,
+        "content_hashes": hashes,
+    }), encoding="utf-8")
+    (out / "manifest.json").write_text(json.dumps({
+        "version": version,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "model": models.pop(),
+        "dim": int(matrix.shape[1]),
+        "dtype": dtype,
+        "count": len(ids),
+        "normalized": True,
+        "content_hash": snapshot_hash,
+        "namespaces": namespaces,
+    }, indent=2), encoding="utf-8")
+
+    # swap the pointer atomically so running workers never see a half-written snapshot
+    tmp = CURRENT_FILE.with_suffix(".tmp")
+    tmp.write_text(version, encoding="utf-8")
+    os.replace(tmp, CURRENT_FILE)
+    print(f"[snapshot] Wrote {version}: {len(ids)} vectors, {len(namespaces)} namespaces")
+    prune_snapshots()
+    return out
+
+
+def prune_snapshots(keep: int = SNAPSHOT_KEEP):
+    """
+    Delete all but the `keep` newest snapshot versions (names start with their
+    UTC timestamp). CURRENT is never deleted; workers that still map an older
+    snapshot keep reading it until they reload.
+    """
+    current = CURRENT_FILE.read_text(encoding="utf-8").strip() if CURRENT_FILE.exists() else None
+    versions = sorted((p for p in SNAPSHOTS_DIR.iterdir() if p.is_dir()), key=lambda p: p.name, reverse=True)
+    for old in versions[max(keep, 1):]:
+        if old.name != current:
+            shutil.rmtree(old, ignore_errors=True)
+            print(f"[snapshot] Removed old snapshot {old.name}")
+
+
+class VectorSnapshot:
+    """A loaded snapshot. `matrix` is a read-only np.memmap (zero copy, shared page cache)."""
+
+    def __init__(self, path: Path, mmap: bool = True):
+        self.path = path
+        self.manifest: Dict[str, Any] = json.loads((path / "manifest.json").read_text(encoding="utf-8"))
+        table = json.loads((path / "ids.json").read_text(encoding="utf-8"))
+        self.ids: List[str] = table["ids"]
+        self.row_namespaces: List[str] = table["namespaces"]
+        self.content_hashes: List[str] = table["content_hashes"]
+        self.matrix: np.ndarray = np.load(path / "vectors.npy", mmap_mode="r" if mmap else None)
+
+    @property
+    def offsets(self) -> Dict[str, Tuple[int, int]]:
+        return {ns: (v["start"], v["end"]) for ns, v in self.manifest["namespaces"].items()}
+
+    @property
+    def version(self) -> str:
+        return self.manifest["version"]
+
+
+def current_snapshot_path() -> Optional[Path]:
+    if not CURRENT_FILE.exists():
+        return None
+    path = SNAPSHOTS_DIR / CURRENT_FILE.read_text(encoding="utf-8").strip()
+    return path if (path / "manifest.json").exists() else None
+
+
+def load_snapshot(path: Optional[Path] = None, mmap: bool = True) -> Optional[VectorSnapshot]:
+    """Open the given (or CURRENT) snapshot, or None if none was built yet."""
+    path = path or current_snapshot_path()
+    return VectorSnapshot(path, mmap=mmap) if path else None
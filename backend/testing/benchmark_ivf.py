@@ -0,0 +1,39 @@
+"""
+QPS and recall@k of the IVF index for a range of nprobe values against exact search.
+
+    cd backend && python testing/benchmark_ivf.py --k 8 --nprobe 1 4 8 16
+"""
+import argparse
+
+from benchmark_utils import load_corpus, load_queries, recall_at_k, run_queries
+
+from services.ivf_index import IVFIndex
+from services.local_index import LocalIndex
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--k", type=int, default=8)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    snapshot = load_corpus()
+    queries = load_queries(snapshot, args.queries)
+    namespaces = list(snapshot.offsets)
+
+    exact = LocalIndex.from_snapshot(snapshot)
+    truth, exact_qps = run_queries(lambda q: exact.search(q, args.k, namespaces=namespaces), queries)
+    index = IVFIndex.from_snapshot(snapshot)
+
+    print(f"\n{len(index.centroids)} lists, {len(index) / len(index.centroids):.0f} rows per list on average")
+    print(f"{'nprobe':>8} {'QPS':>10} {'recall@' + str(args.k):>10}")
+    print(f"{'exact':>8} {exact_qps:>10.0f} {1.0:>10.3f}")
+    for nprobe in args.nprobe:
+        index.nprobe = nprobe
+        got, qps = run_queries(lambda q: index.search(q, args.k, namespaces=namespaces), queries)
+        print(f"{nprobe:>8} {qps:>10.0f} {recall_at_k(truth, got):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
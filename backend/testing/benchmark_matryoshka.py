@@ -0,0 +1,47 @@
+"""
+Latency and recall@k of two-stage Matryoshka search (truncated-prefix
+shortlist, full-dimension rescoring) against exact full-dimension search.
+
+    cd backend && python testing/benchmark_matryoshka.py --k 8 --dims 256 512 --shortlists 32 64 128
+
+Without OPENAI_API_KEY the queries are perturbed corpus vectors; recall is only
+representative for real text-embedding-3 vectors (snapshot from the uploaders).
+"""
+import argparse
+
+from benchmark_utils import load_corpus, load_queries, recall_at_k, run_queries, fmt_bytes
+
+from services.local_index import LocalIndex
+from services.matryoshka_index import MatryoshkaIndex
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--k", type=int, default=8)
+    parser.add_argument("--dims", type=int, nargs="+", default=[256, 512])
+    parser.add_argument("--shortlists", type=int, nargs="+", default=[32, 64, 128])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    snapshot = load_corpus()
+    queries = load_queries(snapshot, args.queries)
+    namespaces = list(snapshot.offsets)
+
+    exact = LocalIndex.from_snapshot(snapshot)
+    truth, exact_qps = run_queries(lambda q: exact.search(q, args.k, namespaces=namespaces), queries)
+
+    header = f"{'dims':>6} {'shortlist':>10} {'prefix memory':>14} {'ms/query':>10} {'recall@' + str(args.k):>10}"
+    print("\n" + header)
+    print(f"{snapshot.manifest['dim']:>6} {'exact':>10} {fmt_bytes(snapshot.matrix.nbytes):>14} {1000 / exact_qps:>10.3f} {1.0:>10.3f}")
+    for dim in args.dims:
+        index = MatryoshkaIndex.from_snapshot(snapshot)
+        index.dim = min(dim, snapshot.matrix.shape[1])
+        index.prefix = LocalIndex.normalize(snapshot.matrix[:, :index.dim])
+        for shortlist in args.shortlists:
+            index.shortlist = shortlist
+            got, qps = run_queries(lambda q: index.search(q, args.k, namespaces=namespaces), queries)
+            print(f"{index.dim:>6} {shortlist:>10} {fmt_bytes(index.code_bytes()):>14} {1000 / qps:>10.3f} {recall_at_k(truth, got):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Memory, QPS and recall@k of the quantized local indexes against exact search.
+
+    cd backend && python testing/benchmark_quantized.py --k 8 --factor 4
+"""
+import argparse
+
+from benchmark_utils import load_corpus, load_queries, recall_at_k, run_queries, fmt_bytes
+
+from services.local_index import LocalIndex
+from services.quantized_index import Int8Index, BinaryIndex
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--k", type=int, default=8)
+    parser.add_argument("--factor", type=int, default=4, help="shortlist = k * factor")
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    snapshot = load_corpus()
+    queries = load_queries(snapshot, args.queries)
+    namespaces = list(snapshot.offsets)
+
+    exact = LocalIndex.from_snapshot(snapshot)
+    truth, exact_qps = run_queries(lambda q: exact.search(q, args.k, namespaces=namespaces), queries)
+
+    print(f"\n{'mode':<8} {'index memory':>14} {'QPS':>10} {'recall@' + str(args.k):>10}")
+    print(f"{'exact':<8} {fmt_bytes(snapshot.matrix.nbytes):>14} {exact_qps:>10.0f} {1.0:>10.3f}")
+    for name, cls in (("int8", Int8Index), ("binary", BinaryIndex)):
+        index = cls.from_snapshot(snapshot)
+        index.rescore_factor = args.factor
+        got, qps = run_queries(lambda q: index.search(q, args.k, namespaces=namespaces), queries)
+        print(f"{name:<8} {fmt_bytes(index.code_bytes()):>14} {qps:>10.0f} {recall_at_k(truth, got):>10.3f}")
+
+    print("\nQuantized memory is the in-RAM codes; rescoring reads only shortlisted rows of the memory-mapped snapshot.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Microbenchmark of the QueryAnalyzer against the per-request substring scans it
+replaced (infer_programs_simple + detect_lang, the latter ran twice per /ask).
+
+    cd backend && python testing/benchmark_query_analyzer.py --repeat 20
+
+Prints µs per question and the questions where language or programs differ.
+"""
+import argparse
+import time
+from typing import List
+
+from benchmark_utils import logged_questions
+
+from services.query_analyzer import analyze_query
+
+SAMPLE = [
+    "Was lernt man in BMI 10?",
+    "Prüfungsform von BTB 23",
+    "Welche Module im Wintersemester mit mindestens 5 CP und Klausur?",
+    "Is there a master in Medieninformatik?",
+    "Who teaches Marketing in the MAR programme?",
+    "Wann beginnt das Praxissemester bei Medientechnik?",
+]
+
+
+# --- previous implementations (serve_api.infer_programs_simple, embeddings.detect_lang) ---
+
+def legacy_infer_programs(text: str) -> List[str]:
+    t = (text or "").lower()
+    hits: List[str] = []
+    if "btb" in t: hits.append("BTB")
+    if "bmt" in t: hits.append("BMT")
+    if "bmi" in t: hits.append("BMI")
+    if "mmi" in t: hits.append("MMI")
+    if "bcsim" in t or "csim" in t: hits.append("BCSIM")
+    if "bdaisy" in t or "daisy" in t: hits.append("BDAISY")
+    if "mar" in t: hits.append("MAR")
+    if "ton und bild" in t:
+        hits.append("BTB")
+    if "medientechnik" in t:
+        hits.append("BMT")
+    if "medieninformatik" in t:
+        if ("master" in t) or ("msc" in t) or ("m.sc" in t):
+            hits.append("MMI")
+        else:
+            hits.append("BMI")
+    if "creative, synthetic and interactive media" in t:
+        hits.append("BCSIM")
+    if ("data science, ai und intelligente systeme" in t) or ("daisy" in t):
+        hits.append("BDAISY")
+    if "applied research in digital media technologies" in t:
+        hits.append("MAR")
+    seen = set()
+    return [p for p in hits if not (p in seen or seen.add(p))]
+
+
+LEGACY_GERMAN_MARKERS = [
+    "wie", "was", "wer", "wo", "warum", "wieso", "weshalb", "wann", "wem", "wen", "wohin", "woher", "wozu",
+    "werde", "werden", "bin", "bist", "sind", "seid", "sind",
+    "welche", "welcher", "welches", "gibt es", "kann ich", "ist",
+    "helfen", "hilfe", "informationen", "kontakt",
+    "finden", "suche", "suchen", "erklären", "erkläre", "erklärt",
+    "bedeuten", "bedeutet", "bedeutung",
+    "unterscheiden", "unterschied", "unterschiede",
+    "hochschule", "fachbereich", "studium", "studierende", "studierenden",
+    "studiengang", "studiengänge", "studienbüro", "erstsemester",
+    "bewerbung", "zulassung", "einschreibung", "immatrikulation",
+    "rückmeldung", "exmatrikulation",
+    "wintersemester", "sommersemester", "vorlesungszeit", "vorlesungsfreie zeit", "semesterferien",
+    "modul", "modulhandbuch", "modulbeschreibung",
+    "prüf", "prüfungsordnung", "klausur", "mündliche prüfung", "schriftliche prüfung",
+    "hausarbeit", "leistungspunkte", "sws",
+    "vorlesung", "übung", "veranstaltungsverzeichnis",
+    "studienordnung", "studienverlaufsplan", "wahlbereich", "wahlpflicht", "pflichtmodul", "schwerpunkt",
+    "bachelorarbeit", "masterarbeit", "zeugnis",
+    "dozent", "dozentin", "praxissemester", "formular", "richtlinie",
+]
+
+
+def legacy_detect_lang(text: str) -> str:
+    t = (text or "").lower()
+    if any(ch in t for ch in ("ä", "ö", "ü", "ß")):
+        return "de"
+    return "de" if any(m in t for m in LEGACY_GERMAN_MARKERS) else "en"
+
+
+def legacy_request(q: str):
+    # plan (programs + no-context/lang) and ask_openai each called detect_lang
+    return legacy_infer_programs(q), legacy_detect_lang(q), legacy_detect_lang(q)
+
+
+def analyzer_request(q: str):
+    a = analyze_query(q)
+    return a.programs, a.lang, analyze_query(q).lang
+
+
+def timed(fn, questions, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for q in questions:
+            fn(q)
+    return (time.perf_counter() - start) / (repeat * len(questions)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=2000)
+    args = parser.parse_args()
+
+    questions = logged_questions(args.limit) or SAMPLE
+    print(f"{len(questions)} questions")
+
+    legacy_us = timed(legacy_request, questions, args.repeat)
+
+    def uncached(q):
+        analyze_query.cache_clear()
+        return analyzer_request(q)
+
+    uncached_us = timed(uncached, questions, args.repeat)
+    analyze_query.cache_clear()
+    cached_us = timed(analyzer_request, questions, args.repeat)
+
+    print(f"\n{'variant':<28} {'µs/question':>12}")
+    print(f"{'legacy substring scans':<28} {legacy_us:>12.1f}")
+    print(f"{'QueryAnalyzer (uncached)':<28} {uncached_us:>12.1f}")
+    print(f"{'QueryAnalyzer (memoized)':<28} {cached_us:>12.1f}")
+
+    diffs = []
+    for q in questions:
+        old_programs, old_lang, _ = legacy_request(q)
+        new = analyze_query(q)
+        if old_lang != new.lang or old_programs != list(new.programs):
+            diffs.append((q, old_lang, old_programs, new.lang, list(new.programs)))
+    print(f"\n{len(diffs)} questions classified differently (legacy → analyzer):")
+    for q, ol, op, nl, np_ in diffs[:20]:
+        print(f"  {q[:70]!r}: {ol} {op} → {nl} {np_}")
+
+
+if __name__ == "__main__":
+    main()
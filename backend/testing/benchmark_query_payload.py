@@ -0,0 +1,134 @@
+"""
+Response payload and latency of Pinecone queries with the stored metadata
+(include_metadata=True, metadata as the uploaders write it) against slim
+upload metadata and ids-and-scores-only queries (PINECONE_INCLUDE_METADATA=0,
+records rehydrated from the loader).
+
+    cd backend && python testing/benchmark_query_payload.py --k 32
+    cd backend && python testing/benchmark_query_payload.py --live   # real index, needs keys
+
+Offline, the payload is measured on the in-memory stand-in loaded with the
+metadata from data/ the way the uploaders store it; --live queries the
+configured Pinecone index with and without metadata and also reports latency.
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from benchmark_utils import BACKEND_DIR, logged_questions
+
+from services.context_builder import build_context
+from services.loader import AVAILABLE_NAMESPACES, ID_TO_NAMESPACE, load_text_store
+from services.local_index import LocalMatch
+from services.pinecone_standin import InMemoryPineconeIndex
+from services.single_index import upload_metadata
+
+DIM = 64
+
+
+def _sanitize(meta):
+    return {
+        k: "no data" if v is None else v if isinstance(v, (str, int, float, bool)) else str(v)
+        for k, v in (meta or {}).items()
+    }
+
+
+def uploaded_metadata() -> dict:
+    """rid → metadata as vector_upload_json / vector_upload_web store it."""
+    out = {}
+    for path in (BACKEND_DIR / "data" / "merged").glob("*.jsonl"):
+        for line in path.open(encoding="utf-8"):
+            rec = json.loads(line)
+            out[rec["id"]] = _sanitize(rec.get("metadata"))
+    for path in (BACKEND_DIR / "data" / "processed_web").glob("*_web.json"):
+        data = json.loads(path.read_text(encoding="utf-8"))
+        for rec in data if isinstance(data, list) else [data]:
+            if rec.get("id"):
+                out[rec["id"]] = {**_sanitize(rec.get("metadata")), "snippet": (rec.get("text") or "")[:300]}
+    return out
+
+
+def response_bytes(matches) -> int:
+    """Size of the JSON body Pinecone returns for these matches."""
+    body = {"matches": [
+        {"id": m.id, "score": m.score, "values": [], **({"metadata": m.metadata} if m.metadata else {})}
+        for m in matches
+    ]}
+    return len(json.dumps(body, ensure_ascii=False).encode("utf-8"))
+
+
+def offline(k: int, n_queries: int):
+    stored = uploaded_metadata()
+    rng = np.random.default_rng(0)
+    variants = {"full metadata": False, "slim metadata": True}
+    indexes = {name: InMemoryPineconeIndex() for name in variants}
+    for ns in AVAILABLE_NAMESPACES:
+        ids = [rid for rid, n in ID_TO_NAMESPACE.items() if n == ns]
+        vecs = rng.normal(size=(len(ids), DIM))
+        for name, slim in variants.items():
+            indexes[name].upsert([
+                {"id": rid, "values": v.tolist(), "metadata": upload_metadata(stored.get(rid, {}), ns, slim=slim)}
+                for rid, v in zip(ids, vecs)
+            ], namespace=ns)
+
+    queries = rng.normal(size=(n_queries, DIM))
+    print(f"\n{len(ID_TO_NAMESPACE)} records, {len(AVAILABLE_NAMESPACES)} namespaces, top_k={k} per namespace")
+    print(f"{'mode':>28} {'KiB / search':>13} {'bytes / match':>14}")
+    for name, index in indexes.items():
+        for include in (True, False):
+            if not include and name == "slim metadata":
+                continue
+            total = matches = 0
+            for q in queries:
+                for ns in AVAILABLE_NAMESPACES:
+                    res = index.query(vector=q, top_k=k, include_metadata=include, namespace=ns)
+                    total += response_bytes(res.matches)
+                    matches += len(res.matches)
+            label = f"{name}" if include else "ids + scores only"
+            print(f"{label:>28} {total / n_queries / 1024:>13.1f} {total / max(matches, 1):>14.0f}")
+
+    # rehydration: build_context on ids-only matches reads ID_TO_TEXT / ID_TO_META
+    ids = list(ID_TO_NAMESPACE)[:k]
+    t0 = time.perf_counter()
+    for _ in range(200):
+        build_context([LocalMatch(id=rid, score=0.5) for rid in ids])
+    print(f"\nrehydration + build_context for {k} ids-only matches: {(time.perf_counter() - t0) / 200 * 1000:.2f} ms")
+
+
+def live(k: int, n_queries: int):
+    from services.embeddings import embed_batch
+    from services.pinecone_search import get_index
+
+    index = get_index()
+    questions = logged_questions(n_queries) or ["Welche Module gibt es im BMT?"]
+    vectors = embed_batch(questions)
+    print(f"\n{len(vectors)} logged questions, {len(AVAILABLE_NAMESPACES)} namespaces, top_k={k}")
+    print(f"{'include_metadata':>17} {'KiB / search':>13} {'ms / query':>11} {'ms p95':>8}")
+    for include in (True, False):
+        sizes, times = [], []
+        for vec in vectors:
+            size = 0
+            for ns in AVAILABLE_NAMESPACES:
+                t0 = time.perf_counter()
+                res = index.query(vector=vec, top_k=k, include_metadata=include, namespace=ns)
+                times.append((time.perf_counter() - t0) * 1000)
+                size += len(json.dumps(res.to_dict(), default=str).encode("utf-8"))
+            sizes.append(size)
+        print(f"{str(include):>17} {np.mean(sizes) / 1024:>13.1f} {np.mean(times):>11.1f} {np.percentile(times, 95):>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--k", type=int, default=32)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--live", action="store_true", help="query the configured Pinecone index")
+    args = parser.parse_args()
+
+    load_text_store()
+    (live if args.live else offline)(args.k, args.queries)
+
+
+if __name__ == "__main__":
+    main()
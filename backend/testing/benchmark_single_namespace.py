@@ -0,0 +1,100 @@
+"""
+Per-namespace fan-out (one Pinecone query per namespace) against the single
+namespace layout (one query with a $in filter), both on the in-memory Pinecone
+stand-in with a simulated round trip per call.
+
+    cd backend && python testing/benchmark_single_namespace.py --latency-ms 40 --queries 50
+
+Vectors come from the CURRENT snapshot when there is one, otherwise random
+vectors for the loader records (latency and query counts do not depend on
+them). Prints ms per search, Pinecone calls per search and the overlap of the
+two result lists.
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from benchmark_utils import recall_at_k
+
+from services import pinecone_search
+from services.facets import filter_view
+from services.loader import AVAILABLE_NAMESPACES, ID_TO_NAMESPACE, load_text_store
+from services.pinecone_standin import InMemoryPineconeIndex
+from services.single_index import migrate_to_single_namespace
+from services.vector_snapshot import load_snapshot
+
+DIM = 256
+
+
+def build_standin(latency: float) -> InMemoryPineconeIndex:
+    index = InMemoryPineconeIndex()
+    snapshot = load_snapshot()
+    if snapshot is not None:
+        print(f"Snapshot {snapshot.version}: {len(snapshot.ids)} vectors")
+        for ns, (start, end) in snapshot.offsets.items():
+            index.upsert([
+                {"id": rid, "values": snapshot.matrix[row].tolist(), "metadata": filter_view(rid)}
+                for row, rid in zip(range(start, end), snapshot.ids[start:end])
+            ], namespace=ns)
+    else:
+        print(f"No snapshot: random {DIM}-dim vectors for {len(ID_TO_NAMESPACE)} loader records")
+        rng = np.random.default_rng(0)
+        for ns in AVAILABLE_NAMESPACES:
+            ids = [rid for rid, n in ID_TO_NAMESPACE.items() if n == ns]
+            index.upsert([
+                {"id": rid, "values": rng.normal(size=DIM).tolist(), "metadata": filter_view(rid)} for rid in ids
+            ], namespace=ns)
+    migrate_to_single_namespace(index, AVAILABLE_NAMESPACES, "all")
+    index.latency = latency
+    return index
+
+
+async def run(index, layout: str, queries, top_k: int, namespaces, program):
+    pinecone_search.PINECONE_LAYOUT = layout
+    index.calls = 0
+    results, times = [], []
+    for q in queries:
+        t0 = time.perf_counter()
+        matches = await pinecone_search.asearch_all_namespaces(q, top_k, None, program, namespaces)
+        times.append((time.perf_counter() - t0) * 1000)
+        results.append([m.id for m in matches])
+    return results, times, index.calls / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency-ms", type=float, default=40.0, help="simulated round trip per Pinecone call")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=12)
+    args = parser.parse_args()
+
+    load_text_store()
+    index = build_standin(args.latency_ms / 1000)
+    pinecone_search._index = index
+    pinecone_search.PINECONE_SINGLE_NAMESPACE = "all"
+
+    dim = len(next(iter(index._ns["all"].values())).values)
+    rng = np.random.default_rng(1)
+    queries = [v.tolist() for v in rng.normal(size=(args.queries, dim))]
+    cases = {
+        "all namespaces": (["FBM_WEB"] + AVAILABLE_NAMESPACES, None),
+        "one program": (["FBM_WEB", "BMI", "BMI_WEB"], "BMI"),
+    }
+
+    print(f"\nSEARCH_CONCURRENCY={pinecone_search.SEARCH_CONCURRENCY}, {args.latency_ms:g} ms per call, top_k={args.k}")
+    print(f"{'case':>16} {'layout':>11} {'calls':>6} {'ms mean':>8} {'ms p95':>8} {'overlap':>8}")
+    for name, (namespaces, program) in cases.items():
+        truth = None
+        for layout in ("namespaces", "single"):
+            got, times, calls = asyncio.run(run(index, layout, queries, args.k, namespaces, program))
+            truth = truth or got
+            print(
+                f"{name:>16} {layout:>11} {calls:>6.1f} {np.mean(times):>8.1f} "
+                f"{np.percentile(times, 95):>8.1f} {recall_at_k(truth, got):>8.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Shared helpers for the retrieval benchmarks in this folder.
+
+Corpus: the CURRENT vector snapshot (data/vectors, written by the uploaders or
+`python -m services.local_index`). Queries: logged student questions embedded
+with the production model when OPENAI_API_KEY is set, otherwise perturbed
+corpus vectors as a stand-in.
+"""
+import csv
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Sequence
+
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from services.vector_snapshot import load_snapshot, VectorSnapshot
+
+LOG_JSONL = BACKEND_DIR / "logs" / "chat_log.jsonl"
+LOG_CSV = BACKEND_DIR / "logs" / "291225_chat_logs_RAW.csv"
+
+
+def load_corpus() -> VectorSnapshot:
+    snapshot = load_snapshot()
+    if snapshot is None:
+        sys.exit("No vector snapshot found. Run an uploader or `python -m services.local_index` first.")
+    print(f"Snapshot {snapshot.version}: {len(snapshot.ids)} vectors, dim {snapshot.manifest['dim']}")
+    return snapshot
+
+
+def logged_questions(limit: int) -> List[str]:
+    questions: List[str] = []
+    if LOG_JSONL.exists():
+        for line in LOG_JSONL.open(encoding="utf-8"):
+            q = json.loads(line).get("question")
+            if q:
+                questions.append(q)
+    if LOG_CSV.exists():
+        with LOG_CSV.open(encoding="utf-8") as f:
+            questions.extend(row["question"] for row in csv.DictReader(f) if row.get("question"))
+    return list(dict.fromkeys(questions))[:limit]
+
+
+def load_queries(snapshot: VectorSnapshot, n: int = 200, seed: int = 0) -> np.ndarray:
+    """(n, dim) L2-normalized float32 query vectors."""
+    if os.getenv("OPENAI_API_KEY"):
+        from services.embeddings import embed_batch
+        questions = logged_questions(n)
+        vecs = [v for i in range(0, len(questions), 100) for v in embed_batch(questions[i:i + 100]) if v]
+        queries = np.asarray(vecs, dtype=np.float32)
+        print(f"Queries: {len(queries)} logged questions")
+    else:
+        rng = np.random.default_rng(seed)
+        rows = rng.choice(len(snapshot.ids), size=min(n, len(snapshot.ids)), replace=False)
+        base = np.asarray(snapshot.matrix[np.sort(rows)], dtype=np.float32)
+        queries = base + rng.normal(scale=0.5 / np.sqrt(base.shape[1]), size=base.shape).astype(np.float32)
+        print(f"Queries: {len(queries)} perturbed corpus vectors (set OPENAI_API_KEY for logged questions)")
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def recall_at_k(truth: Sequence[Sequence[str]], got: Sequence[Sequence[str]]) -> float:
+    hits = sum(len(set(t) & set(g)) for t, g in zip(truth, got))
+    total = sum(len(t) for t in truth)
+    return hits / total if total else 0.0
+
+
+def run_queries(search: Callable[[List[float]], list], queries: np.ndarray):
+    """Return (ids per query, queries per second)."""
+    results = []
+    start = time.perf_counter()
+    for q in queries:
+        results.append([m.id for m in search(q.tolist())])
+    elapsed = time.perf_counter() - start
+    return results, len(queries) / elapsed if elapsed else float("inf")
+
+
+def fmt_bytes(n: int) -> str:
+    return f"{n / 1024 / 1024:.2f} MiB"
@@ -0,0 +1,83 @@
+"""
+Offline checks for adaptive top_k (services/adaptive_k.py): when a search is
+widened and where a ranking is cut. Run from backend/:
+
+    python -m pytest testing/test_adaptive_k.py
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.adaptive_k import AdaptiveTopK
+from services.loader import ID_TO_META
+from services.local_index import LocalMatch
+
+
+def ranking(*scores):
+    return [LocalMatch(id=f"r{i}", score=s) for i, s in enumerate(scores)]
+
+
+def adaptive():
+    return AdaptiveTopK(flat_ratio=0.9, relative_cutoff=0.7, min_gap=0.05, min_keep=3)
+
+
+def test_widens_only_full_flat_results():
+    a = adaptive()
+    assert a.is_flat(ranking(0.62, 0.61, 0.60, 0.59), 4)
+    assert not a.is_flat(ranking(0.80, 0.78, 0.55, 0.50), 4)  # steep: the top is clear
+    assert not a.is_flat(ranking(0.62, 0.61, 0.60), 4)  # fewer than k came back
+
+
+def test_cut_at_largest_gap_or_relative_floor():
+    a = adaptive()
+    strong = ranking(0.81, 0.80, 0.79, 0.78, 0.77, 0.76, 0.52, 0.51, 0.50)
+    kept, reason = a.cut(strong)
+    assert [m.id for m in kept] == ["r0", "r1", "r2", "r3", "r4", "r5"] and reason == "gap"
+
+    # no gap >= min_gap: the relative floor (0.7 * best) ends the ranking
+    kept, reason = a.cut(ranking(0.60, 0.57, 0.54, 0.51, 0.48, 0.45, 0.41, 0.39))
+    assert [m.id for m in kept] == ["r0", "r1", "r2", "r3", "r4", "r5"] and reason == "relative"
+
+    # never below min_keep, even when the big drop comes first
+    kept, reason = a.cut(ranking(0.9, 0.5, 0.49, 0.48, 0.47))
+    assert len(kept) == 3
+
+    a.record(True, 6, "gap", 40.0)
+    a.record(False, 3, "none")
+    assert a.stats()["widened"] == 1 and a.stats()["widen_rate"] == 0.5 and a.stats()["cuts"] == {"gap": 1, "none": 1}
+
+
+def test_hybrid_fusion_keeps_the_cut(monkeypatch):
+    import serve_api
+
+    # one record per module, so PER_MODULE_CAP does not thin the context
+    ids = list({meta["moduleNumber"]: rid for rid, meta in ID_TO_META.items() if meta.get("credits")}.values())[:12]
+    scores = [0.81, 0.80, 0.79, 0.78, 0.77, 0.70, 0.40, 0.39, 0.38, 0.37, 0.36, 0.35]
+    calls = []
+
+    async def steep_search(vector, top_k, filter=None, program=None, namespaces=None):
+        calls.append(top_k)
+        return [LocalMatch(rid, s) for rid, s in zip(ids, scores)][:top_k]
+
+    a = adaptive()
+    monkeypatch.setattr(serve_api, "ADAPTIVE_K", a)
+    monkeypatch.setattr(serve_api, "ADAPTIVE_TOP_K", True)
+    monkeypatch.setattr(serve_api, "ADAPTIVE_START_K", 6)
+    monkeypatch.setattr(serve_api, "HYBRID_SEARCH", True)
+    monkeypatch.setattr(serve_api, "NAMESPACE_ROUTER", False)
+    monkeypatch.setattr(serve_api, "asearch_all_namespaces", steep_search)
+    built = []
+    build_context = serve_api.build_context
+    monkeypatch.setattr(serve_api, "build_context", lambda matches: built.append(matches) or build_context(matches))
+
+    question = "Wie melde ich die Bachelorarbeit an?"
+    assert serve_api.get_bm25_index().search(question, 5)
+    plan = serve_api.plan_retrieval(serve_api.QuestionRequest(question=question))
+    _, sources = asyncio.run(serve_api.search_context(plan, [0.3] * 8))
+    assert calls == [6]  # steep: not widened
+    assert a.stats()["cuts"] == {"gap": 1} and a.stats()["avg_kept"] == 5
+    # BM25 finds web pages for the question, but does not refill the cut ranking
+    assert {m.id for m in built[0]} == set(ids[:5])
+    assert {s.id for s in sources} == set(ids[:5])
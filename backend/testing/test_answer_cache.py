@@ -0,0 +1,56 @@
+"""
+Offline checks for the semantic answer cache (services/answer_cache.py).
+Run from backend/:
+
+    python -m pytest testing/test_answer_cache.py
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.answer_cache import SemanticAnswerCache
+
+BMI = (("BMI",), None, None, None, None, None, None, None)
+BMT = (("BMT",), None, None, None, None, None, None, None)
+
+
+def test_near_duplicates_hit_within_their_scope():
+    cache = SemanticAnswerCache(threshold=0.95, maxsize=10, ttl=60)
+    cache.store(BMI, [1.0, 0.0, 0.0], "answer", ["src"])
+
+    answer, sources, sim = cache.lookup(BMI, [0.99, 0.05, 0.0])
+    assert (answer, sources) == ("answer", ["src"]) and sim > 0.95
+    assert cache.lookup(BMI, [0.7, 0.7, 0.0]) is None  # different question
+    assert cache.lookup(BMT, [1.0, 0.0, 0.0]) is None  # same question, other program
+    assert cache.lookup(BMI, []) is None  # failed embedding
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 3
+
+
+def test_eviction_by_size_and_age(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("services.answer_cache.time.monotonic", lambda: now[0])
+    cache = SemanticAnswerCache(threshold=0.95, maxsize=2, ttl=60)
+    cache.store(BMI, [1.0, 0.0], "a", [])
+    cache.store(BMI, [0.0, 1.0], "b", [])
+    assert cache.lookup(BMI, [1.0, 0.0])[0] == "a"  # "a" is now the most recent
+    cache.store(BMT, [1.0, 0.0], "c", [])
+    assert cache.lookup(BMI, [0.0, 1.0]) is None  # least recently used, evicted
+    assert cache.lookup(BMI, [1.0, 0.0])[0] == "a"
+
+    now[0] += 61
+    assert cache.lookup(BMT, [1.0, 0.0]) is None
+    assert cache.stats()["size"] == 0 and cache.stats()["scopes"] == 0
+
+
+def test_scope_includes_the_question_hints_and_module_ids():
+    import serve_api
+
+    def scope(question):
+        req = serve_api.QuestionRequest(question=question, program="BMI")
+        return serve_api.answer_scope(req, serve_api.plan_retrieval(req))
+
+    assert scope("Welche Prüfung hat Mathe im 3. Semester?") != scope("Welche Prüfung hat Mathe im 4. Semester?")
+    assert scope("Wer lehrt BMI 98?") != scope("Wer lehrt BMI 99?")
+    assert scope("Wer lehrt BMI 98 und BMI 99?") == scope("Wer lehrt BMI 99 und BMI 98?")
+    assert scope("Welche Prüfung hat Mathe?") == scope("Welche Prüfung hat Mathematik?")
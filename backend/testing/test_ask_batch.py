@@ -0,0 +1,73 @@
+"""
+Offline test for /ask-batch with fake embedding, search and LLM calls.
+Run from backend/:
+
+    python -m pytest testing/test_ask_batch.py
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.testclient import TestClient
+
+import serve_api
+from services.embed_cache import EmbeddingCache
+from services.loader import ID_TO_META
+from services.local_index import LocalMatch
+
+JAVA = [rid for rid, meta in ID_TO_META.items() if meta.get("moduleNumber") == "BMI 10"]
+
+
+def patch(monkeypatch):
+    calls = {"embed": [], "llm": []}
+
+    async def fake_embed_batch(texts):
+        calls["embed"].append(list(texts))
+        return [[0.1] * 8 for _ in texts]
+
+    async def fake_search(vector, top_k, filter=None, program=None, namespaces=None):
+        return [LocalMatch(rid, 0.9) for rid in JAVA]
+
+    async def fake_llm(context, question, history, lang=None):
+        calls["llm"].append(question)
+        return f"Antwort auf: {question}"
+
+    monkeypatch.setattr(serve_api, "aembed_batch", fake_embed_batch)
+    monkeypatch.setattr(serve_api, "EMBED_CACHE", EmbeddingCache(maxsize=8, ttl=60, path=""))
+    monkeypatch.setattr(serve_api, "asearch_all_namespaces", fake_search)
+    monkeypatch.setattr(serve_api, "aask_openai", fake_llm)
+    monkeypatch.setattr(serve_api, "HYBRID_SEARCH", False)
+    monkeypatch.setattr(serve_api, "NAMESPACE_ROUTER", False)
+    return calls
+
+
+def test_batch_dedupes_embeds_once_and_keeps_order(monkeypatch):
+    calls = patch(monkeypatch)
+    questions = [
+        "Was lernt man über Java-Programmierung?",
+        "Was lernt man in BMI 10?",
+        "  was lernt man über java-programmierung? ",
+    ]
+    res = TestClient(serve_api.app).post("/ask-batch", json={"questions": questions})
+    assert res.status_code == 200
+    body = res.json()
+
+    assert body["unique"] == 2 and body["total_ms"] >= 0
+    assert [r["question"] for r in body["results"]] == questions
+    assert body["results"][0]["answer"] == body["results"][2]["answer"]
+    # one embeddings call, and only for the question without a module id
+    assert calls["embed"] == [["Was lernt man über Java-Programmierung?"]]
+    assert len(calls["llm"]) == 2
+    for r in body["results"]:
+        assert r["error"] is None
+        assert {s["moduleNumber"] for s in r["sources"]} == {"BMI 10"}
+        assert set(r["timings"]) >= {"embed", "search", "total"}
+    assert body["results"][1]["timings"]["embed"] == 0.0
+
+
+def test_batch_size_is_limited(monkeypatch):
+    patch(monkeypatch)
+    monkeypatch.setattr(serve_api, "BATCH_MAX_QUESTIONS", 2)
+    res = TestClient(serve_api.app).post("/ask-batch", json={"questions": ["a", "b", "c"]})
+    assert res.status_code == 413
@@ -0,0 +1,146 @@
+"""
+Offline test for /ask-stream against a local fake streaming LLM.
+
+Retrieval and generation are replaced with in-process fakes, so no OpenAI or
+Pinecone access is needed. Run from backend/:
+
+    python -m pytest testing/test_ask_stream.py
+    python testing/test_ask_stream.py
+"""
+import asyncio
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.testclient import TestClient
+
+import serve_api
+from services.loader import ID_TO_META
+from services.streaming import buffered
+
+FAKE_TOKENS = ["Das ", "Modul ", "BMI 10 ", "behandelt ", "Java."]
+
+
+CALLS = []
+
+
+async def fake_embed(text):
+    CALLS.append("embed")
+    return [0.0] * 8
+
+
+async def fake_search(vector, top_k, filter=None, program=None, namespaces=None):
+    CALLS.append("search")
+    ids = [rid for rid, meta in ID_TO_META.items() if meta.get("moduleNumber") == "BMI 10"]
+    return [SimpleNamespace(id=rid, score=0.9, metadata={}) for rid in ids]
+
+
+async def fake_llm_stream(context, question, history, lang=None):
+    for tok in FAKE_TOKENS:
+        await asyncio.sleep(0.01)
+        yield tok
+
+
+def parse_sse(body: str):
+    events = []
+    for frame in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in frame.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_ask_stream_emits_sources_then_tokens_then_done():
+    logged = []
+    patches = {
+        "aembed": fake_embed,
+        "asearch_all_namespaces": fake_search,
+        "aask_openai_stream": fake_llm_stream,
+        "save_log": lambda *args, **kwargs: logged.append((args, kwargs)),
+        "HYBRID_SEARCH": False,
+        "NAMESPACE_ROUTER": False,
+    }
+    CALLS.clear()
+    originals = {name: getattr(serve_api, name) for name in patches}
+    for name, fake in patches.items():
+        setattr(serve_api, name, fake)
+    try:
+        client = TestClient(serve_api.app)
+        # no module id in the question, so it goes through embedding + search
+        res = client.post("/ask-stream", json={"question": "Was lernt man über Java-Programmierung?"})
+    finally:
+        for name, orig in originals.items():
+            setattr(serve_api, name, orig)
+
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/event-stream")
+    assert CALLS == ["embed", "search"]
+
+    events = parse_sse(res.text)
+    kinds = [e for e, _ in events]
+    assert kinds[0] == "sources"
+    assert kinds[-1] == "done"
+    assert set(kinds[1:-1]) == {"token"}
+
+    sources = events[0][1]["sources"]
+    assert sources and sources[0]["moduleNumber"] == "BMI 10"
+
+    streamed = "".join(data["text"] for kind, data in events if kind == "token")
+    assert streamed == "".join(FAKE_TOKENS)
+    assert events[-1][1]["answer"].startswith(streamed.strip())
+
+    # closing event writes exactly one log entry with the full answer
+    assert len(logged) == 1
+    assert logged[0][0][1] == events[-1][1]["answer"]
+
+
+def test_named_module_skips_embedding_and_search(monkeypatch):
+    async def no_embed(text):
+        raise AssertionError("a named module must not be embedded")
+
+    monkeypatch.setattr(serve_api, "aembed", no_embed)
+    monkeypatch.setattr(serve_api, "asearch_all_namespaces", no_embed)
+    monkeypatch.setattr(serve_api, "aask_openai_stream", fake_llm_stream)
+    monkeypatch.setattr(serve_api, "save_log", lambda *args, **kwargs: None)
+
+    res = TestClient(serve_api.app).post("/ask-stream", json={"question": "Was lernt man in BMI 10?"})
+    assert res.status_code == 200
+    events = parse_sse(res.text)
+    assert events[0][0] == "sources"
+    assert {s["moduleNumber"] for s in events[0][1]["sources"]} == {"BMI 10"}
+    assert events[-1][0] == "done"
+
+
+def test_buffered_applies_backpressure():
+    produced = []
+
+    async def fast_source():
+        for i in range(200):
+            produced.append(i)
+            yield str(i)
+
+    async def run():
+        received = []
+        stream = buffered(fast_source(), maxsize=8)
+        async for chunk in stream:
+            received.extend(chunk)
+            # a slow client: the producer must stall at the buffer size
+            await asyncio.sleep(0.001)
+            assert len(produced) - len(received) <= 8 + 1
+            if len(received) >= 50:
+                break
+        await stream.aclose()
+        return received
+
+    received = asyncio.run(run())
+    assert received == [str(i) for i in range(len(received))]
+    # the producer stopped once the consumer went away
+    assert len(produced) < 200
+
+
+if __name__ == "__main__":
+    test_ask_stream_emits_sources_then_tokens_then_done()
+    test_buffered_applies_backpressure()
+    print("ok")
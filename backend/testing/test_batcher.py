@@ -0,0 +1,66 @@
+"""
+Offline checks for the embedding micro-batcher (services/batcher.py).
+Run from backend/:
+
+    python -m pytest testing/test_batcher.py
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.batcher import MicroBatcher
+
+
+def recording_batch_fn(calls, fail=False):
+    async def batch_fn(items):
+        calls.append(list(items))
+        if fail:
+            raise RuntimeError("embedding API down")
+        return [item.upper() for item in items]
+    return batch_fn
+
+
+def test_concurrent_calls_flush_as_one_batch_after_the_window():
+    calls = []
+    batcher = MicroBatcher(recording_batch_fn(calls), window_ms=20, max_batch=64)
+
+    async def run():
+        return await asyncio.gather(*(batcher.submit(q) for q in ("a", "b", "a", "c")))
+
+    assert asyncio.run(run()) == ["A", "B", "A", "C"]
+    assert calls == [["a", "b", "c"]]  # duplicates are sent once
+    assert batcher.stats()["batches"] == 1 and batcher.stats()["items"] == 4
+
+
+def test_max_batch_flushes_immediately():
+    calls = []
+    batcher = MicroBatcher(recording_batch_fn(calls), window_ms=10_000, max_batch=2)
+
+    async def run():
+        return await asyncio.wait_for(asyncio.gather(*(batcher.submit(q) for q in "abcd")), timeout=1)
+
+    assert asyncio.run(run()) == ["A", "B", "C", "D"]
+    assert calls == [["a", "b"], ["c", "d"]]
+    assert batcher.stats()["batch_sizes"] == {2: 2}
+
+
+def test_a_failed_batch_fails_every_caller():
+    calls = []
+    batcher = MicroBatcher(recording_batch_fn(calls, fail=True), window_ms=5, max_batch=64)
+
+    async def run():
+        return await asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert len(calls) == 1
+
+    async def single():
+        return await batcher.submit("c")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(single())
@@ -0,0 +1,116 @@
+"""
+Offline checks for the BM25 index and reciprocal rank fusion (services/bm25.py).
+Run from backend/:
+
+    python -m pytest testing/test_bm25.py
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.bm25 import BM25Index, rrf_fuse, tokenize
+from services.loader import ID_TO_TEXT
+from services.local_index import LocalMatch
+
+RECORDS = {
+    "a": "Das Praxissemester findet im 5. Semester statt.",
+    "b": "Modul BMI 10: Grundlagen der Programmierung, Prüfung: Klausur",
+    "c": "Semester Ticket und Praxis im Labor",
+    "d": "Prüfungsordnung § 12 Abs. 3 regelt die Wiederholung",
+    "e": "Web page about the BMI programme",
+}
+NAMESPACES = {"a": "BMI_WEB", "b": "BMI", "c": "BMT_WEB", "d": "BDAISY", "e": "BMI_WEB"}
+
+
+def test_tokenize_folds_umlauts_and_joins_codes():
+    assert tokenize("PRÜFUNG Pruefung") == ["pruefung", "pruefung"]
+    assert "bmi10" in tokenize("Was ist BMI 10?")
+    assert "§12" in tokenize("§ 12 Abs. 3")
+
+
+def test_compounds_are_split_against_the_vocabulary():
+    index = BM25Index(RECORDS, NAMESPACES)
+    assert index.split_compound("praxissemester") == ("praxis", "semester")
+    # "semester" alone finds the compound in "a"
+    assert "a" in [m.id for m in index.search("Semester", 5)]
+
+
+def test_exact_codes_and_namespace_restriction():
+    index = BM25Index(RECORDS, NAMESPACES)
+    assert index.search("BMI 10", 1)[0].id == "b"
+    assert index.search("§ 12", 1)[0].id == "d"
+    hits = index.search("Semester", 5, namespaces=["BMT_WEB"])
+    assert [m.id for m in hits] == ["c"]
+
+
+def test_rrf_prefers_agreement_and_keeps_cosine_scores():
+    vector = [LocalMatch("x", 0.8), LocalMatch("y", 0.7), LocalMatch("low", 0.1)]
+    lexical = [LocalMatch("y", 12.0), LocalMatch("z", 9.0), LocalMatch("w", 7.0), LocalMatch("low", 5.0)]
+    fused = rrf_fuse(vector, lexical, top_k=4, min_vector_score=0.2, lexical_scores={"z": 0.5, "w": 0.05})
+    assert [m.id for m in fused] == ["y", "x", "z"]
+    # the rank orders, the score stays the cosine; hits below the threshold take no slot
+    assert [m.score for m in fused] == [0.7, 0.8, 0.5]
+    # lexical-only hits without a cosine cannot pass the threshold
+    assert [m.id for m in rrf_fuse(vector, lexical, top_k=4, min_vector_score=0.2)] == ["y", "x"]
+
+
+def test_lexical_only_hits_are_scored_against_the_query(monkeypatch):
+    import asyncio
+    import serve_api
+
+    question = "Wie melde ich die Bachelorarbeit an?"
+    plan = serve_api.plan_retrieval(serve_api.QuestionRequest(question=question))
+    lexical = [m.id for m in serve_api.get_bm25_index().search(question, serve_api.HYBRID_TOP_K, plan.namespaces, plan.filter)]
+    vector_ids = [rid for rid in ID_TO_TEXT if rid not in lexical][:serve_api.HYBRID_TOP_K - 1]
+    scored = []
+
+    async def fake_search(vector, top_k, filter=None, program=None, namespaces=None):
+        return [LocalMatch(rid, 0.5 - i * 0.01) for i, rid in enumerate(vector_ids)][:top_k]
+
+    async def fake_score(vector, ids, program=None):
+        scored.append(list(ids))
+        return {ids[0]: 0.6, **{rid: 0.1 for rid in ids[1:]}}
+
+    monkeypatch.setattr(serve_api, "asearch_all_namespaces", fake_search)
+    monkeypatch.setattr(serve_api, "ascore_ids", fake_score)
+    monkeypatch.setattr(serve_api, "HYBRID_SEARCH", True)
+    monkeypatch.setattr(serve_api, "ADAPTIVE_TOP_K", False)
+    monkeypatch.setattr(serve_api, "NAMESPACE_ROUTER", False)
+    built = []
+    build_context = serve_api.build_context
+    monkeypatch.setattr(serve_api, "build_context", lambda matches: built.append(matches) or build_context(matches))
+
+    _, sources = asyncio.run(serve_api.search_context(plan, [0.3] * 8))
+    assert scored == [lexical]
+    # the BM25-only hit with a real cosine makes it in, the weak ones take no slot
+    assert lexical[0] in {s.id for s in sources}
+    assert {m.id for m in built[0]} == {lexical[0], *vector_ids}
+
+
+def test_off_topic_question_gets_no_sources(monkeypatch):
+    import serve_api
+    from fastapi.testclient import TestClient
+
+    async def fake_embed(text):
+        return [0.3] * 8
+
+    async def weak_search(vector, top_k, filter=None, program=None, namespaces=None):
+        return [LocalMatch(rid, 0.12) for rid in list(ID_TO_TEXT)[:top_k]]
+
+    async def no_llm(*args, **kwargs):
+        raise AssertionError("the LLM must not be asked without context")
+
+    question = "Who won the football world cup?"
+    assert serve_api.get_bm25_index().search(question, 5)  # BM25 alone does find something
+    monkeypatch.setattr(serve_api, "aembed", fake_embed)
+    monkeypatch.setattr(serve_api, "asearch_all_namespaces", weak_search)
+    monkeypatch.setattr(serve_api, "aask_openai", no_llm)
+    monkeypatch.setattr(serve_api, "save_log", lambda *args, **kwargs: None)
+    monkeypatch.setattr(serve_api, "HYBRID_SEARCH", True)
+    monkeypatch.setattr(serve_api, "NAMESPACE_ROUTER", False)
+
+    res = TestClient(serve_api.app).post("/ask", json={"question": question})
+    assert res.status_code == 200
+    assert res.json()["sources"] == []
+    assert res.json()["answer"] == serve_api.no_context_message(question)
@@ -0,0 +1,100 @@
+"""
+Offline checks for the module catalog (services/catalog.py, GET /modules and
+the catalog answer path of /ask and /ask-stream). Run from backend/:
+
+    python -m pytest testing/test_catalog.py
+"""
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.testclient import TestClient
+
+import serve_api
+from services.catalog import catalogue_of, get_catalog
+from services.query_analyzer import analyze_query
+
+
+def test_catalogue_from_module_number():
+    assert catalogue_of("BMI 10") == "compulsory"
+    assert catalogue_of("BMI 103") == "elective"
+    assert catalogue_of("BTB W18") == "elective"
+    assert catalogue_of("BMT F01") == "specialization"
+    assert catalogue_of("MMI 05.03") == "elective"
+    assert catalogue_of("D 4.1.1") == "specialization"
+    assert catalogue_of("D 1.1") == "compulsory"
+
+
+def test_catalog_questions():
+    a = analyze_query("Welche Module gibt es im BMT?")
+    assert a.catalog and a.programs == ("BMT",)
+    a = analyze_query("Welche Wahlpflichtmodule gibt es im 5. Semester BMI?")
+    assert a.catalog and (a.semester, a.catalogue) == (5, "elective")
+    assert analyze_query("Which modules are offered in the third semester of MMI?").semester == 3
+    assert not analyze_query("Welche Module behandeln Machine Learning?").catalog
+    assert not analyze_query("Welche Module gibt es zu BMI 10?").catalog
+
+
+def test_catalog_filters():
+    catalog = get_catalog()
+    bmt = catalog.query(["BMT"])
+    assert bmt and all(m.studyProgramAbbrev == "BMT" for m in bmt)
+    assert len({(m.studyProgramAbbrev, m.moduleNumber) for m in catalog.items}) == len(catalog)
+    winter = catalog.query(["BMT"], season="winter_semester", semester=3)
+    assert winter and all(m.season in ("winter_semester", "every_semester") and m.semester == 3 for m in winter)
+    assert catalog.query(["BMT"], semester=3, season="winter_semester") is winter  # memoized
+
+
+def test_modules_endpoint_paginates_and_revalidates():
+    client = TestClient(serve_api.app)
+    res = client.get("/modules", params={"program": "BMT", "pageSize": 10, "page": 2})
+    assert res.status_code == 200
+    body = res.json()
+    assert len(body["items"]) == 10 and body["page"] == 2 and body["total"] > 10
+    assert body["items"] == [m.model_dump() for m in get_catalog().query(["BMT"])[10:20]]
+
+    etag = res.headers["etag"]
+    again = client.get("/modules", params={"program": "BMT", "pageSize": 10, "page": 2}, headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.headers["etag"] == etag
+    other = client.get("/modules", params={"program": "BMT", "pageSize": 10, "page": 3}, headers={"If-None-Match": etag})
+    assert other.status_code == 200 and other.headers["etag"] != etag
+    assert client.get("/modules", params={"catalogue": "optional"}).status_code == 422
+
+
+def test_ask_answers_catalog_questions_without_llm(monkeypatch):
+    async def fail(*args, **kwargs):
+        raise AssertionError("catalog questions need no embedding or LLM call")
+
+    monkeypatch.setattr(serve_api, "aembed", fail)
+    monkeypatch.setattr(serve_api, "aask_openai", fail)
+    monkeypatch.setattr(serve_api, "save_log", lambda *args, **kwargs: None)
+
+    res = TestClient(serve_api.app).post("/ask", json={"question": "Welche Module gibt es im BMT im 4. Semester?"})
+    assert res.status_code == 200
+    body = res.json()
+    modules = get_catalog().query(["BMT"], semester=4)
+    assert body["answer"].startswith(f"**Module** (BMT; 4. Semester): {len(modules)}")
+    assert [s["moduleNumber"] for s in body["sources"]] == [m.moduleNumber for m in modules]
+
+
+def test_ask_stream_sends_the_catalog_footer(monkeypatch):
+    async def fail(*args, **kwargs):
+        raise AssertionError("catalog questions need no embedding or LLM call")
+
+    monkeypatch.setattr(serve_api, "aembed", fail)
+    monkeypatch.setattr(serve_api, "save_log", lambda *args, **kwargs: None)
+    question = "Welche Module gibt es im BMT im 4. Semester?"
+
+    res = TestClient(serve_api.app).post("/ask-stream", json={"question": question})
+    events = [
+        (frame.split("\n")[0][len("event: "):], json.loads(frame.split("\n")[1][len("data: "):]))
+        for frame in res.text.strip().split("\n\n")
+    ]
+    assert [name for name, _ in events] == ["sources", "token", "done"]
+    footer = events[0][1]["footer"]
+    assert footer
+    # the streamed answer ends up as the /ask answer: list, then footer
+    answer = TestClient(serve_api.app).post("/ask", json={"question": question}).json()["answer"]
+    assert events[2][1]["answer"] == answer == f"{events[1][1]['text']}\n\n{footer}"
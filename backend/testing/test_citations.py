@@ -0,0 +1,43 @@
+"""
+Offline checks for the § citation index (services/citations.py) on the PO21
+paragraph chunks in data/processed_pdf. Run from backend/:
+
+    python -m pytest testing/test_citations.py
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.citations import get_citation_index, parse_citations
+from services.loader import ID_TO_META, ID_TO_TEXT
+
+
+def test_parse_citations():
+    assert parse_citations("Was steht in § 16 Abs. 3?") == [("16", "3")]
+    assert parse_citations("§16 (3) und §18a") == [("16", "3"), ("18A", None)]
+    assert parse_citations("Paragraph 2 Absatz 4") == [("2", "4")]
+    assert parse_citations("Wie viele CP hat BMI 10?") == []
+
+
+def test_lookup_returns_subsection_with_neighbours():
+    index = get_citation_index()
+    ids = index.lookup("Was steht in § 16 Abs. 3 der PO21?")
+    assert ids == ["DAISY_PO21_paragraph_16_3", "DAISY_PO21_paragraph_16_2", "DAISY_PO21_paragraph_16_4"]
+    # registered for build_context
+    assert ID_TO_TEXT[ids[0]].startswith("(3)")
+    assert ID_TO_META[ids[0]]["moduleNumber"] == "§ 16 Abs. 3"
+
+
+def test_whole_paragraph_and_unknown_references():
+    index = get_citation_index()
+    assert index.lookup("Was regelt § 18a?", ["BDAISY"])[0] == "DAISY_PO21_paragraph_18A_1"
+    assert index.lookup("§ 99 Abs. 1 PO21") == []
+
+
+def test_regulation_must_be_named_by_question_or_program():
+    index = get_citation_index()
+    # neither named: left to retrieval instead of assuming the only loaded one
+    assert index.lookup("Was steht in § 16 Abs. 3?") == []
+    assert index.lookup("Was steht in § 16 im BMI?", ["BMI"]) == []
+    assert index.lookup("Was steht in § 16 Abs. 3?", ["BDAISY"])[0] == "DAISY_PO21_paragraph_16_3"
@@ -0,0 +1,58 @@
+"""
+Offline checks for the LRU/TTL cache (services/cache.py) and the query
+embedding cache with its SQLite layer (services/embed_cache.py). Run from
+backend/:
+
+    python -m pytest testing/test_embed_cache.py
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.cache import TTLCache
+from services.embed_cache import EmbeddingCache, normalize_query
+
+
+def test_lru_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" is now more recent than "b"
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["hits"] == 3 and cache.stats()["misses"] == 1
+
+
+def test_expired_entries_are_misses(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("services.cache.time.monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=4, ttl=10)
+    cache.set("a", 1)
+    now[0] += 5
+    assert cache.get_entry("a") == (1, 5.0)
+    now[0] += 6
+    assert cache.get("a") is None and len(cache) == 0
+
+
+def test_embedding_cache_normalizes_and_skips_failures():
+    cache = EmbeddingCache(maxsize=8, ttl=60, path="")
+    assert normalize_query("  Was IST\tBMI 10? ") == "was ist bmi 10?"
+    assert cache.get("m", "Was ist BMI 10?") is None
+    cache.set("m", "Was ist BMI 10?", [0.5, 0.25], elapsed=0.2)
+    assert cache.get("m", "  was ist  bmi 10? ") == [0.5, 0.25]
+    assert cache.get("other-model", "Was ist BMI 10?") is None
+    cache.set("m", "broken", [])
+    assert cache.get("m", "broken") is None
+    stats = cache.stats()
+    assert stats["memory_hits"] == 1 and stats["misses"] == 3 and stats["size"] == 1
+
+
+def test_disk_layer_survives_a_restart(tmp_path):
+    path = str(tmp_path / "embeddings.sqlite3")
+    EmbeddingCache(maxsize=8, ttl=60, path=path).set("m", "Praxissemester", [0.5, -1.0])
+    restarted = EmbeddingCache(maxsize=8, ttl=60, path=path)
+    assert restarted.get("m", "praxissemester") == [0.5, -1.0]
+    assert restarted.get("m", "praxissemester") == [0.5, -1.0]
+    assert restarted.disk_hits == 1 and restarted.memory.hits == 1
@@ -0,0 +1,75 @@
+"""
+Checks that settings in .env reach the services, which read them when they
+are imported. serve_api is imported in a fresh interpreter next to a
+temporary .env. Run from backend/:
+
+    python -m pytest testing/test_env_loading.py
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+
+def imported_settings(tmp_path, env_file, expressions):
+    """Values of `expressions` after `import serve_api`, with `env_file` as the .env."""
+    (tmp_path / ".env").write_text(env_file, encoding="utf-8")
+    keys = {line.split("=", 1)[0] for line in env_file.splitlines() if line}
+    env = {k: v for k, v in os.environ.items() if k not in keys}
+    script = "\n".join([
+        "import sys",
+        f"sys.path.insert(0, {str(BACKEND)!r})",
+        "import serve_api",
+        "from services import embed_cache, embeddings, result_merge, single_index, vector_snapshot",
+        *(f"print(repr({e}))" for e in expressions),
+    ])
+    # `python -c` makes load_dotenv() look for .env from the working directory
+    out = subprocess.run(
+        [sys.executable, "-c", script], cwd=tmp_path, env=env, capture_output=True, text=True, check=True,
+    ).stdout.splitlines()
+    return out[-len(expressions):]
+
+
+def test_pinecone_layout_from_env_file(tmp_path):
+    values = imported_settings(
+        tmp_path,
+        "PINECONE_LAYOUT=single\nPINECONE_SINGLE_NAMESPACE=everything\n",
+        ["serve_api.FAN_OUT", "single_index.PINECONE_SINGLE_NAMESPACE"],
+    )
+    assert values == ["False", "'everything'"]
+
+
+def test_merge_quotas_from_env_file(tmp_path):
+    values = imported_settings(
+        tmp_path,
+        "MERGE_QUOTA_WEB=2\nMERGE_QUOTA_MODULE=5\nMERGE_MIN_SCORE=0.3\n",
+        ["result_merge.QUOTAS", "result_merge.MERGE_MIN_SCORE"],
+    )
+    assert values == ["{'module': 5, 'web': 2, 'regulation': 8}", "0.3"]
+
+
+def test_embed_cache_settings_from_env_file(tmp_path):
+    path = tmp_path / "embeddings.sqlite"
+    values = imported_settings(
+        tmp_path,
+        f"EMBED_CACHE_SIZE=7\nEMBED_CACHE_TTL=60\nEMBED_CACHE_PATH={path}\n",
+        ["embed_cache.EMBED_CACHE.memory.maxsize", "embed_cache.EMBED_CACHE.memory.ttl", "embed_cache.EMBED_CACHE.disk is not None"],
+    )
+    assert values == ["7", "60.0", "True"]
+    assert path.exists()
+
+
+def test_embed_batcher_settings_from_env_file(tmp_path):
+    values = imported_settings(
+        tmp_path,
+        "EMBED_BATCH_WINDOW_MS=20\nEMBED_BATCH_MAX=3\n",
+        ["embeddings.EMBED_BATCHER.window", "embeddings.EMBED_BATCHER.max_batch"],
+    )
+    assert values == ["0.02", "3"]
+
+
+def test_empty_snapshot_dir_means_the_default(tmp_path):
+    values = imported_settings(tmp_path, "VECTOR_SNAPSHOT_DIR=\n", ["str(vector_snapshot.VECTOR_DIR)"])
+    assert values == [repr(str(BACKEND / "data" / "vectors"))]
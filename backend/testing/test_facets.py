@@ -0,0 +1,59 @@
+"""
+Offline checks for the facet bitmaps (services/facets.py) on the real loader
+metadata. Run from backend/:
+
+    python -m pytest testing/test_facets.py
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.facets import FacetIndex, filter_view
+from services.loader import ID_TO_META, load_text_store
+from services.metadata_filter import matches_filter
+
+
+def facet_index() -> FacetIndex:
+    if not ID_TO_META:
+        load_text_store()
+    return FacetIndex(ID_TO_META)
+
+
+def test_filter_uses_uploaded_field_names_and_values():
+    index = facet_index()
+    flt = index.filter(season="winter_semester", min_credits=5, max_credits=10, language="en", semester=4)
+    assert flt["offeredInSeason"] == {"$in": ["winter_semester", "every_semester"]}
+    assert flt["heldInLanguage"] == {"$in": ["en", "en_on_demand"]}
+    assert flt["suggestedSemester"] == {"$eq": 4}
+    # creditPoints is stored as a string
+    assert "5.0" in flt["creditPoints"]["$in"] and "15.0" not in flt["creditPoints"]["$in"]
+
+
+def test_masks_agree_with_per_record_evaluation():
+    index = facet_index()
+    for kwargs in (
+        {"season": "summer_semester"},
+        {"exam_type": "written_exam", "max_credits": 5},
+        {"season": "winter_semester", "language": "en", "min_credits": 6},
+        {"semester": 1},
+    ):
+        flt = index.filter(**kwargs)
+        mask = index.mask(flt)
+        want = [matches_filter(filter_view(rid), flt) for rid in index.ids]
+        assert mask.tolist() == want and any(want)
+
+
+def test_unsupported_filters_fall_back():
+    index = facet_index()
+    assert index.mask(None) is None
+    assert index.mask({"examType": {"$ne": "written_exam"}}) is None
+    assert index.mask({"category": {"$eq": "x"}}) is None
+
+
+def test_empty_credit_range_matches_nothing():
+    index = facet_index()
+    flt = index.filter(min_credits=5.1, max_credits=5.2)
+    assert flt["creditPoints"]["$in"]  # never an empty $in
+    assert not index.mask(flt).any()
+    assert not any(matches_filter(filter_view(rid), flt) for rid in list(ID_TO_META)[:200])
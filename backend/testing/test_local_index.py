@@ -0,0 +1,210 @@
+"""
+Offline checks for the in-process NumPy index (services/local_index.py).
+
+Uses the real record ids/metadata from data/ with random vectors, and compares
+against the Pinecone semantics of search_all_namespaces (per-namespace top_k,
+1.05 program boost, merge, slice). Run from backend/:
+
+    python -m pytest testing/test_local_index.py
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.loader import ID_TO_META, load_text_store
+from services.local_index import LocalIndex, filter_view
+from services.metadata_filter import matches_filter
+from services.pinecone_search import build_filter
+
+DIM = 64
+
+
+def build_random_index(seed: int = 0):
+    if not ID_TO_META:
+        load_text_store()
+    rng = np.random.default_rng(seed)
+    by_ns = {}
+    for rid, meta in ID_TO_META.items():
+        prog = meta.get("studyProgramAbbrev", "")
+        ns = f"{prog}_WEB" if meta.get("category") or meta.get("section") or meta.get("source") else prog
+        by_ns.setdefault(ns, []).append(rid)
+    vectors = {ns: (ids, rng.normal(size=(len(ids), DIM))) for ns, ids in by_ns.items()}
+    return LocalIndex.from_namespaces(vectors), vectors
+
+
+def reference_search(vectors, q, top_k, flt=None, program=None, namespaces=None):
+    q = q / np.linalg.norm(q)
+    matches = []
+    for ns in namespaces or vectors:
+        ids, vecs = vectors[ns]
+        vecs = vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+        scores = vecs @ q
+        ns_hits = [(rid, s) for rid, s in zip(ids, scores) if matches_filter(filter_view(rid), flt)]
+        ns_hits = sorted(ns_hits, key=lambda x: -x[1])[:top_k]
+        for rid, s in ns_hits:
+            matches.append((rid, s * 1.05 if program and ns.startswith(program) else s))
+    return sorted(matches, key=lambda x: -x[1])[:top_k]
+
+
+def test_matches_reference_with_boost_and_namespaces():
+    index, vectors = build_random_index()
+    rng = np.random.default_rng(1)
+    for _ in range(20):
+        q = rng.normal(size=DIM)
+        namespaces = ["FBM_WEB", "BMI", "BMI_WEB"]
+        got = index.search(q.tolist(), top_k=8, program="BMI", namespaces=namespaces)
+        want = reference_search(vectors, q, 8, program="BMI", namespaces=namespaces)
+        assert [m.id for m in got] == [rid for rid, _ in want]
+        assert np.allclose([m.score for m in got], [s for _, s in want], atol=1e-5)
+
+
+def test_filters_are_evaluated_locally():
+    index, vectors = build_random_index()
+    flt = build_filter(season="winter_semester", min_credits=5, max_credits=5)
+    q = np.random.default_rng(2).normal(size=DIM)
+    got = index.search(q.tolist(), top_k=10, filter=flt)
+    want = reference_search(vectors, q, 10, flt=flt)
+    assert got and [m.id for m in got] == [rid for rid, _ in want]
+    for m in got:
+        meta = ID_TO_META[m.id]
+        assert meta["season"] in ("winter_semester", "every_semester") and float(meta["credits"]) == 5.0
+
+
+def test_matryoshka_full_shortlist_equals_exact():
+    from services.matryoshka_index import MatryoshkaIndex
+
+    index, vectors = build_random_index()
+    two_stage = MatryoshkaIndex(index.ids, index.offsets, index.matrix, dim=16, shortlist=len(index))
+    rng = np.random.default_rng(4)
+    for _ in range(5):
+        q = rng.normal(size=DIM).tolist()
+        want = index.search(q, 8, program="BMI")
+        got = two_stage.search(q, 8, program="BMI")
+        assert [m.id for m in got] == [m.id for m in want]
+
+
+def test_rescoring_subclasses_must_implement_the_first_stage():
+    from services.local_index import RescoringIndex
+
+    class Incomplete(RescoringIndex):
+        def shortlist_size(self, k):
+            return k
+
+    index, _ = build_random_index()
+    with pytest.raises(TypeError):
+        Incomplete(index.ids, index.offsets, index.matrix)
+
+
+def test_ivf_restricts_namespaces():
+    from services.ivf_index import IVFIndex
+
+    index, vectors = build_random_index()
+    ivf = IVFIndex(index.ids, index.offsets, index.matrix, nprobe=2)
+    rng = np.random.default_rng(5)
+    q = rng.normal(size=DIM)
+    got = ivf.search(q.tolist(), 8, namespaces=["BMI"])
+    assert len(got) == 8 and {m.namespace for m in got} == {"BMI"}
+
+    ivf.nprobe = len(ivf.centroids)  # probing every list is exact search
+    assert [m.id for m in ivf.search(q.tolist(), 8, program="BMI")] == [m.id for m in index.search(q.tolist(), 8, program="BMI")]
+
+
+def test_snapshot_roundtrip_is_memory_mapped(tmp_path=None):
+    import tempfile
+    from services import vector_snapshot as vs
+
+    root = Path(tmp_path or tempfile.mkdtemp())
+    saved = vs.PARTS_DIR, vs.SNAPSHOTS_DIR, vs.CURRENT_FILE
+    vs.PARTS_DIR, vs.SNAPSHOTS_DIR, vs.CURRENT_FILE = root / "parts", root / "snapshots", root / "CURRENT"
+    try:
+        index, vectors = build_random_index()
+        for ns, (ids, vecs) in vectors.items():
+            vs.save_part(ns, ids, ids, vecs, "test-model")
+        vs.build_snapshot()
+        snapshot = vs.load_snapshot()
+
+        from services.ivf_index import IVFIndex, IVF_FILE
+        trained = IVFIndex.from_snapshot(snapshot)
+        assert (snapshot.path / IVF_FILE).exists()
+        reloaded = IVFIndex.from_snapshot(snapshot)
+        assert np.array_equal(trained.centroids, reloaded.centroids)
+        assert np.array_equal(trained.assignments, reloaded.assignments)
+
+        # a new upload reaches the lists through the next snapshot, without retraining
+        ids, vecs = vectors["BMI"]
+        q = np.random.default_rng(5).normal(size=DIM)
+        vs.save_part("BMI", ids + ["new-record"], ids + ["new-record"], np.vstack([vecs, q]), "test-model")
+        vs.build_snapshot()
+        updated = IVFIndex.from_snapshot(vs.load_snapshot())
+        assert np.array_equal(updated.centroids, trained.centroids)
+        updated.nprobe = 1
+        assert updated.search(q.tolist(), 3, namespaces=["BMI"])[0].id == "new-record"
+    finally:
+        vs.PARTS_DIR, vs.SNAPSHOTS_DIR, vs.CURRENT_FILE = saved
+
+    assert isinstance(snapshot.matrix, np.memmap)
+    assert snapshot.manifest["model"] == "test-model"
+    assert snapshot.manifest["count"] == len(index)
+    assert snapshot.offsets == index.offsets
+
+    loaded = LocalIndex.from_snapshot(snapshot)
+    q = np.random.default_rng(3).normal(size=DIM).tolist()
+    assert [m.id for m in loaded.search(q, 5)] == [m.id for m in index.search(q, 5)]
+
+
+def test_old_snapshots_are_pruned(tmp_path):
+    from services import vector_snapshot as vs
+
+    saved = vs.PARTS_DIR, vs.SNAPSHOTS_DIR, vs.CURRENT_FILE
+    vs.PARTS_DIR, vs.SNAPSHOTS_DIR, vs.CURRENT_FILE = tmp_path / "parts", tmp_path / "snapshots", tmp_path / "CURRENT"
+    try:
+        for version in ("20250101T000000-aaaaaaaa", "20250102T000000-bbbbbbbb", "20250103T000000-cccccccc"):
+            (vs.SNAPSHOTS_DIR / version).mkdir(parents=True)
+        # CURRENT points at the oldest one, e.g. after a rollback
+        vs.CURRENT_FILE.write_text("20250101T000000-aaaaaaaa", encoding="utf-8")
+        vs.prune_snapshots(keep=1)
+        assert sorted(p.name for p in vs.SNAPSHOTS_DIR.iterdir()) == [
+            "20250101T000000-aaaaaaaa", "20250103T000000-cccccccc",
+        ]
+    finally:
+        vs.PARTS_DIR, vs.SNAPSHOTS_DIR, vs.CURRENT_FILE = saved
+
+
+if __name__ == "__main__":
+    test_matches_reference_with_boost_and_namespaces()
+    test_filters_are_evaluated_locally()
+    test_matryoshka_full_shortlist_equals_exact()
+    test_ivf_restricts_namespaces()
+    test_snapshot_roundtrip_is_memory_mapped()
+    print("ok")
+
+
+def test_score_ids_matches_search_scores(monkeypatch):
+    from services import pinecone_search
+    from services.loader import ID_TO_NAMESPACE
+    from services.pinecone_standin import InMemoryPineconeIndex
+
+    index, vectors = build_random_index()
+    q = np.random.default_rng(2).normal(size=DIM)
+    want = dict(reference_search(vectors, q, 10, program="BMI"))
+    got = index.score_ids(q.tolist(), list(want) + ["unknown"], program="BMI")
+    assert set(got) == set(want)
+    assert all(abs(got[rid] - want[rid]) < 1e-5 for rid in want)
+
+    # Pinecone backend: the same cosine from fetched vectors
+    standin = InMemoryPineconeIndex()
+    for ns, (ids, vecs) in vectors.items():
+        for rid, vec in zip(ids, vecs):
+            standin.upsert([{"id": rid, "values": vec.tolist()}], namespace=ID_TO_NAMESPACE.get(rid, ns))
+    monkeypatch.setattr(pinecone_search, "_index", standin)
+    monkeypatch.setattr(pinecone_search, "SEARCH_BACKEND", "pinecone")
+    remote = pinecone_search.score_ids(q.tolist(), list(want), program="BMI")
+    boosted = {rid for rid in want if ID_TO_NAMESPACE[rid].startswith("BMI")}
+    for rid, score in remote.items():
+        local = index.score_ids(q.tolist(), [rid])[rid] * (1.05 if rid in boosted else 1.0)
+        assert abs(score - local) < 1e-5
+    assert set(remote) == set(want)
@@ -0,0 +1,53 @@
+"""
+Offline checks for the module-number fast path (services/module_lookup.py).
+Run from backend/:
+
+    python -m pytest testing/test_module_lookup.py
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.testclient import TestClient
+
+import serve_api
+from services.module_lookup import ModuleIdIndex
+
+META = {
+    "BMI10": {"moduleNumber": "BMI 10"},
+    "BMI103": {"moduleNumber": "BMI 103"},
+    "BCSIM_10": {"moduleNumber": "BCSIM 10"},
+    "BDAISY_PF_4.2": {"moduleNumber": "BDAISY_PF_4.2"},
+    "WEB_BMI_001": {"category": "Studium"},
+}
+
+
+def test_finds_named_modules_in_any_spelling():
+    index = ModuleIdIndex(META)
+    assert index.find("Was lernt man in BMI 10?") == ["BMI10"]
+    assert index.find("bmi10 oder BMI 103 und BCSIM_10") == ["BMI10", "BMI103", "BCSIM_10"]
+    assert index.find("Prüfungsform BDAISY PF 4.2") == ["BDAISY_PF_4.2"]
+
+
+def test_ignores_unknown_ids_and_plain_numbers():
+    index = ModuleIdIndex(META)
+    assert index.find("Wie viele CP hat das Semester 4?") == []
+    assert index.find("Gibt es BTB 23?") == []
+
+
+def test_search_skips_embedding_for_module_questions():
+    async def no_embed(text):
+        raise AssertionError("embedding should be skipped")
+
+    original = serve_api.aembed
+    serve_api.aembed = no_embed
+    try:
+        res = TestClient(serve_api.app).post("/search", json={"question": "Was lernt man in BMI 10?"})
+    finally:
+        serve_api.aembed = original
+
+    assert res.status_code == 200
+    body = res.json()
+    assert [s["moduleNumber"] for s in body["sources"]] == ["BMI 10"]
+    assert body["timings"]["embed"] == 0.0
@@ -0,0 +1,79 @@
+"""
+Offline checks for the centroid namespace router (services/namespace_router.py)
+on synthetic clustered namespaces. Run from backend/:
+
+    python -m pytest testing/test_namespace_router.py
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.local_index import LocalIndex
+from services.namespace_router import NamespaceRouter
+
+DIM = 32
+NAMESPACES = ["BMI", "BMT", "BTB", "MMI", "MAR", "BCSIM", "BDAISY", "FBM_WEB"]
+
+
+def clustered(seed: int = 0):
+    rng = np.random.default_rng(seed)
+    centers = {ns: rng.normal(size=DIM) for ns in NAMESPACES}
+    vectors = {
+        ns: LocalIndex.normalize(c + 0.3 * rng.normal(size=(40, DIM)))
+        for ns, c in centers.items()
+    }
+    return centers, vectors
+
+
+def build_router(**kwargs) -> NamespaceRouter:
+    _, vectors = clustered()
+    index = LocalIndex.from_namespaces({ns: ([f"{ns}_{i}" for i in range(len(v))], v) for ns, v in vectors.items()})
+
+    class Snapshot:
+        matrix = index.matrix
+        offsets = index.offsets
+
+    return NamespaceRouter.from_snapshot(Snapshot, prototypes=2, **kwargs)
+
+
+def test_routes_to_the_namespace_of_the_query():
+    centers, _ = clustered()
+    router = build_router(top_n=3, margin=0.05, min_score=0.3)
+    for ns in NAMESPACES:
+        decision = router.route(centers[ns], NAMESPACES)
+        assert decision.routed and ns in decision.namespaces
+        assert len(decision.namespaces) <= 3 and decision.saved >= len(NAMESPACES) - 3
+        assert next(iter(decision.scores)) == ns
+
+
+def test_falls_back_to_full_fan_out_on_low_confidence():
+    # one orthogonal prototype per namespace
+    router = NamespaceRouter({ns: np.eye(DIM, dtype=np.float32)[[i]] for i, ns in enumerate(NAMESPACES)}, top_n=3)
+
+    # equally close to every namespace: no margin
+    decision = router.route(np.ones(DIM), NAMESPACES)
+    assert not decision.routed and decision.namespaces == NAMESPACES and decision.reason == "low_score"
+    decision = router.route(np.eye(DIM)[:len(NAMESPACES)].sum(axis=0) + 0.1, NAMESPACES)
+    assert not decision.routed and decision.reason == "no_margin"
+
+    # two clear winners
+    decision = router.route(np.eye(DIM)[0] + np.eye(DIM)[1], NAMESPACES)
+    assert decision.routed and decision.namespaces == NAMESPACES[:2]
+
+    stats = router.stats()
+    assert stats["routed"] == 1 and stats["fallbacks"] == {"low_score": 1, "no_margin": 1}
+
+
+def test_unknown_namespaces_are_always_searched_and_stats_count_savings():
+    centers, _ = clustered()
+    router = build_router(top_n=2, margin=0.05, min_score=0.3)
+    decision = router.route(centers["BMI"], NAMESPACES + ["NEW_WEB"])
+    assert decision.routed and "NEW_WEB" in decision.namespaces and "BMI" in decision.namespaces
+
+    router.record_audit(["a", "b"], ["a", "c"])
+    stats = router.stats()
+    assert stats["queries_total"] == len(NAMESPACES) + 1
+    assert stats["queries_saved"] == decision.saved and stats["audit_recall"] == 0.5
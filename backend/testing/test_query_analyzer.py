@@ -0,0 +1,44 @@
+"""
+Offline checks for services/query_analyzer.py. Run from backend/:
+
+    python -m pytest testing/test_query_analyzer.py
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.query_analyzer import analyze_query
+
+
+def test_programs_are_whole_words():
+    assert analyze_query("Welche Module sind von Marmann?").programs == ()
+    assert analyze_query("Who teaches Marketing?").programs == ()
+    assert analyze_query("Objektorientierte Programmierung 1").programs == ()
+    assert analyze_query("Unterschied zwischen BMI und BMT?").programs == ("BMI", "BMT")
+    assert analyze_query("Is there a master in Medieninformatik?").programs == ("MMI",)
+    assert analyze_query("Medieninformatik Bachelor").programs == ("BMI",)
+
+
+def test_language():
+    assert analyze_query("Prüfungsform von BTB 10").lang == "de"
+    assert analyze_query("Liste bitte alle PF module hier").lang == "de"
+    assert analyze_query("What is taught in BMI 10?").lang == "en"
+    # English words starting like German stems ("modul", "studi")
+    assert analyze_query("Which modules are offered in BMT?").lang == "en"
+    assert analyze_query("Is there a recording studio for media studies?").lang == "en"
+    assert analyze_query("How is the module graded?").lang == "en"
+    assert analyze_query("Modulnummer von Mathematik 1").lang == "de"
+    assert analyze_query("Wieviele CP hat BMI 10?").lang == "de"
+
+
+def test_module_ids_and_filter_hints():
+    a = analyze_query("Was lernt man in BMI 10 und bmi103?")
+    assert a.module_keys == ("BMI10", "BMI103") and a.programs == ("BMI",)
+
+    a = analyze_query("Welche Module im Wintersemester mit mindestens 5 CP und Klausur?")
+    assert a.hints() == {"season": "winter_semester", "examType": "written_exam", "minCredits": 5.0}
+
+    a = analyze_query("modules with 5-10 ECTS in summer term, oral exam")
+    assert (a.season, a.exam_type, a.min_credits, a.max_credits) == ("summer_semester", "oral_exam", 5.0, 10.0)
+    assert analyze_query("Wie viele CP hat das Semester 4?").module_keys == ()
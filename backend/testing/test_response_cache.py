@@ -0,0 +1,70 @@
+"""
+Offline checks for the exact-prompt LLM response cache with
+stale-while-revalidate (services/prompt_utils.py). The chat completion is
+replaced with a counting fake. Run from backend/:
+
+    python -m pytest testing/test_response_cache.py
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services import prompt_utils
+from services.cache import TTLCache
+
+
+def setup(monkeypatch, fail=False):
+    now = [1000.0]
+    calls = []
+
+    async def fake_complete(messages):
+        calls.append(messages[-1]["content"])
+        if fail:
+            raise RuntimeError("rate limited")
+        return f"answer {len(calls)}"
+
+    monkeypatch.setattr("services.cache.time.monotonic", lambda: now[0])
+    monkeypatch.setattr(prompt_utils, "RESPONSE_CACHE", TTLCache(8, 100))
+    monkeypatch.setattr(prompt_utils, "RESPONSE_CACHE_REFRESH_AFTER", 50)
+    monkeypatch.setattr(prompt_utils, "_acomplete", fake_complete)
+    return now, calls
+
+
+def ask(question="Wann ist die Klausur?", context="ctx"):
+    return prompt_utils.aask_openai(context, question, [], lang="de")
+
+
+def test_same_prompt_is_answered_from_the_cache(monkeypatch):
+    _, calls = setup(monkeypatch)
+
+    async def run():
+        return [await ask(), await ask(), await ask(context="other ctx")]
+
+    assert asyncio.run(run()) == ["answer 1", "answer 1", "answer 2"]
+    assert len(calls) == 2
+
+
+def test_stale_entries_are_served_and_refreshed(monkeypatch):
+    now, calls = setup(monkeypatch)
+
+    async def run():
+        first = await ask()
+        now[0] += 60  # past REFRESH_AFTER, before the TTL
+        stale = await ask()
+        await asyncio.gather(*prompt_utils._refresh_tasks.values())
+        return first, stale, await ask()
+
+    assert asyncio.run(run()) == ("answer 1", "answer 1", "answer 2")
+    assert len(calls) == 2
+
+    now[0] += 101  # expired: a miss, answered synchronously
+    assert asyncio.run(ask()) == "answer 3"
+
+
+def test_errors_are_not_cached(monkeypatch):
+    _, calls = setup(monkeypatch, fail=True)
+    assert asyncio.run(ask()) == prompt_utils.error_message("de")
+    assert asyncio.run(ask()) == prompt_utils.error_message("de")
+    assert len(calls) == 2 and len(prompt_utils.RESPONSE_CACHE) == 0
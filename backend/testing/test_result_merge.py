@@ -0,0 +1,73 @@
+"""
+Offline checks for the quota / threshold merge of per-namespace results
+(services/result_merge.py). Run from backend/:
+
+    python -m pytest testing/test_result_merge.py
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services import pinecone_search
+from services.local_index import LocalMatch
+from services.pinecone_standin import InMemoryPineconeIndex
+from services.result_merge import QUOTAS as DEFAULT_QUOTAS, fetch_k, merge_matches
+
+QUOTAS = {"module": 8, "web": 4, "regulation": 8}
+
+
+def ranking(ns, scores):
+    return ns, [LocalMatch(id=f"{ns}_{i}", score=s, namespace=ns) for i, s in enumerate(sorted(scores, reverse=True))]
+
+
+def test_merge_equals_sort_without_quotas_or_threshold():
+    rng = np.random.default_rng(0)
+    results = [ranking(ns, rng.uniform(0, 1, 20).tolist()) for ns in ("BMI", "BMI_WEB", "MMI", "FBM_WEB")]
+    expected = sorted(
+        ((m.id, m.score * (1.05 if ns.startswith("BMI") else 1.0)) for ns, ms in results for m in ms),
+        key=lambda x: -x[1],
+    )[:10]
+    merged = merge_matches(results, "BMI", 10, quotas={"module": 99, "web": 99, "regulation": 99}, min_score=0.0)
+    assert [(m.id, m.score) for m in merged] == expected
+
+
+def test_quotas_and_threshold_cut_each_namespace():
+    results = [
+        ranking("FBM_WEB", [0.9, 0.89, 0.88, 0.87, 0.86, 0.85]),
+        ranking("BMI", [0.5, 0.4, 0.3, 0.19, 0.1]),
+    ]
+    merged = merge_matches(results, None, 32, quotas=QUOTAS, min_score=0.2)
+    assert [m.id for m in merged] == ["FBM_WEB_0", "FBM_WEB_1", "FBM_WEB_2", "FBM_WEB_3", "BMI_0", "BMI_1", "BMI_2"]
+    # the program boost is applied before the threshold
+    assert [m.id for m in merge_matches([ranking("BMI", [0.195])], "BMI", 5, QUOTAS, 0.2)] == ["BMI_0"]
+
+
+def test_fetch_k_follows_the_quotas():
+    assert fetch_k("BMI", 32, QUOTAS) == 8
+    assert fetch_k("FBM_WEB", 32, QUOTAS) == 4
+    assert fetch_k("DAISY_PO21_pdf", 32, QUOTAS) == 8
+    assert fetch_k("BMI", 3, QUOTAS) == 3
+
+
+def test_async_fan_out_asks_each_namespace_for_its_quota(monkeypatch):
+    index = InMemoryPineconeIndex()
+    for ns in ("BMI", "BMI_WEB", "FBM_WEB"):
+        index.upsert([{"id": f"{ns}_{i}", "values": [1.0, i / 10]} for i in range(10)], namespace=ns)
+    requested = {}
+    query = index.query
+
+    def recording_query(vector, top_k, namespace="", **kwargs):
+        requested[namespace] = top_k
+        return query(vector, top_k, namespace=namespace, **kwargs)
+
+    monkeypatch.setattr(index, "query", recording_query)
+    monkeypatch.setattr(pinecone_search, "_index", index)
+    monkeypatch.setattr(pinecone_search, "PINECONE_LAYOUT", "namespaces")
+    asyncio.run(pinecone_search.asearch_all_namespaces([1.0, 0.0], top_k=32, namespaces=["FBM_WEB", "BMI", "BMI_WEB"]))
+    assert requested == {
+        "FBM_WEB": DEFAULT_QUOTAS["web"], "BMI": DEFAULT_QUOTAS["module"], "BMI_WEB": DEFAULT_QUOTAS["web"],
+    }
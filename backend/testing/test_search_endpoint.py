@@ -0,0 +1,52 @@
+"""
+Offline test for the retrieval-only /search endpoint with fake embedding and
+search. Run from backend/:
+
+    python -m pytest testing/test_search_endpoint.py
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.testclient import TestClient
+
+import serve_api
+from services.loader import ID_TO_META
+from services.local_index import LocalMatch
+
+JAVA = [rid for rid, meta in ID_TO_META.items() if meta.get("moduleNumber") == "BMI 10"]
+
+
+def test_search_returns_sources_plan_and_timings(monkeypatch):
+    searched = []
+
+    async def fake_embed(text):
+        return [0.1] * 8
+
+    async def fake_search(vector, top_k, filter=None, program=None, namespaces=None):
+        searched.append((program, namespaces, filter))
+        return [LocalMatch(rid, 0.9) for rid in JAVA]
+
+    async def no_llm(*args, **kwargs):
+        raise AssertionError("/search must not call the LLM")
+
+    monkeypatch.setattr(serve_api, "aembed", fake_embed)
+    monkeypatch.setattr(serve_api, "asearch_all_namespaces", fake_search)
+    monkeypatch.setattr(serve_api, "aask_openai", no_llm)
+    monkeypatch.setattr(serve_api, "HYBRID_SEARCH", False)
+    client = TestClient(serve_api.app)
+
+    res = client.post("/search", json={"question": "Was lernt man über Java im BMI im Wintersemester?", "include_context": True})
+    assert res.status_code == 200
+    body = res.json()
+    assert set(body) == {"sources", "programs", "namespaces", "context", "hints", "timings"}
+    assert body["programs"] == ["BMI"]
+    assert searched[0][0] == "BMI" and "BMI" in searched[0][1]
+    assert body["hints"] == {"season": "winter_semester"}
+    assert {s["moduleNumber"] for s in body["sources"]} == {"BMI 10"}
+    assert "BMI 10" in body["context"]
+    assert set(body["timings"]) == {"embed", "search", "total"}
+
+    # context only on request
+    assert client.post("/search", json={"question": "Was lernt man über Java im BMI?"}).json()["context"] is None
@@ -0,0 +1,112 @@
+"""
+Offline checks for the single-namespace layout (services/single_index.py)
+against the per-namespace fan-out, both served by the in-memory Pinecone
+stand-in. Run from backend/:
+
+    python -m pytest testing/test_single_index.py
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services import pinecone_search
+from services.facets import filter_view
+from services.loader import AVAILABLE_NAMESPACES, ID_TO_NAMESPACE, load_text_store
+from services.pinecone_standin import InMemoryPineconeIndex
+from services.single_index import migrate_to_single_namespace, namespace_filter, namespace_tags, upload_metadata
+
+DIM = 32
+
+
+def build_standin(seed: int = 0) -> InMemoryPineconeIndex:
+    if not ID_TO_NAMESPACE:
+        load_text_store()
+    rng = np.random.default_rng(seed)
+    index = InMemoryPineconeIndex()
+    for ns in AVAILABLE_NAMESPACES:
+        ids = [rid for rid, n in ID_TO_NAMESPACE.items() if n == ns]
+        index.upsert([
+            {"id": rid, "values": rng.normal(size=DIM).tolist(), "metadata": filter_view(rid)}
+            for rid in ids
+        ], namespace=ns)
+    migrate_to_single_namespace(index, AVAILABLE_NAMESPACES, "all")
+    return index
+
+
+def search(monkeypatch, index, layout, **kwargs):
+    monkeypatch.setattr(pinecone_search, "_index", index)
+    monkeypatch.setattr(pinecone_search, "PINECONE_LAYOUT", layout)
+    monkeypatch.setattr(pinecone_search, "PINECONE_SINGLE_NAMESPACE", "all")
+    index.calls = 0
+    matches = asyncio.run(pinecone_search.asearch_all_namespaces(**kwargs))
+    return [(m.id, round(m.score, 5)) for m in matches], index.calls
+
+
+def test_namespace_tags():
+    assert namespace_tags("BMI") == {"studyProgramAbbrev": "BMI", "sourceKind": "module"}
+    assert namespace_tags("FBM_WEB") == {"studyProgramAbbrev": "FBM", "sourceKind": "web"}
+    assert namespace_tags("DAISY_pdf") == {"studyProgramAbbrev": "BDAISY", "sourceKind": "module"}
+    assert namespace_tags("DAISY_PO21_pdf") == {"studyProgramAbbrev": "BDAISY", "sourceKind": "regulation"}
+
+
+def test_namespace_filter_uses_in_over_programs():
+    available = ["BMI", "BMI_WEB", "BMT", "BMT_WEB", "FBM_WEB"]
+    assert namespace_filter(available, available) is None
+    assert namespace_filter(["FBM_WEB", "BMI", "BMI_WEB"], available) == {"studyProgramAbbrev": {"$in": ["BMI", "FBM"]}}
+    assert namespace_filter(["BMI", "BMT"], available) == {
+        "studyProgramAbbrev": {"$in": ["BMI", "BMT"]}, "sourceKind": {"$in": ["module"]},
+    }
+    assert namespace_filter(["BMI", "BMT_WEB"], available) == {"$or": [
+        {"sourceKind": {"$eq": "module"}, "studyProgramAbbrev": {"$in": ["BMI"]}},
+        {"sourceKind": {"$eq": "web"}, "studyProgramAbbrev": {"$in": ["BMT"]}},
+    ]}
+
+
+def test_single_query_matches_fan_out(monkeypatch):
+    index = build_standin()
+    counts = {ns: v["vector_count"] for ns, v in index.describe_index_stats()["namespaces"].items()}
+    assert counts["all"] == sum(counts[ns] for ns in AVAILABLE_NAMESPACES)
+    flt = pinecone_search.build_filter(season="winter_semester")
+    rng = np.random.default_rng(1)
+    for namespaces, program, f in (
+        (["FBM_WEB", "BMI", "BMI_WEB"], "BMI", None),
+        (["FBM_WEB", "BMT", "BMT_WEB"], "BMT", flt),
+        (None, None, None),
+        (["BMI", "MMI"], None, flt),
+    ):
+        kwargs = dict(vector=rng.normal(size=DIM).tolist(), top_k=8, filter=f, program=program, namespaces=namespaces)
+        fan_out, fan_out_calls = search(monkeypatch, index, "namespaces", **kwargs)
+        single, single_calls = search(monkeypatch, index, "single", **kwargs)
+        assert single == fan_out
+        assert single_calls == 1 and fan_out_calls == len(namespaces or AVAILABLE_NAMESPACES)
+
+
+def test_ids_only_queries_rehydrate_from_the_loader(monkeypatch):
+    index = InMemoryPineconeIndex()
+    known = next(rid for rid, ns in ID_TO_NAMESPACE.items() if ns == "BMI")
+    index.upsert([
+        {"id": known, "values": [1.0, 0.0], "metadata": {"moduleNumber": "BMI 10", "reviserEmail": "x@hs-duesseldorf.de"}},
+        {"id": "BMI_pdf_unknown", "values": [0.9, 0.1], "metadata": {"snippet": "only in Pinecone"}},
+    ], namespace="BMI")
+    monkeypatch.setattr(pinecone_search, "_index", index)
+    monkeypatch.setattr(pinecone_search, "PINECONE_INCLUDE_METADATA", False)
+    monkeypatch.setattr(pinecone_search, "PINECONE_LAYOUT", "namespaces")
+
+    matches = pinecone_search.search_all_namespaces([1.0, 0.0], top_k=2, namespaces=["BMI"])
+    assert [(m.id, m.namespace, m.metadata) for m in matches] == [
+        (known, "BMI", {}),
+        ("BMI_pdf_unknown", "BMI", {"snippet": "only in Pinecone"}),  # fetched, not in the loader
+    ]
+    assert index.calls == 3  # upsert, query, fetch
+
+
+def test_slim_upload_metadata_keeps_filter_fields():
+    meta = {"moduleNumber": "BMI 10", "offeredInSeason": "winter_semester", "creditPoints": "5.0", "reviserEmail": "x"}
+    assert upload_metadata(meta, "BMI", slim=True) == {
+        "offeredInSeason": "winter_semester", "creditPoints": "5.0", "studyProgramAbbrev": "BMI", "sourceKind": "module",
+    }
+    assert upload_metadata(meta, "BMI", slim=False)["reviserEmail"] == "x"
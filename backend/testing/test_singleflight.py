@@ -0,0 +1,76 @@
+"""
+Offline checks for in-flight request coalescing (services/singleflight.py).
+Run from backend/:
+
+    python -m pytest testing/test_singleflight.py
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.singleflight import SingleFlight
+
+
+def test_identical_calls_share_one_run():
+    runs = []
+
+    async def work():
+        runs.append(1)
+        await asyncio.sleep(0.02)
+        return "answer"
+
+    async def run():
+        flight = SingleFlight(timeout=1)
+        results = await asyncio.gather(*(flight.do("q", work) for _ in range(5)))
+        return flight, results
+
+    flight, results = asyncio.run(run())
+    assert results == ["answer"] * 5 and len(runs) == 1
+    assert flight.stats() == {"inflight": 0, "leaders": 1, "coalesced": 4}
+
+
+def test_failed_leader_is_released():
+    runs = []
+
+    async def failing():
+        runs.append("fail")
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def working():
+        runs.append("ok")
+        return "answer"
+
+    async def run():
+        flight = SingleFlight(timeout=1)
+        results = await asyncio.gather(*(flight.do("q", failing) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        await asyncio.sleep(0)
+        assert flight.stats()["inflight"] == 0
+        # the next call starts fresh instead of getting the old failure
+        return await flight.do("q", working)
+
+    assert asyncio.run(run()) == "answer"
+    assert runs == ["fail", "ok"]
+
+
+def test_timed_out_leader_is_released():
+    async def hanging():
+        await asyncio.sleep(10)
+
+    async def working():
+        return "answer"
+
+    async def run():
+        flight = SingleFlight(timeout=0.05)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.gather(flight.do("q", hanging), flight.do("q", hanging))
+        await asyncio.sleep(0)
+        assert flight.stats()["inflight"] == 0
+        return await flight.do("q", working)
+
+    assert asyncio.run(run()) == "answer"
@@ -1,5 +1,6 @@
 #this was used for the merged jsonl files which were created from JS + PDF data
 import os
+import sys
 import json
 from pathlib import Path
 from typing import List
@@ -8,8 +9,14 @@ from dotenv import load_dotenv
 from pinecone import Pinecone
 import openai
 
-#  CONFIG 
+# make backend/services importable when run as a script from the repo root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# before the services imports: single_index reads PINECONE_* when imported
 load_dotenv()
+from services.vector_snapshot import save_part, build_snapshot
+from services.single_index import target_namespace, upload_metadata
+
+#  CONFIG 
 openai.api_key = os.getenv("OPENAI_API_KEY")
 pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
 index = pc.Index(os.getenv("PINECONE_INDEX"))
@@ -41,9 +48,14 @@ def sanitize_metadata(metadata: dict) -> dict:
 def upload_file(path: Path):
     print(f"[upload] Processing file: {path.name}")
     namespace = path.stem.split("_")[0]  # e.g., "BMI" from "BMI_merged.jsonl"
+    # PINECONE_LAYOUT=single: everything goes into one namespace, tagged with program + source kind;
+    # PINECONE_SLIM_METADATA: only the filterable fields
+    upload_namespace = target_namespace(namespace)
 
     batch_ids, batch_texts, batch_meta = [], [], []
     total_uploaded = 0
+    # keep everything we embed for the local vector snapshot
+    all_ids, all_texts, all_vecs = [], [], []
 
     with path.open("r", encoding="utf-8") as f:
         for line in f:
@@ -54,33 +66,42 @@ def upload_file(path: Path):
 
             rid = rec.get("id") or f"auto-{hash(text)}"
             raw_metadata = rec.get("metadata", {}) or {}
-            metadata = sanitize_metadata(raw_metadata)
+            metadata = upload_metadata(sanitize_metadata(raw_metadata), namespace)
 
             batch_ids.append(rid)
             batch_texts.append(text)
             batch_meta.append(metadata)
 
             if len(batch_ids) >= BATCH_SIZE:
+                embeddings = embed_batch(batch_texts)
+                all_ids.extend(batch_ids)
+                all_texts.extend(batch_texts)
+                all_vecs.extend(embeddings)
                 vectors = [
                     {"id": batch_ids[i], "values": vec, "metadata": batch_meta[i]}
-                    for i, vec in enumerate(embed_batch(batch_texts))
+                    for i, vec in enumerate(embeddings)
                 ]
-                index.upsert(vectors=vectors, namespace=namespace)
-                print(f"  • Upserted {len(vectors)} vectors to namespace '{namespace}'")
+                index.upsert(vectors=vectors, namespace=upload_namespace)
+                print(f"  • Upserted {len(vectors)} vectors to namespace '{upload_namespace}'")
                 total_uploaded += len(vectors)
                 batch_ids, batch_texts, batch_meta = [], [], []
 
         # Final flush
         if batch_ids:
+            embeddings = embed_batch(batch_texts)
+            all_ids.extend(batch_ids)
+            all_texts.extend(batch_texts)
+            all_vecs.extend(embeddings)
             vectors = [
                 {"id": batch_ids[i], "values": vec, "metadata": batch_meta[i]}
-                for i, vec in enumerate(embed_batch(batch_texts))
+                for i, vec in enumerate(embeddings)
             ]
-            index.upsert(vectors=vectors, namespace=namespace)
-            print(f"  • Upserted {len(vectors)} vectors to namespace '{namespace}'")
+            index.upsert(vectors=vectors, namespace=upload_namespace)
+            print(f"  • Upserted {len(vectors)} vectors to namespace '{upload_namespace}'")
             total_uploaded += len(vectors)
 
     print(f" {path.name}: Uploaded {total_uploaded} vectors.\n")
+    save_part(namespace, all_ids, all_texts, all_vecs, EMBED_MODEL)
 
 #  Main script 
 if __name__ == "__main__":
@@ -96,4 +117,5 @@ if __name__ == "__main__":
     for file in merged_files:
         upload_file(file)
 
+    build_snapshot()
     print(" All merged modules uploaded to Pinecone.")
@@ -1,5 +1,6 @@
 import json
 import os
+import sys
 from pathlib import Path
 from typing import List
 
@@ -9,8 +10,15 @@ from langchain_openai import OpenAIEmbeddings
 from pinecone import Pinecone
 from tqdm import tqdm
 
-# Load environment variables
+# make backend/services importable when run as a script from the repo root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# Load environment variables, before the services imports: single_index
+# reads PINECONE_* when imported
 load_dotenv()
+from services.vector_snapshot import save_part, build_snapshot
+from services.single_index import target_namespace, upload_metadata
+
+EMBED_MODEL = "text-embedding-3-large"
 
 # Initialize Pinecone with environment variables
 pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
@@ -39,7 +47,7 @@ def convert_to_documents(records: List[dict]) -> List[Document]:
     return documents
 
 def embed_documents(docs: List[Document]) -> List[dict]:
-    embeddings = OpenAIEmbeddings(model="text-embedding-3-large")
+    embeddings = OpenAIEmbeddings(model=EMBED_MODEL)
     vectors = []
     for doc in tqdm(docs, desc="Embedding documents"):
         vector = embeddings.embed_query(doc.page_content)
@@ -52,13 +60,18 @@ def embed_documents(docs: List[Document]) -> List[dict]:
 
 def upload_to_pinecone(vectors: List[dict], namespace: str, index_name: str):
     index = pc.Index(index_name)
-    print(f"Uploading to Pinecone namespace: {namespace}")
+    # PINECONE_LAYOUT=single: one namespace, records tagged with program + source kind;
+    # PINECONE_SLIM_METADATA: only the filterable fields
+    upload_namespace = target_namespace(namespace)
+    vectors = [{**v, "metadata": upload_metadata(v["metadata"], namespace)} for v in vectors]
+    print(f"Uploading to Pinecone namespace: {upload_namespace}")
     for i in range(0, len(vectors), 100):
         batch = vectors[i:i+100]
-        index.upsert(vectors=batch, namespace=namespace)
-    print(f"Uploaded {len(vectors)} vectors to namespace '{namespace}'")
+        index.upsert(vectors=batch, namespace=upload_namespace)
+    print(f"Uploaded {len(vectors)} vectors to namespace '{upload_namespace}'")
 
 def process_and_upload(jsonl_path: str, namespace: str, index_name: str):
+    """Embed, upload and save the snapshot part of one PDF; call build_snapshot() once after the last one."""
     print(f"\nLoading JSONL: {jsonl_path}")
     records = load_jsonl(Path(jsonl_path))
     print(f"Loaded {len(records)} records")
@@ -69,4 +82,13 @@ def process_and_upload(jsonl_path: str, namespace: str, index_name: str):
     vectors = embed_documents(docs)
     print(f"Embedded {len(vectors)} documents")
 
-    upload_to_pinecone(vectors, namespace, index_name)
\ No newline at end of file
+    upload_to_pinecone(vectors, namespace, index_name)
+
+    # keep the embeddings for the local vector snapshot
+    save_part(
+        namespace,
+        [v["id"] for v in vectors],
+        [d.page_content for d in docs],
+        [v["values"] for v in vectors],
+        EMBED_MODEL,
+    )
\ No newline at end of file
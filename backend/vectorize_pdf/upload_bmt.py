@@ -1,4 +1,4 @@
-from shared_uploader import process_and_upload
+from shared_uploader import process_and_upload, build_snapshot
 import os
 from dotenv import load_dotenv
 
@@ -18,4 +18,7 @@ process_and_upload(
     jsonl_path=jsonl_path,
     namespace=namespace,
     index_name=index_name
-)
\ No newline at end of file
+)
+
+# one snapshot per run, after every part is saved
+build_snapshot()
@@ -1,5 +1,6 @@
 import json
 import os
+import sys
 from pathlib import Path
 from typing import List
 
@@ -9,8 +10,12 @@ from langchain_openai import OpenAIEmbeddings
 from pinecone import Pinecone
 from tqdm import tqdm
 
-# Load env vars
+# make backend/services importable when run as a script from the repo root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# Load env vars, before the services import: single_index reads PINECONE_*
+# when imported
 load_dotenv()
+from services.single_index import target_namespace, upload_metadata
 
 # Init Pinecone client
 pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
@@ -69,11 +74,15 @@ def embed_documents(docs: List[Document]) -> List[dict]:
 
 def upload_to_pinecone(vectors: List[dict], namespace: str, index_name: str):
     index = pc.Index(index_name)
-    print(f"Uploading to Pinecone namespace: {namespace}")
+    # PINECONE_LAYOUT=single: one namespace, records tagged with program + source kind;
+    # PINECONE_SLIM_METADATA: only the filterable fields
+    upload_namespace = target_namespace(namespace)
+    vectors = [{**v, "metadata": upload_metadata(v["metadata"], namespace)} for v in vectors]
+    print(f"Uploading to Pinecone namespace: {upload_namespace}")
     for i in range(0, len(vectors), 100):
         batch = vectors[i:i+100]
-        index.upsert(vectors=batch, namespace=namespace)
-    print(f"Uploaded {len(vectors)} vectors to namespace '{namespace}'")
+        index.upsert(vectors=batch, namespace=upload_namespace)
+    print(f"Uploaded {len(vectors)} vectors to namespace '{upload_namespace}'")
 
 #  Main 
 print(f"\nLoading JSONL: {jsonl_path}")
@@ -1,4 +1,5 @@
 import os
+import sys
 import json
 from pathlib import Path
 from dotenv import load_dotenv
@@ -6,8 +7,14 @@ from pinecone import Pinecone
 import openai
 from typing import List, Dict, Any
 
-# CONFIG 
+# make backend/services importable when run as a script from the repo root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# before the services imports: single_index reads PINECONE_* when imported
 load_dotenv()
+from services.vector_snapshot import save_part, build_snapshot
+from services.single_index import target_namespace, upload_metadata
+
+# CONFIG 
 openai.api_key = os.getenv("OPENAI_API_KEY")
 pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
 index = pc.Index(os.getenv("PINECONE_INDEX"))
@@ -93,6 +100,9 @@ def upload_file(path: Path):
 
     print(f"Processing {path.name} → namespace '{namespace}'")
 
+    # keep everything we embed for the local vector snapshot
+    all_ids, all_texts, all_vecs = [], [], []
+
     for i, rec in enumerate(records, start=1):
         # Create ID if missing
         rid = rec.get("id") or f"WEB_{namespace}_{i:03d}"
@@ -101,15 +111,19 @@ def upload_file(path: Path):
             continue
 
         vec = embed_text(emb_text)
+        all_ids.append(rid)
+        all_texts.append(emb_text)
+        all_vecs.append(vec)
         meta = sanitize_metadata(rec.get("metadata", {}))
-        meta_with_snippet = {**meta, "snippet": emb_text[:300]}
+        meta_with_snippet = upload_metadata({**meta, "snippet": emb_text[:300]}, namespace)
 
         index.upsert(
             vectors=[{"id": rid, "values": vec, "metadata": meta_with_snippet}],
-            namespace=namespace
+            namespace=target_namespace(namespace)
         )
 
     print(f"Finished uploading {len(records)} records to {namespace}\n")
+    save_part(namespace, all_ids, all_texts, all_vecs, EMBED_MODEL)
 
 
 # MAIN 
@@ -122,4 +136,5 @@ if __name__ == "__main__":
     for f in json_files:
         upload_file(f)
 
+    build_snapshot()
     print("All web data uploaded to Pinecone.")